@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+####################################################################################
+# Copyright (C) 2025 RetroGameGirl (atariage)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+####################################################################################
+"""
+
+"""
+################################################################################
+#
+# BENCHMARKS
+#
+# Measures the hot paths of devCMDcycle.py. Run it from this directory:
+#
+#     python3 benchCMDcycle.py [--lines N] [--tk-call-us US] [--only NAME ...] [--json [FILE]]
+#
+# Covers the Status Window render path, the ANSI color parser, the include
+# dependency scanner, reading job output from a PTY, loading and saving a
+# large INI file, placeholder resolution and composite chain scheduling.
+#
+# A real Tk Text widget is used when a display is available. Without one
+# (e.g. over SSH or on CI) a stand-in is used instead that spends a fixed
+# time (--tk-call-us) on every Text call and root.after callback, in place
+# of the Tcl round trip and redraw a real widget costs. The report says
+# which of the two was measured; for real numbers without a screen, run
+# it under a virtual display: xvfb-run python3 benchCMDcycle.py
+#
+# --json writes every number to FILE (stdout without one, the report then
+# goes to stderr), so results can be kept and compared across versions.
+#
+################################################################################
+"""
+
+import argparse
+import copy
+import json
+import os
+import platform
+import queue
+import re
+import shlex
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+
+import devCMDcycle
+import engineCMDcycle
+
+
+OUT = sys.stdout # Where the report goes; stderr when the JSON goes to stdout
+
+
+def report(text):
+    print(text, file=OUT)
+
+
+def spin(seconds):
+    """Busy-waits, as time.sleep() is far too coarse for a few microseconds."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end: pass
+
+
+class NullText:
+    """Stands in for tk.Text when there is no display. Each call costs `call_cost` seconds."""
+    def __init__(self, call_cost=0.0):
+        self.chars = 0
+        self.call_cost = call_cost
+
+    def tag_configure(self, *args, **kwargs): pass
+    def config(self, **kwargs): spin(self.call_cost)
+    def see(self, index): spin(self.call_cost)
+    def delete(self, *args): spin(self.call_cost)
+
+    def cget(self, option):
+        raise tk.TclError(option) # No fonts without a display
+
+    def insert(self, index, *args):
+        spin(self.call_cost)
+        self.chars += sum(len(chars) for chars in args[::2])
+
+
+def make_text_widget(call_cost=0.0):
+    """Returns (root, widget, description); root is None when there is no display."""
+    try:
+        root = tk.Tk()
+        root.withdraw()
+        return root, tk.Text(root), "tk.Text"
+    except tk.TclError:
+        return None, NullText(call_cost), f"NullText (no display, {call_cost * 1e6:g} µs simulated per Tk call and root.after callback)"
+
+
+def listing_lines(count):
+    """Synthetic assembler listing with the occasional colored error line."""
+    lines = []
+    for i in range(count):
+        if i % 500 == 499:
+            lines.append(f"\x1b[1;31mgame.s ({i}): error: Unknown Mnemonic 'lda.z'.\x1b[0m\n")
+        else:
+            lines.append(f"{i:6d}  {0x8000 + i * 3:04x}  a9 {i & 0xff:02x}        lda #${i & 0xff:02x} ; listing line\n")
+    return lines
+
+
+def os_read_chunks(lines, size=1024):
+    """Splits the output into the 1024-byte pieces the PTY reader produces."""
+    data = ''.join(lines)
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def colored_lines(count):
+    """Compiler-style output that switches colors several times per line."""
+    lines = []
+    for i in range(count):
+        lines.append(f"\x1b[1msrc/game.c({i}):\x1b[0m \x1b[33mwarning:\x1b[0m unused variable "
+                     f"\x1b[38;5;{16 + i % 216}m'tmp{i}'\x1b[0m [\x1b[48;2;40;40;{i & 0xff}m-Wunused\x1b[49m]\r\n")
+    return lines
+
+
+class LegacyAnsiParser:
+    """The 3.01 regex parser, kept here as the baseline. Stateless between chunks."""
+    light_map = {'30': 'black', '31': 'red', '32': 'green', '33': 'yellow', '34': 'blue', '35': 'magenta', '36': 'cyan', '37': 'white'}
+    ansi_escape = re.compile(r'\x1B\[([0-9;?]*)m')
+
+    def parse(self, text):
+        text = re.sub(r'\x1B\[[0-9;?]*[HJK]', '', text).replace('\r', '')
+        segments = self.ansi_escape.split(text)
+        current_tags = []
+        runs = []
+        for i, segment in enumerate(segments):
+            if i % 2 == 0:
+                if segment:
+                    runs += (segment, tuple(current_tags))
+            else:
+                if segment == '0' or not segment:
+                    current_tags = []
+                    continue
+                for p in segment.split(';'):
+                    if p in self.light_map:
+                        current_tags = [t for t in current_tags if not (t.startswith('ansi_') and t != 'ansi_bold')]
+                        current_tags.append(f"ansi_{self.light_map[p]}")
+                    elif p == '1':
+                        if "ansi_bold" not in current_tags:
+                            current_tags.append("ansi_bold")
+        return runs
+
+
+def bench_ansi(line_count):
+    """Parser throughput on heavily colored output, plus escape fragments leaking into the text."""
+    chunks = os_read_chunks(colored_lines(line_count))
+    total = sum(len(chunk) for chunk in chunks)
+    report(f"ANSI parsing: {total / 1e6:.1f} MB of colored output in {len(chunks)} chunks")
+    results = {'bytes': total}
+    for name, parser in (('regex', LegacyAnsiParser()), ('streaming', devCMDcycle.AnsiColorHandler(NullText()))):
+        start = time.perf_counter()
+        runs = []
+        for chunk in chunks: runs += parser.parse(chunk)
+        elapsed = time.perf_counter() - start
+        leaked = sum(text.count('\x1b') + text.count('[0m') for text in runs[::2])
+        report(f"  {name:<10} {total / elapsed / 1e6:>8.1f} MB/s  ({elapsed * 1000:8.1f} ms, {leaked} broken escapes)")
+        results[name] = {'mb_per_s': total / elapsed / 1e6, 'ms': elapsed * 1000, 'broken_escapes': leaked}
+    return results
+
+
+def bench_status_window(line_count, call_cost):
+    root, widget, kind = make_text_widget(call_cost)
+    # Without a display, each root.after callback (one per chunk before, one per frame now) costs call_cost as well
+    scheduled = (lambda: None) if root else (lambda: spin(call_cost))
+    chunks = os_read_chunks(listing_lines(line_count))
+    handler = devCMDcycle.AnsiColorHandler(widget)
+    results = {}
+
+    # Previous behaviour: one callback per chunk, each toggling state, inserting and scrolling.
+    start = time.perf_counter()
+    for chunk in chunks:
+        scheduled()
+        widget.config(state='normal')
+        handler.write(chunk)
+        widget.see(tk.END)
+        widget.config(state='disabled')
+        if root: root.update_idletasks()
+    results['per-chunk'] = (time.perf_counter() - start, len(chunks))
+
+    widget.delete('1.0', tk.END)
+    output_queue = queue.Queue()
+    for chunk in chunks: output_queue.put(chunk)
+    renderer = devCMDcycle.StatusRenderer(root, widget, handler, output_queue)
+
+    start = time.perf_counter()
+    while not output_queue.empty():
+        scheduled()
+        renderer.render_pending()
+        if root: root.update_idletasks()
+    results['batched'] = (time.perf_counter() - start, renderer.stats['frames'])
+
+    if root: root.destroy()
+
+    report(f"Status Window: {line_count} lines in {len(chunks)} chunks into {kind}")
+    for name, (elapsed, frames) in results.items():
+        report(f"  {name:<10} {line_count / elapsed:>12,.0f} lines/s  ({elapsed * 1000:8.1f} ms, {frames} frames)")
+    return {'widget': kind, 'simulated_tk_call_us': None if root else call_cost * 1e6, **{name: {'lines_per_s': line_count / elapsed, 'ms': elapsed * 1000, 'frames': frames}
+                              for name, (elapsed, frames) in results.items()}}
+
+
+def bench_dependencies(file_count=200):
+    """First and repeated include scans of a synthetic dasm project."""
+    with tempfile.TemporaryDirectory() as project:
+        for i in range(file_count):
+            includes = ''.join(f'    include "mod{j}.asm"\n' for j in (2 * i + 1, 2 * i + 2) if j < file_count)
+            body = ''.join(f"    lda #{n}\n    sta $80\n" for n in range(200))
+            with open(os.path.join(project, f"mod{i}.asm"), 'w') as f: f.write(includes + body)
+        scanner = engineCMDcycle.DependencyScanner()
+        source = os.path.join(project, "mod0.asm")
+        report(f"Include scan: {file_count}-file project")
+        results = {'files': file_count}
+        for name in ('first scan', 'rescan'):
+            start = time.perf_counter()
+            deps = scanner.dependencies(source)
+            elapsed = time.perf_counter() - start
+            report(f"  {name:<10} {elapsed * 1000:8.2f} ms  ({len(deps)} dependencies)")
+            results[name.replace(' ', '_')] = {'ms': elapsed * 1000}
+        return results
+
+
+def run_job(job, timeout=60):
+    """Starts a Job and reads its output queue until the stream ends. Returns (seconds, queue items)."""
+    output_queue = queue.Queue()
+    start = time.perf_counter()
+    job.start(output_queue)
+    items, deadline = 0, time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try: item = output_queue.get(timeout=0.5)
+        except queue.Empty: continue
+        if item[1] is None: break
+        items += 1
+    elapsed = time.perf_counter() - start
+    job.process.wait()
+    return elapsed, items
+
+
+def bench_pty(megabytes):
+    """Job output read through the PTY reader (_read_stream_to_queue), with and without the gzip log."""
+    if sys.platform == "win32":
+        report("PTY reading: skipped (no PTY on Windows)")
+        return {'skipped': True}
+    with tempfile.TemporaryDirectory() as folder:
+        data_path = os.path.join(folder, "output.txt")
+        line_count = 0
+        with open(data_path, 'w') as f:
+            while f.tell() < megabytes * 1e6:
+                f.writelines(listing_lines(10000))
+                line_count += 10000
+        size = os.path.getsize(data_path)
+        report(f"PTY reading: {size / 1e6:.1f} MB ({line_count} lines) from cat")
+        results = {'bytes': size}
+        for name, log_dir in (('plain', None), ('logged', os.path.join(folder, "logs"))):
+            job = engineCMDcycle.Job(1, 'cat', f"cat {data_path}", log_dir=log_dir)
+            elapsed, items = run_job(job)
+            report(f"  {name:<10} {job.read_stats['bytes'] / elapsed / 1e6:>8.1f} MB/s  ({elapsed * 1000:8.1f} ms, "
+                   f"{job.read_stats['reads']} reads, {items} queue items)")
+            results[name] = {'mb_per_s': job.read_stats['bytes'] / elapsed / 1e6, 'ms': elapsed * 1000,
+                             'reads': job.read_stats['reads'], 'items': items}
+        return results
+
+
+def large_config(toolchain_count):
+    """The default config with `toolchain_count` toolchains and as many Auto-Typer profiles."""
+    config = copy.deepcopy(engineCMDcycle.DEFAULT_CONFIG)
+    toolchains, profiles = config['Toolchains'], config['AutoTyperProfiles']
+    templates, profile_templates = list(toolchains.values()), [v for k, v in profiles.items() if not k.startswith('--')]
+    for i in range(toolchain_count - len(toolchains)):
+        toolchains[f"Toolchain {i}"] = dict(templates[i % len(templates)], path=f"/opt/tools/bin/tool{i}")
+    for i in range(toolchain_count - len(profiles)):
+        profiles[f"Profile {i}"] = profile_templates[i % len(profile_templates)]
+    config['ToolchainStates'].update({f"Toolchain_{i}_Run_in_debug_mode": str(i % 2 == 0) for i in range(toolchain_count)})
+    return engineCMDcycle.build_config_model(config)
+
+
+def bench_config(toolchain_count, repeat=5):
+    """Loading and saving an INI file with many toolchains and profiles."""
+    config = large_config(toolchain_count)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, engineCMDcycle.CONFIG_FILE_NAME)
+        store = engineCMDcycle.ConfigStore(path, lambda: config, exclude=engineCMDcycle.UNDELETABLE_ITEMS)
+        timings = {}
+        def timed(name, action):
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                action()
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+        def full_save():
+            store.mark_dirty()
+            config['Paths']['last_source'] = f"/tmp/game{time.perf_counter()}.asm" # Changed, so the file is really written
+            store.flush()
+        def section_save():
+            config['Paths']['last_source'] = f"/tmp/game{time.perf_counter()}.asm"
+            store.mark_dirty('Paths')
+        def toolchains_save():
+            config['Toolchains']['Toolchain 0'].path = f"/opt/tools/bin/tool{time.perf_counter()}"
+            store.mark_dirty('Toolchains')
+        timed('save all', full_save)
+        timed('save Paths', section_save)
+        timed('save Toolchains', toolchains_save)
+        timed('load', lambda: engineCMDcycle.read_config(path))
+        size = os.path.getsize(path)
+
+    report(f"Config: {toolchain_count} toolchains, {size / 1024:.0f} KB INI file (best of {repeat})")
+    for name, elapsed in timings.items(): report(f"  {name:<16} {elapsed * 1000:8.2f} ms")
+    return {'toolchains': toolchain_count, 'bytes': size, **{name.replace(' ', '_'): {'ms': elapsed * 1000} for name, elapsed in timings.items()}}
+
+
+def legacy_resolve(context, command, target_button=None):
+    """The 3.01 resolver: one str.replace per placeholder, rebuilding and quoting every value on each call."""
+    paths = context.config.get('Paths', {})
+    source_stem = os.path.splitext(context.source)[0] if context.source else ''
+    replacements = {'f': shlex.quote(context.source), 's': shlex.quote(source_stem), 'o': shlex.quote(source_stem)}
+    replacements.update({k: shlex.quote(paths.get(v, '')) for k, v in engineCMDcycle.TOOL_PLACEHOLDERS})
+    replacements['t'] = shlex.quote(context.toolchain.path) if context.toolchain.path else context.toolchain_name
+    resolved = command
+    for key, value in replacements.items(): resolved = resolved.replace(f'%{key}', value)
+    for option in context.toolchain.options:
+        if option.target == target_button and context.option_enabled(option):
+            resolved += f" {option.flag.replace('%s', source_stem).replace('%o', source_stem).replace('%f', context.source)}"
+    return resolved
+
+
+def bench_placeholders(count=100000):
+    """Resolving every button command of the default toolchains, as for each run and preview update."""
+    config = large_config(0)
+    commands = [(name, key, button.command) for name, toolchain in config['Toolchains'].items() if not name.startswith('--')
+                for key, button in toolchain.buttons.items() if button.command.strip()]
+    contexts = {name: engineCMDcycle.CommandContext(config, name, "/home/dev/projects/my game/src/game.asm") for name, _, _ in commands}
+    report(f"Placeholders: {count} resolutions of {len(commands)} button commands")
+    results = {'commands': len(commands)}
+    for name, resolve in (('legacy', legacy_resolve), ('compiled', lambda context, command, key: context.resolve(command, target_button=key))):
+        start = time.perf_counter()
+        for i in range(count):
+            toolchain, key, command = commands[i % len(commands)]
+            resolve(contexts[toolchain], command, key)
+        elapsed = time.perf_counter() - start
+        report(f"  {name:<10} {elapsed / count * 1e6:8.2f} us per command")
+        results[name] = {'us_per_command': elapsed / count * 1e6}
+    return results
+
+
+def bench_chain(step_count=2000, job_count=8):
+    """Composite chain scheduling: the overhead per step, and a real chain of short jobs."""
+    output_queue = queue.Queue()
+    loop = engineCMDcycle.EventLoop(output_queue, out=open(os.devnull, 'w'))
+    results = {}
+    report(f"Chain scheduling: {step_count} empty steps, and {job_count} 'true' jobs")
+    for name, graph in (('sequence', ('seq', [('step', f"Button{i}") for i in range(step_count)])),
+                        ('parallel', ('par', [('step', f"Button{i}") for i in range(step_count)]))):
+        done = []
+        runner = engineCMDcycle.ChainRunner(graph, lambda key, step_done: loop.after(0, lambda: step_done(True)),
+                                            on_finish=lambda runner, ok: done.append(ok))
+        start = time.perf_counter()
+        runner.run()
+        loop.run(lambda: done)
+        elapsed = time.perf_counter() - start
+        report(f"  {name:<10} {elapsed / step_count * 1e6:8.2f} us per step")
+        results[name] = {'us_per_step': elapsed / step_count * 1e6}
+
+    if sys.platform != "win32":
+        manager = engineCMDcycle.ProcessManager(output_queue, loop.after)
+        messages = []
+        runner = engineCMDcycle.CommandRunner(manager, loop.after, log=lambda text, tag=None: messages.append(text))
+        config = engineCMDcycle.build_config_model({'Toolchains': {'bench': {'custom_buttons': str(
+            {'Button1': {'name': 'True', 'command': 'true'}, 'Button2': {'name': 'Chain', 'command': ','.join(['Button1'] * job_count)}})}}})
+        with tempfile.TemporaryDirectory() as folder:
+            context = engineCMDcycle.CommandContext(config, 'bench', os.path.join(folder, "game.asm"))
+            done = []
+            start = time.perf_counter()
+            runner.run_button(context, 'Button2', on_finish=done.append)
+            loop.run(lambda: done and not manager.running)
+            elapsed = time.perf_counter() - start
+            runner.close()
+        summary = next(text for text in messages if "'Chain' finished" in text)
+        overhead, exit_delay = (float(v) for v in re.search(r'overhead (\d+) ms, exit dispatch (\d+) ms', summary).groups())
+        report(f"  {'jobs':<10} {elapsed * 1000 / job_count:8.2f} ms per job  (scheduling overhead {overhead:.0f} ms, exit dispatch {exit_delay:.0f} ms)")
+        results['jobs'] = {'ms_per_job': elapsed * 1000 / job_count, 'overhead_ms': overhead, 'exit_dispatch_ms': exit_delay}
+    return results
+
+
+BENCHMARKS = {
+    'status': lambda args: bench_status_window(args.lines, args.tk_call_us / 1e6),
+    'ansi': lambda args: bench_ansi(args.lines),
+    'dependencies': lambda args: bench_dependencies(),
+    'pty': lambda args: bench_pty(args.pty_mb),
+    'config': lambda args: bench_config(args.toolchains),
+    'placeholders': lambda args: bench_placeholders(),
+    'chain': lambda args: bench_chain(),
+}
+
+
+def main():
+    global OUT
+    parser = argparse.ArgumentParser(description="Benchmarks for devCMDcycle.py")
+    parser.add_argument('--lines', type=int, default=200000, help="number of output lines to render")
+    parser.add_argument('--tk-call-us', type=float, default=20.0, help="microseconds a Tk call is assumed to take when there is no display")
+    parser.add_argument('--pty-mb', type=int, default=32, help="megabytes of job output to read through the PTY")
+    parser.add_argument('--toolchains', type=int, default=300, help="toolchains in the synthetic INI file")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), metavar='NAME', help=f"benchmarks to run: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--json', nargs='?', const='-', metavar='FILE', help="write the results as JSON to FILE (default: stdout)")
+    args = parser.parse_args()
+    if args.json == '-': OUT = sys.stderr
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        results[name] = BENCHMARKS[name](args)
+    if args.json:
+        data = json.dumps({'version': engineCMDcycle.APP_VERSION, 'python': platform.python_version(), 'platform': sys.platform,
+                           'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'results': results}, indent=1)
+        if args.json == '-': print(data)
+        else:
+            with open(args.json, 'w', encoding='utf-8') as f: f.write(data + '\n')
+
+
+if __name__ == "__main__":
+    main()
@@ -20,318 +20,53 @@
 ####################################################################################
 """
 
+import sys
+import time
+
+STARTED = time.perf_counter() # Start of the "imports" phase reported by --startup-profile
+
+REPORT_STARTUP = False
+if __name__ == "__main__":
+    # --startup-profile is taken out before routing: on its own it opens the window and reports how
+    # long each startup phase took; next to command line arguments it is ignored. Only done when run
+    # as a script, so importing this module never touches the caller's argv
+    REPORT_STARTUP = '--startup-profile' in sys.argv
+    if REPORT_STARTUP: sys.argv = [arg for arg in sys.argv if arg != '--startup-profile']
+
+    # Command line mode: with arguments, run a button and exit without loading tkinter at all
+    if len(sys.argv) > 1:
+        from engineCMDcycle import main
+        sys.exit(main())
+
 import tkinter as tk
-from tkinter import filedialog, ttk, font as tkfont, messagebox, simpledialog, colorchooser
-from collections import deque, defaultdict
+from tkinter import ttk, font as tkfont, messagebox
+from collections import defaultdict
 import subprocess
 import os
-import sys
 import configparser
-import shlex
 import queue
-import threading
 import re
 import copy
-import time
-import ast
-import io
-import pprint
-import shutil
-import glob
+import shlex
+import threading
 
+import engineCMDcycle
+from engineCMDcycle import (
+    UNDELETABLE_ITEMS, DEFAULT_CONFIG, CONFIG_FILE_NAME, WORKSPACE_FILE_NAME, APP_VERSION, STATUS_SCROLLBACK_LINES, BUILD_CACHE_FILE_NAME, HISTORY_FILE_NAME, LOG_DIR_NAME,
+    ini_value, Button, ToolchainOption, BuildStep, Toolchain, StepCommand, Step, AutoTyperProfile, build_config_model,
+    ConfigStore, Workspace, Scrollback, ProcessManager, CommandContext, CommandRunner, BuildHistory,
+    active_auto_typer_profile, read_log_lines, grep_log, DIAGNOSTIC_FORMATS, WatchMode,
+)
 
-# Conditional import for Unix-like systems for better terminal emulation
-if sys.platform != "win32":
-    import pty
 
 # --- Global Constants ---
-CONFIG_FILE_NAME = 'devCMDcycle_301.ini'
-APP_VERSION = "3.01"
 INI_BACKUP_DIR = "ini_backup"
 SCRIPT_BACKUP_DIR = "script_backup"
+STATUS_TICK_MIN_MS = 16 # Status Window refresh interval while output is streaming (~60 fps)
+STATUS_TICK_MAX_MS = 100 # Refresh interval when idle
+STATUS_FRAME_BUDGET = 256 * 1024 # Max characters rendered per frame; the rest waits for the next tick
+STARTUP_TARGET_MS = 500 # Cold start budget, from launch to the first paint of the main window
 
-"""
-################################################################################
-#
-# UNDELETABLE ITEMS & DEFAULT CONFIGURATION
-#
-# This section defines the core structure of the application's settings.
-#
-# UNDELETABLE_ITEMS:
-# This dictionary contains system-critical items that are essential for the
-# application's stability. These items cannot be deleted by the user through
-# the UI and are not saved to the user's .ini file. They are merged into the
-# configuration at runtime to ensure they are always present.
-#
-# DEFAULT_CONFIG:
-# This dictionary contains all the default settings for the application. It is
-# the blueprint for the `devCMDcycle_210.ini` file that is automatically
-# created when the program runs for the first time. It serves as a complete
-# reference for all configuration options.
-#
-################################################################################
-"""
-
-UNDELETABLE_ITEMS = {
-    'AutoTyperProfiles': {
-        '-- No Profile Selected --': str(
-            {'master_enabled': 'False', **{f'Step {i}': {'name': f'Step {i}', 'column': 1, 'commands': []} for i in range(1, 6)}}
-        )
-    },
-    'Toolchains': {
-        '-- Select Toolchain --': {
-            'autotyper_profile': '-- No Profile Selected --',
-            'build_steps': str([]),
-            'custom_buttons': str(
-                {f'Button{i}': {'name': '', 'command': '', 'color': '#F0F0F0'} for i in range(1, 11)}
-            ),
-            'path': '',
-            'toolchain_options': str([])
-        }
-    }
-}
-
-
-DEFAULT_CONFIG = {
-    'Actions': {
-        'add_header': '%h %s.bin',
-        'add_header_a78': '%h %o.a78',
-        'compile_cc65': '%t -t atari7800 -o %o.a78 %f',
-        'compile_dasm': '%t %f',
-        'edit': '%e %f',
-        'run': '%m a7800 -cart %o.a78',
-        'run_debug': '%m a7800 -cart %o.a78 -debug',
-        'sign_rom': '%g %o.a78'
-    },
-    'AutoTyperProfiles': {
-        '-- No Profile Selected --': str(
-    {   'master_enabled': 'False',
-        'Step 1': {'name': 'Step 1', 'column': 1, 'commands': []},
-        'Step 2': {'name': 'Step 2', 'column': 1, 'commands': []},
-        'Step 3': {'name': 'Step 3', 'column': 1, 'commands': []},
-        'Step 4': {'name': 'Step 4', 'column': 1, 'commands': []},
-        'Step 5': {'name': 'Step 5', 'column': 1, 'commands': []}}    ),
-        '7800AsmDevKit Header': str(
-    {   'master_enabled': 'False',
-        'Step 1': {   'name': 'Cartridge & Memory',
-                      'column': 1,
-                      'commands': [   {'label': 'Button4', 'command': 'set linear', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set supergame', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set souper', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set bankset', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set absolute', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set activision', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set rom@4000', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set bank6@4000', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set ram@4000', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set mram@4000', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set hram@4000', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set bankram', 'enabled': 'False', 'text': ''}]},
-        'Step 2': {   'name': 'Hardware & IRQs',
-                      'column': 1,
-                      'commands': [   {'label': 'Button4', 'command': 'set pokey@440', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set pokey@450', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set pokey@800', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set pokey@4000', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set ym2151@460', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set covox@430', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set adpcm@420', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set irqpokey1', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set irqpokey2', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set irqym2151', 'enabled': 'False', 'text': ''}]},
-        'Step 3': {   'name': 'Controllers',
-                      'column': 2,
-                      'commands': [   {'label': 'Button4', 'command': 'set 7800joy1', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set 7800joy2', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set lightgun1', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set lightgun2', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set paddle1', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set paddle2', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set 2600joy1', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set 2600joy2', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set keypad1', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set keypad2', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set mega78001', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set mega78002', 'enabled': 'False', 'text': ''}]},
-        'Step 4': {   'name': 'Misc & TV',
-                      'column': 2,
-                      'commands': [   {'label': 'Button4', 'command': 'set hsc', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set savekey', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set xm', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set tvpal', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set tvntsc', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set composite', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'set mregion', 'enabled': 'False', 'text': ''}]},
-        'Step 5': {   'name': 'Final Actions',
-                      'column': 3,
-                      'commands': [   {'label': 'Button4', 'command': 'name "%b25"', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'save', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'strip', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'fix', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button4', 'command': 'exit', 'enabled': 'False', 'text': ''}]}}    ),
-        'cc65 Header': str(
-    {   'master_enabled': 'False',
-        'Step 1': {   'name': 'Cartridge & Memory',
-                      'column': 1,
-                      'commands': [   {'label': 'Button5', 'command': 'set linear', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set supergame', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set souper', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set bankset', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set absolute', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set activision', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set rom@4000', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set bank6@4000', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set ram@4000', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set mram@4000', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set hram@4000', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set bankram', 'enabled': 'False', 'text': ''}]},
-        'Step 2': {   'name': 'Hardware & IRQs',
-                      'column': 1,
-                      'commands': [   {'label': 'Button5', 'command': 'set pokey@440', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set pokey@450', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set pokey@800', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set pokey@4000', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set ym2151@460', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set covox@430', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set adpcm@420', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set irqpokey1', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set irqpokey2', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set irqym2151', 'enabled': 'False', 'text': ''}]},
-        'Step 3': {   'name': 'Controllers',
-                      'column': 2,
-                      'commands': [   {'label': 'Button5', 'command': 'set 7800joy1', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set 7800joy2', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set lightgun1', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set lightgun2', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set paddle1', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set paddle2', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set 2600joy1', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set 2600joy2', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set keypad1', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set keypad2', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set mega78001', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set mega78002', 'enabled': 'False', 'text': ''}]},
-        'Step 4': {   'name': 'Misc & TV',
-                      'column': 2,
-                      'commands': [   {'label': 'Button5', 'command': 'set hsc', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set savekey', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set xm', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set tvpal', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set tvntsc', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set composite', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'set mregion', 'enabled': 'False', 'text': ''}]},
-        'Step 5': {   'name': 'Final Actions',
-                      'column': 3,
-                      'commands': [   {'label': 'Button5', 'command': 'name "%b25"', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'save', 'enabled': 'True', 'text': ''},
-                                      {'label': 'Button5', 'command': 'strip', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'fix', 'enabled': 'False', 'text': ''},
-                                      {'label': 'Button5', 'command': 'exit', 'enabled': 'False', 'text': ''}]}}    )
-    },
-    'CleanStates': {
-        '.a78': 'True',
-        '.a78.backup': 'True',
-        '.a78.map': 'True',
-        '.bin': 'True',
-        '.dbg': 'True',
-        '.list.txt': 'True',
-        '.lst': 'True',
-        '.map': 'True',
-        '.o': 'True',
-        '.s.a78': 'True',
-        '.s.a78.backup': 'True',
-        '.s.bin': 'True',
-        '.s.list.txt': 'True',
-        '.s.symbol.txt': 'True',
-        '.sym': 'True',
-        '.symbol.txt': 'True'
-    },
-    'DefaultGeometry': {
-        'autotyper_profile_editor': '1100x900',
-        'main_window': '800x1000',
-        'settings_window': '1360x825',
-        'toolchain_editor': '1285x853',
-        'toolchain_options_editor': '1000x900'
-    },
-    'Geometry': {
-        'autotyper_profile_editor': '1100x900',
-        'main_window': '800x1000',
-        'settings_window': '1217x825',
-        'toolchain_editor': '1285x853',
-        'toolchain_options_editor': '1000x900'
-    },
-    'Options': {
-        'active_auto_typer_profile': '-- No Profile Selected --',
-        'always_on_top': 'False',
-        'clean_extensions': '.a78,.o,.bin,.s.a78,.s.bin,.lst,.list.txt,.s.list.txt,.sym,.symbol.txt,.s.symbol.txt,.map,.a78.map,.dbg,.a78.backup,.s.a78.backup',
-        'dark_mode': 'False',
-        'header_command_delay': '0.5',
-        'header_initial_delay': '1.0'
-    },
-    'Paths': {
-        'editor': 'xed',
-        'emulator': 'a7800',
-        'header_tool': '7800header',
-        'last_source': '',
-        'last_toolchain': '-- Select Toolchain --',
-        'signer_tool': '7800sign',
-        'terminal': 'gnome-terminal'
-    },
-    'ToolchainStates': {
-        '7800ASMDevKit_Generate_List_File': 'False',
-        '7800ASMDevKit_Generate_Symbol_File': 'False',
-        '7800ASMDevKit_Run_in_debug_mode': 'True',
-        '7800ASMDevKit_Run_with_Debug': 'False',
-        'cc65_Add_Debug_Info': 'False',
-        'cc65_Create_Map_File': 'False',
-        'cc65_Run_(debug)': 'True',
-        'cc65_Run_in_debug_mode': 'False'
-    },
-    'Toolchains': {
-        '7800ASMDevKit': {
-            'autotyper_profile': '7800AsmDevKit Header',
-            'build_steps': str(
-    ['compile_dasm', 'add_header']    ),
-            'custom_buttons': str(
-    {   'Button1': {'name': 'Terminal', 'command': 'EXTERNAL:%term', 'color': '#e0e0e0'},
-        'Button2': {'name': 'Edit', 'command': 'EXTERNAL:%e %f', 'color': '#e0e0e0'},
-        'Button3': {'name': 'Build', 'command': '%t %f', 'color': '#add8e6'},
-        'Button4': {'name': 'Header', 'command': '%h %s.s.bin', 'color': '#add8e6'},
-        'Button5': {'name': 'Build>Header', 'command': 'Button3,Button4', 'color': '#c1a9c3'},
-        'Button6': {'name': 'Run', 'command': 'EXTERNAL:%m a7800 -cart %s.s.a78', 'color': '#90ee90'},
-        'Button7': {'name': 'Build>Header>Run', 'command': 'Button3,Button4,Button6', 'color': '#c1a9c3'},
-        'Button8': {'name': '', 'command': '', 'color': '#e0e0e0'},
-        'Button9': {'name': '', 'command': '', 'color': '#e0e0e0'},
-        'Button10': {'name': '', 'command': '', 'color': '#F0F0F0'}}    ),
-            'path': '7800asm',
-            'toolchain_options': str(
-    [   {'name': 'Generate List File', 'flag': '-l', 'target': 'Button3'},
-        {'name': 'Generate Symbol File', 'flag': '-s', 'target': 'Button3'},
-        {'name': 'Run in debug mode', 'flag': '-debug', 'target': 'Button6'}]    )
-        },
-        'cc65': {
-            'autotyper_profile': 'cc65 Header',
-            'build_steps': str(
-    ['compile_cc65', 'sign_rom', 'add_header_a78']    ),
-            'custom_buttons': str(
-    {   'Button1': {'name': 'Terminal', 'command': 'EXTERNAL:%term', 'color': '#e0e0e0'},
-        'Button2': {'name': 'Edit', 'command': 'EXTERNAL:%e %f', 'color': '#e0e0e0'},
-        'Button3': {'name': 'Build', 'command': '%t -t atari7800 -o %s.bin %f', 'color': '#add8e6'},
-        'Button4': {'name': 'Sign', 'command': '%g %s.bin', 'color': '#add8e6'},
-        'Button5': {'name': 'Header', 'command': '%h %s.bin', 'color': '#add8e6'},
-        'Button6': {'name': 'Run', 'command': 'EXTERNAL:%m a7800 -cart %s.a78', 'color': '#90ee90'},
-        'Button7': {'name': 'Build>Sign>Header', 'command': 'Button3,Button4,Button5', 'color': '#c3a9c3'},
-        'Button8': {'name': '', 'command': '', 'color': '#e0e0e0'},
-        'Button9': {'name': 'Build>Sign>Header>Run', 'command': 'Button3,Button4,Button5,Button6', 'color': '#c1a9c3'},
-        'Button10': {'name': '', 'command': '', 'color': '#e0e0e0'}}    ),
-            'path': 'cl65',
-            'toolchain_options': str(
-    [   {'name': 'Create Map File', 'flag': '-m %s.map', 'target': 'Button3'},
-        {'name': 'Add Debug Info', 'flag': '-g', 'target': 'Button3'},
-        {'name': 'Run in debug mode', 'flag': '-debug', 'target': 'Button6'}]    )
-        }
-    }
-}
 
 # --- Helper Classes ---
 
@@ -463,16 +198,33 @@ class UpdateSuccessDialog(CustomDialog):
 
 
 class AnsiColorHandler:
-    """Processes ANSI color codes for display in a Tkinter Text widget."""
+    """Streaming ANSI parser for the Status Window.
+
+    Process output arrives in arbitrary chunks, so the SGR state (bold,
+    foreground, background) is kept between calls and an escape sequence cut
+    off at the end of a chunk is held back until the rest of it arrives. The
+    8/16-color, 256-color and truecolor forms are supported for foreground
+    and background. Other escape sequences (cursor movement, window titles)
+    and carriage returns are dropped. Color tags are configured on first use,
+    and both the tag tuple for each state and the result of each SGR sequence
+    seen in a given state are cached.
+    """
+    SEQUENCE_RE = re.compile(r'\x1B\[([0-9;:?<=>]*)[ -/]*([@-~])|\x1B\][^\x07\x1B]*(?:\x07|\x1B\\)|\x1B[ -/]*[0-Z\\^-~]')
+    PARTIAL_RE = re.compile(r'\x1B(?:\[[0-9;:?<=>]*[ -/]*|\][^\x07\x1B]*\x1B?|[ -/]*)\Z')
+    MAX_PENDING = 256 # Longest incomplete sequence held back between chunks
+    BASIC_COLORS = ('black', 'red', 'green', 'yellow', 'blue', 'magenta', 'cyan', 'white')
+    BRIGHT_COLORS = ('#7f7f7f', '#ff0000', '#00ff00', '#ffff00', '#5c5cff', '#ff00ff', '#00ffff', '#ffffff')
+    CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+
     def __init__(self, text_widget):
         self.text_widget = text_widget
-        self.ansi_escape = re.compile(r'\x1B\[([0-9;?]*)m')
-        self.light_map = {'30': 'black', '31': 'red', '32': 'green', '33': 'yellow', '34': 'blue', '35': 'magenta', '36': 'cyan', '37': 'white'}
+        self.configured_tags = set()
+        self.tag_cache = {} # state -> tag tuple
+        self.transitions = {} # (state, SGR params) -> (new state, tag tuple)
         self.setup_tags()
+        self.reset()
 
     def setup_tags(self):
-        for code, color in self.light_map.items():
-            self.text_widget.tag_configure(f"ansi_{color}", foreground=color)
         try:
             bold_font = tkfont.Font(self.text_widget, self.text_widget.cget("font"))
             bold_font.configure(weight="bold")
@@ -480,25 +232,246 @@ class AnsiColorHandler:
         except tk.TclError:
             pass
 
+    def new_stream(self):
+        """Returns a parser for another output stream, sharing this one's tags and caches."""
+        stream = copy.copy(self)
+        stream.reset()
+        return stream
+
+    def reset(self):
+        """Forgets the SGR state and any held-back partial sequence, e.g. when a process ends."""
+        self.state = (False, None, None) # bold, foreground, background
+        self.tags = ()
+        self.pending = ''
+
     def write(self, text):
-        text = re.sub(r'\x1B\[[0-9;?]*[HJK]', '', text).replace('\r', '')
-        segments = self.ansi_escape.split(text)
-        current_tags = []
-        for i, segment in enumerate(segments):
-            if i % 2 == 0:
-                if segment:
-                    self.text_widget.insert(tk.END, segment, tuple(current_tags))
+        runs = self.parse(text)
+        if runs: self.text_widget.insert(tk.END, *runs)
+
+    def parse(self, text):
+        """Returns a flat [text, tags, text, tags, ...] list ready for Text.insert()."""
+        if self.pending:
+            text, self.pending = self.pending + text, ''
+        text = text.replace('\r', '')
+        tags = self.tags
+        if '\x1B' not in text:
+            return [text, tags] if text else []
+
+        esc = text.rfind('\x1B', max(0, len(text) - self.MAX_PENDING))
+        if esc != -1 and (partial := self.PARTIAL_RE.match(text, esc)):
+            self.pending, text = partial.group(), text[:esc]
+
+        # split() yields [text, params, final, text, params, final, ..., text]
+        parts = self.SEQUENCE_RE.split(text)
+        runs, state, transitions = [], self.state, self.transitions
+        for i in range(0, len(parts) - 1, 3):
+            if segment := parts[i]:
+                if runs and runs[-1] is tags: runs[-2] += segment
+                else: runs += (segment, tags)
+            if parts[i + 2] == 'm':
+                key = (state, parts[i + 1])
+                if (step := transitions.get(key)) is None:
+                    if len(transitions) > 4096: transitions.clear()
+                    new_state = self.apply_sgr(state, parts[i + 1])
+                    step = transitions[key] = (new_state, self.tag_cache.get(new_state) or self.build_tags(new_state))
+                state, tags = step
+        if segment := parts[-1]:
+            if runs and runs[-1] is tags: runs[-2] += segment
+            else: runs += (segment, tags)
+        self.state, self.tags = state, tags
+        return runs
+
+    def apply_sgr(self, state, params):
+        """Returns the (bold, fg, bg) state after applying one SGR parameter string."""
+        codes = params.replace(':', ';').split(';')
+        bold, fg, bg = state
+        i = 0
+        while i < len(codes):
+            code = codes[i] or '0'
+            i += 1
+            if not code.isdigit(): continue
+            n = int(code)
+            if n == 0: bold, fg, bg = False, None, None
+            elif n == 1: bold = True
+            elif n == 22: bold = False
+            elif 30 <= n <= 37: fg = self.BASIC_COLORS[n - 30]
+            elif 90 <= n <= 97: fg = self.BRIGHT_COLORS[n - 90]
+            elif n == 39: fg = None
+            elif 40 <= n <= 47: bg = self.BASIC_COLORS[n - 40]
+            elif 100 <= n <= 107: bg = self.BRIGHT_COLORS[n - 100]
+            elif n == 49: bg = None
+            elif n in (38, 48):
+                color, mode = None, codes[i] if i < len(codes) else ''
+                try:
+                    if mode == '5' and i + 1 < len(codes):
+                        if 0 <= (index := int(codes[i + 1])) <= 255: color = self.color_256(index)
+                        i += 2
+                    elif mode == '2' and i + 3 < len(codes):
+                        r, g, b = (int(c) & 0xff for c in codes[i + 1:i + 4])
+                        color = f"#{r:02x}{g:02x}{b:02x}"
+                        i += 4
+                except ValueError:
+                    pass
+                if color and n == 38: fg = color
+                elif color: bg = color
+        return (bold, fg, bg)
+
+    def color_256(self, index):
+        if index < 8: return self.BASIC_COLORS[index]
+        if index < 16: return self.BRIGHT_COLORS[index - 8]
+        if index < 232:
+            index -= 16
+            levels = self.CUBE_LEVELS
+            return f"#{levels[index // 36]:02x}{levels[index // 6 % 6]:02x}{levels[index % 6]:02x}"
+        gray = 8 + 10 * (index - 232)
+        return f"#{gray:02x}{gray:02x}{gray:02x}"
+
+    def build_tags(self, state):
+        bold, fg, bg = state
+        names = []
+        if fg: names.append(self.color_tag(fg, 'foreground'))
+        if bg: names.append(self.color_tag(bg, 'background'))
+        if bold: names.append("ansi_bold")
+        self.tag_cache[state] = tags = tuple(names)
+        return tags
+
+    def color_tag(self, color, option):
+        # Plain foreground colors keep the tag names used before 256-color support
+        if option == 'foreground': name = f"ansi_{color.lstrip('#')}" if color in self.BASIC_COLORS else f"ansi_fg_{color.lstrip('#')}"
+        else: name = f"ansi_bg_{color.lstrip('#')}"
+        if name not in self.configured_tags:
+            self.text_widget.tag_configure(name, **{option: color})
+            self.configured_tags.add(name)
+        return name
+
+
+class StatusRenderer:
+    """Drains the output queue into the Status Window once per frame.
+
+    The queue holds tagged log lines ((text, tag) tuples), raw text (str) and
+    process output as (job, text) tuples, with text None once a job's output
+    ends. Everything available is taken in one go, adjacent chunks from the
+    same source are joined and parsed for ANSI codes together, and the whole
+    frame goes into the Text widget with a single insert() and see(). Each
+    job gets its own ANSI parser so colors don't leak between jobs. With
+    `prefix_jobs` set, every line of job output starts with a colored
+    "[id:name]" prefix, and a partial line is ended before another source
+    writes, so parallel jobs interleave line by line.
+
+    The tick interval drops to STATUS_TICK_MIN_MS while output is streaming
+    and backs off to STATUS_TICK_MAX_MS when idle. If a Scrollback is given,
+    the widget is trimmed from the top in the same transaction whenever it
+    evicts lines.
+    """
+    PREFIX_COLORS = ('#5fafff', '#d7af5f', '#af87ff', '#5fd7af', '#ff8787', '#87d75f')
+
+    def __init__(self, root, text_widget, ansi_handler, output_queue, scrollback=None):
+        self.root = root
+        self.text_widget = text_widget
+        self.ansi_handler = ansi_handler
+        self.output_queue = output_queue
+        self.scrollback = scrollback
+        self.prefix_jobs = False
+        self.streams = {} # job id -> AnsiColorHandler
+        self.line_start = {} # job id -> True if the job's next output starts a new line
+        self.open_line = None # Source whose unfinished line is at the end of the widget
+        self.interval = STATUS_TICK_MAX_MS
+        self.stats = {'frames': 0, 'chars': 0, 'lines': 0, 'trimmed': 0}
+
+    def start(self):
+        self.root.after(self.interval, self.tick)
+
+    def tick(self):
+        rendered = 0
+        try:
+            rendered = self.render_pending()
+        finally:
+            if not self.output_queue.empty(): self.interval = STATUS_TICK_MIN_MS # Frame budget hit, backlog left
+            elif rendered: self.interval = max(STATUS_TICK_MIN_MS, self.interval // 2)
+            else: self.interval = min(STATUS_TICK_MAX_MS, self.interval * 2)
+            if self.root.winfo_exists(): self.root.after(self.interval, self.tick)
+
+    def drain(self):
+        """Takes up to one frame's worth of queued items as [source, tag, text] entries, merging adjacent chunks."""
+        entries, size = [], 0
+        while size < STATUS_FRAME_BUDGET:
+            try: item = self.output_queue.get_nowait()
+            except queue.Empty: break
+            if isinstance(item, str): source, tag, text = 'raw', None, item
+            elif isinstance(item[0], str): source, tag, text = 'log', item[1], item[0] + '\n'
+            else: (source, text), tag = item, None
+            if text is None:
+                entries.append([source, None, None])
+                continue
+            size += len(text)
+            last = entries[-1] if entries else None
+            if last and source != 'log' and last[0] is source and last[2] is not None: last[2] += text
+            else: entries.append([source, tag, text])
+        return entries, size
+
+    def render_pending(self):
+        entries, size = self.drain()
+        if not entries: return 0
+
+        runs = []
+        for source, tag, text in entries:
+            if source == 'log': self.append(runs, source, [text, (tag,) if tag else ()])
+            elif source == 'raw': self.append(runs, source, self.ansi_handler.parse(text))
+            elif text is None: self.end_stream(source)
             else:
-                if segment == '0' or not segment:
-                    current_tags = []
-                    continue
-                for p in segment.split(';'):
-                    if p in self.light_map:
-                        current_tags = [t for t in current_tags if not (t.startswith('ansi_') and t != 'ansi_bold')]
-                        current_tags.append(f"ansi_{self.light_map[p]}")
-                    elif p == '1':
-                        if "ansi_bold" not in current_tags:
-                            current_tags.append("ansi_bold")
+                parser = self.streams.get(source.id) or self.streams.setdefault(source.id, self.ansi_handler.new_stream())
+                chunk = parser.parse(text)
+                if self.prefix_jobs: chunk = self.prefix_lines(source, chunk)
+                self.append(runs, source.id, chunk)
+        if not runs: return size
+
+        trim = self.scrollback.append(runs) if self.scrollback else 0
+        self.text_widget.config(state='normal')
+        self.text_widget.insert(tk.END, *runs)
+        if trim: self.text_widget.delete('1.0', f'{trim + 1}.0')
+        self.text_widget.see(tk.END)
+        self.text_widget.config(state='disabled')
+
+        self.stats['frames'] += 1
+        self.stats['trimmed'] += trim
+        self.stats['chars'] += size
+        self.stats['lines'] += sum(run.count('\n') for run in runs[::2])
+        return size
+
+    def append(self, runs, source, chunk):
+        if not chunk: return
+        if self.prefix_jobs and self.open_line not in (None, source):
+            runs += ('\n', ())
+            if self.open_line in self.line_start: self.line_start[self.open_line] = True
+        runs += chunk
+        self.open_line = None if chunk[-2].endswith('\n') else source
+
+    def prefix_lines(self, job, runs):
+        prefix, prefix_tags = f"[{job.label}] ", (self.prefix_tag(job),)
+        at_start = self.line_start.get(job.id, True)
+        out = []
+        for i in range(0, len(runs), 2):
+            pieces = runs[i].split('\n')
+            for n, piece in enumerate(pieces):
+                if n < len(pieces) - 1: piece += '\n'
+                if not piece: continue
+                if at_start: out += (prefix, prefix_tags)
+                out += (piece, runs[i + 1])
+                at_start = piece.endswith('\n')
+        self.line_start[job.id] = at_start
+        return out
+
+    def prefix_tag(self, job):
+        name = f"job_prefix_{job.id % len(self.PREFIX_COLORS)}"
+        if name not in self.ansi_handler.configured_tags:
+            self.text_widget.tag_configure(name, foreground=self.PREFIX_COLORS[job.id % len(self.PREFIX_COLORS)])
+            self.ansi_handler.configured_tags.add(name)
+        return name
+
+    def end_stream(self, job):
+        self.streams.pop(job.id, None)
+        self.line_start.pop(job.id, None)
+
 
 class AutoTyperProfileEditor(tk.Toplevel):
     """A Toplevel window for creating and managing Auto-Typer profiles."""
@@ -507,11 +480,15 @@ class AutoTyperProfileEditor(tk.Toplevel):
         self.transient(parent)
         self.grab_set()
         self.title("Auto-Typer Profile Editor")
+        started = time.perf_counter()
         self.app = app_controller
         self.on_close_callback = on_close_callback
         self.command_rows = defaultdict(list)
+        self.row_pool = defaultdict(list) # Hidden rows per tab, rebound to the next command instead of rebuilt
+        self.tab_items = {} # The loaded profile's commands per tab; a tab's rows are built the first time it is shown
         self.tab_name_vars = {}
         self.tab_column_vars = {}
+        self.loading_rows = False
 
         saved_geom = self.app.config.get('Geometry', {}).get('autotyper_profile_editor')
         if not saved_geom or saved_geom == '':
@@ -528,8 +505,10 @@ class AutoTyperProfileEditor(tk.Toplevel):
         
         self.populate_profile_list()
         self.load_profile_data()
+        self.build_selected_tab()
         
         self.protocol("WM_DELETE_WINDOW", self.save_and_close)
+        self.app.log_window_opened(self, started)
 
     def create_top_bar(self, parent):
         frame = ttk.LabelFrame(parent, text="Profile Management", padding=10)
@@ -549,6 +528,16 @@ class AutoTyperProfileEditor(tk.Toplevel):
         ttk.Button(button_frame, text="Rename", command=self.rename_profile).pack(side='left', padx=2)
         ttk.Button(button_frame, text="Delete", command=self.delete_profile, style="Danger.TButton").pack(side='left', padx=2)
 
+        expect_frame = ttk.Frame(frame)
+        expect_frame.grid(row=1, column=0, columnspan=3, sticky='ew', pady=(8, 0))
+        expect_frame.columnconfigure(1, weight=1)
+        ttk.Label(expect_frame, text="Prompt (regex, empty = fixed delays):").grid(row=0, column=0, sticky='w')
+        self.prompt_var = tk.StringVar()
+        ttk.Entry(expect_frame, textvariable=self.prompt_var).grid(row=0, column=1, sticky='ew', padx=5)
+        ttk.Label(expect_frame, text="Step Timeout (s):").grid(row=0, column=2, sticky='w', padx=(10, 0))
+        self.step_timeout_var = tk.StringVar()
+        ttk.Entry(expect_frame, textvariable=self.step_timeout_var, width=6).grid(row=0, column=3, sticky='w', padx=5)
+
     def create_editor_area(self, parent):
         container = ttk.Frame(parent)
         container.grid(row=1, column=0, sticky='nsew')
@@ -563,13 +552,18 @@ class AutoTyperProfileEditor(tk.Toplevel):
 
         self.notebook = ttk.Notebook(left_side)
         self.notebook.pack(fill='both', expand=True)
+        self.tab_containers = {}
         self.tab_frames = {}
 
+        # Only the tab containers are made here; build_selected_tab fills a tab the first time it is shown
         for i in range(1, 6):
             tab_key = f'Step {i}'
-            tab_container = ttk.Frame(self.notebook, padding=10)
-            self.notebook.add(tab_container, text=tab_key)
-            self.tab_frames[tab_key] = self.create_tab_content(tab_container, tab_key)
+            self.tab_name_vars[tab_key] = tk.StringVar()
+            self.tab_column_vars[tab_key] = tk.IntVar(value=1)
+            self.tab_items[tab_key] = []
+            self.tab_containers[tab_key] = ttk.Frame(self.notebook, padding=10)
+            self.notebook.add(self.tab_containers[tab_key], text=tab_key)
+        self.notebook.bind("<<NotebookTabChanged>>", self.build_selected_tab)
         
         # --- Bottom Buttons ---
         button_frame = ttk.Frame(left_side)
@@ -589,13 +583,11 @@ class AutoTyperProfileEditor(tk.Toplevel):
         top_frame.columnconfigure(1, weight=1)
         
         ttk.Label(top_frame, text="Step Name:").grid(row=0, column=0, sticky='w')
-        self.tab_name_vars[tab_key] = tk.StringVar()
         name_entry = ttk.Entry(top_frame, textvariable=self.tab_name_vars[tab_key])
         name_entry.grid(row=0, column=1, sticky='ew', padx=(5,10))
         name_entry.bind("<FocusOut>", self.save_profile_data)
 
         ttk.Label(top_frame, text="Display Column:").grid(row=0, column=2, sticky='w')
-        self.tab_column_vars[tab_key] = tk.IntVar(value=1)
         col_combo = ttk.Combobox(top_frame, textvariable=self.tab_column_vars[tab_key], values=[1, 2, 3], state='readonly', width=5)
         col_combo.grid(row=0, column=3, sticky='w', padx=5)
         col_combo.bind("<<ComboboxSelected>>", self.save_profile_data)
@@ -622,6 +614,29 @@ class AutoTyperProfileEditor(tk.Toplevel):
         
         return scrollable_frame
 
+    def build_selected_tab(self, *args):
+        tab_key = self.notebook.tab(self.notebook.select(), 'text')
+        if tab_key in self.tab_frames: return
+        self.tab_frames[tab_key] = self.create_tab_content(self.tab_containers[tab_key], tab_key)
+        self.bind_tab_rows(tab_key)
+
+    def bind_tab_rows(self, tab_key):
+        """Shows the tab's commands, rebinding rows from the pool before creating new ones."""
+        for row in self.command_rows[tab_key]:
+            row['frame'].pack_forget()
+        self.row_pool[tab_key].extend(reversed(self.command_rows[tab_key]))
+        self.command_rows[tab_key].clear()
+        for cmd_item in self.tab_items[tab_key]:
+            self.add_command_row(tab_key, self.tab_frames[tab_key], cmd_item)
+
+    def refresh_button_names(self):
+        toolchain = self.app.config.get('Toolchains', {}).get(self.app.toolchain_type.get()) or Toolchain()
+        self.button_display_map = {
+            (toolchain.button(f'Button{i}').name or f'Button{i}'): f'Button{i}'
+            for i in range(1, 11)
+        }
+        self.button_key_map = {v: k for k, v in self.button_display_map.items()}
+
     def create_legend(self, parent):
         frame = ttk.LabelFrame(parent, text="Placeholders", padding=10)
         frame.grid(row=0, column=1, sticky='nsw', padx=(10,0))
@@ -634,44 +649,42 @@ class AutoTyperProfileEditor(tk.Toplevel):
             ttk.Label(frame, text=f"{key}:", font=('Helvetica', 10, 'bold')).grid(row=i, column=0, sticky='e', pady=1)
             ttk.Label(frame, text=desc).grid(row=i, column=1, sticky='w', padx=5)
 
-    def add_command_row(self, tab_key, parent_frame, data=None):
-        if data is None: data = {'label': 'Button1', 'command': '', 'enabled': 'False', 'text': ''}
-        
+    def add_command_row(self, tab_key, parent_frame, item=None):
+        if item is None: item = StepCommand()
+
+        if self.row_pool[tab_key]:
+            row = self.row_pool[tab_key].pop()
+        else:
+            row = self.create_command_row(tab_key, parent_frame)
+        row['item'] = item
+
+        self.loading_rows = True
+        row['vars']['label'].set(item.label)
+        row['vars']['command'].set(item.command)
+        row['combo']['values'] = sorted(self.button_display_map)
+        row['display'].set(self.button_key_map.get(item.label, item.label))
+        self.loading_rows = False
+
+        row['frame'].pack(fill='x', expand=True)
+        self.command_rows[tab_key].append(row)
+
+    def create_command_row(self, tab_key, parent_frame):
         row_frame = ttk.Frame(parent_frame, padding=(0, 3))
-        row_frame.pack(fill='x', expand=True)
         row_frame.columnconfigure(2, weight=1) # Label
         row_frame.columnconfigure(4, weight=1) # Command
 
-        label_var = tk.StringVar(value=data.get('label', 'Button1'))
-        cmd_var = tk.StringVar(value=data.get('command', ''))
-        
-        # --- Get current button names for the dropdown ---
-        toolchain_name = self.app.toolchain_type.get()
-        toolchain_data = self.app.config.get('Toolchains', {}).get(toolchain_name, {})
-        try:
-            buttons_data = ast.literal_eval(toolchain_data.get('custom_buttons', '{}'))
-        except (ValueError, SyntaxError):
-            buttons_data = {}
-        
-        self.button_display_map = {
-            (buttons_data.get(f'Button{i}', {}).get('name') or f'Button{i}'): f'Button{i}'
-            for i in range(1, 11)
-        }
-        self.button_key_map = {v: k for k, v in self.button_display_map.items()}
+        label_var = tk.StringVar()
+        cmd_var = tk.StringVar()
+        label_display_var = tk.StringVar()
 
         def on_label_select(*args):
-            display_name = label_display_var.get()
-            actual_key = self.button_display_map.get(display_name)
+            if self.loading_rows: return
+            actual_key = self.button_display_map.get(label_display_var.get())
             if actual_key:
                 label_var.set(actual_key)
             self.save_profile_data()
 
-        label_display_var = tk.StringVar()
-        initial_key = label_var.get()
-        initial_display = self.button_key_map.get(initial_key, initial_key)
-        label_display_var.set(initial_display)
-        
-        label_combo = ttk.Combobox(row_frame, textvariable=label_display_var, values=sorted(list(self.button_display_map.keys())), state='readonly', width=15)
+        label_combo = ttk.Combobox(row_frame, textvariable=label_display_var, state='readonly', width=15)
         cmd_entry = ttk.Entry(row_frame, textvariable=cmd_var)
         
         label_display_var.trace_add('write', on_label_select)
@@ -687,8 +700,9 @@ class AutoTyperProfileEditor(tk.Toplevel):
         ttk.Button(btn_frame, text="▲", width=2, command=lambda f=row_frame, k=tab_key: self.move_row(f, k, -1)).pack(side='left')
         ttk.Button(btn_frame, text="▼", width=2, command=lambda f=row_frame, k=tab_key: self.move_row(f, k, 1)).pack(side='left')
         ttk.Button(btn_frame, text="X", width=2, style="Danger.TButton", command=lambda f=row_frame, k=tab_key: self.delete_row(f, k)).pack(side='left', padx=(5,0))
-        
-        self.command_rows[tab_key].append({'frame': row_frame, 'vars': {'label': label_var, 'command': cmd_var}})
+
+        return {'frame': row_frame, 'item': None, 'combo': label_combo, 'display': label_display_var,
+                'vars': {'label': label_var, 'command': cmd_var}}
 
     def populate_profile_list(self):
         # Filter out undeletable items from the list shown to the user
@@ -706,68 +720,48 @@ class AutoTyperProfileEditor(tk.Toplevel):
             self.profile_var.set("") # Clear if no user profiles exist
 
     def load_profile_data(self, *args):
-        # Clear existing UI
-        for key in self.command_rows:
-            for row in self.command_rows[key]:
-                row['frame'].destroy()
-            self.command_rows[key].clear()
-
+        self.refresh_button_names()
         profile_name = self.profile_var.get()
-        if not profile_name: return
-
-        try:
-            profile_str = self.app.config.get('AutoTyperProfiles', {}).get(profile_name, '{}')
-            profile_data = ast.literal_eval(profile_str)
-        except (ValueError, SyntaxError):
-            profile_data = {}
-
-        for tab_key, tab_frame in self.tab_frames.items():
-            data = profile_data.get(tab_key, {})
-            self.tab_name_vars[tab_key].set(data.get('name', tab_key))
-            self.tab_column_vars[tab_key].set(data.get('column', 1))
-            for cmd_item in data.get('commands', []):
-                self.add_command_row(tab_key, tab_frame, cmd_item)
+        profile = self.app.config.get('AutoTyperProfiles', {}).get(profile_name) if profile_name else None
+        if profile_name:
+            profile = profile or AutoTyperProfile()
+            self.prompt_var.set(profile.prompt)
+            self.step_timeout_var.set(f"{profile.step_timeout:g}")
+
+        for tab_key in self.tab_containers:
+            step = profile.steps.get(tab_key) or Step(tab_key) if profile else None
+            self.tab_items[tab_key] = list(step.commands) if step else []
+            if step:
+                self.tab_name_vars[tab_key].set(step.name)
+                self.tab_column_vars[tab_key].set(step.column)
+            if tab_key in self.tab_frames:
+                self.bind_tab_rows(tab_key)
 
     def save_profile_data(self, *args):
         profile_name = self.profile_var.get()
         if not profile_name: return
 
-        try:
-            current_profile_str = self.app.config.get('AutoTyperProfiles', {}).get(profile_name, '{}')
-            current_profile_data = ast.literal_eval(current_profile_str)
-        except (ValueError, SyntaxError):
-            current_profile_data = {}
-            
-        master_enabled_state = current_profile_data.get('master_enabled', 'False')
-
-        new_profile_data = {'master_enabled': master_enabled_state}
-        for tab_key, rows in self.command_rows.items():
-            old_commands = current_profile_data.get(tab_key, {}).get('commands', [])
-            
-            new_commands = []
-            for i, r in enumerate(rows):
-                new_cmd = {
-                    'label': r['vars']['label'].get(), 
-                    'command': r['vars']['command'].get()
-                }
-                if i < len(old_commands):
-                    new_cmd['enabled'] = old_commands[i].get('enabled', 'False')
-                    new_cmd['text'] = old_commands[i].get('text', '')
-                else: # New command
-                    new_cmd['enabled'] = 'False'
-                    new_cmd['text'] = ''
-                new_commands.append(new_cmd)
-
-            new_profile_data[tab_key] = {
-                'name': self.tab_name_vars[tab_key].get(),
-                'column': self.tab_column_vars[tab_key].get(),
-                'commands': new_commands
-            }
-        
-        self.app.config['AutoTyperProfiles'][profile_name] = str(new_profile_data)
-        self.app.save_config() # Save immediately
+        profile = self.app.config['AutoTyperProfiles'].setdefault(profile_name, AutoTyperProfile())
+        profile.prompt = self.prompt_var.get().strip()
+        try: profile.step_timeout = max(0.1, float(self.step_timeout_var.get()))
+        except ValueError: pass
+        for tab_key in self.tab_containers:
+            # The row items are the profile's own StepCommand objects, so the
+            # enabled/text state set in the Settings window travels with them.
+            # A tab that was never shown has no rows and keeps its commands as loaded.
+            if tab_key in self.tab_frames:
+                for r in self.command_rows[tab_key]:
+                    r['item'].label = r['vars']['label'].get()
+                    r['item'].command = r['vars']['command'].get()
+                self.tab_items[tab_key] = [r['item'] for r in self.command_rows[tab_key]]
+
+            profile.steps[tab_key] = Step(self.tab_name_vars[tab_key].get(), self.tab_column_vars[tab_key].get(),
+                                          list(self.tab_items[tab_key]))
+        
+        self.app.save_config('AutoTyperProfiles')
 
     def add_new_profile(self):
+        from tkinter import simpledialog # Loaded on first use, not at startup
         new_name = simpledialog.askstring("New Profile", "Enter a name for the new profile:", parent=self)
         if not new_name or not new_name.strip(): return
         new_name = new_name.strip()
@@ -780,9 +774,8 @@ class AutoTyperProfileEditor(tk.Toplevel):
             messagebox.showerror("Error", f"Profile '{new_name}' already exists.", parent=self)
             return
 
-        blank_profile = {'master_enabled': 'False', **{f'Step {i}': {'name': f'Step {i}', 'column': 1, 'commands': []} for i in range(1, 6)}}
-        self.app.config['AutoTyperProfiles'][new_name] = str(blank_profile)
-        self.app.save_config()
+        self.app.config['AutoTyperProfiles'][new_name] = AutoTyperProfile.blank()
+        self.app.save_config('AutoTyperProfiles')
         self.populate_profile_list()
         self.profile_var.set(new_name)
         self.load_profile_data()
@@ -797,6 +790,7 @@ class AutoTyperProfileEditor(tk.Toplevel):
             messagebox.showerror("Error", "Cannot copy a reserved profile.", parent=self)
             return
 
+        from tkinter import simpledialog
         while True:
             new_name = simpledialog.askstring("Copy Profile", "Enter a new name for the copied profile:", parent=self)
 
@@ -821,9 +815,9 @@ class AutoTyperProfileEditor(tk.Toplevel):
                 continue
 
             # If all checks pass, copy the profile
-            profile_data_to_copy = self.app.config['AutoTyperProfiles'][old_name]
+            profile_data_to_copy = copy.deepcopy(self.app.config['AutoTyperProfiles'][old_name])
             self.app.config['AutoTyperProfiles'][new_name] = profile_data_to_copy
-            self.app.save_config()
+            self.app.save_config('AutoTyperProfiles')
             
             self.populate_profile_list()
             self.profile_var.set(new_name)
@@ -838,6 +832,7 @@ class AutoTyperProfileEditor(tk.Toplevel):
             messagebox.showerror("Error", "Cannot rename a reserved profile.", parent=self)
             return
         
+        from tkinter import simpledialog
         new_name = simpledialog.askstring("Rename Profile", f"Enter new name for '{old_name}':", initialvalue=old_name, parent=self)
         if not new_name or not new_name.strip() or new_name == old_name: return
         new_name = new_name.strip()
@@ -856,11 +851,11 @@ class AutoTyperProfileEditor(tk.Toplevel):
         if self.app.config.get('Options', {}).get('active_auto_typer_profile') == old_name:
             self.app.config['Options']['active_auto_typer_profile'] = new_name
 
-        for toolchain_key, toolchain_data in self.app.config.get('Toolchains', {}).items():
-            if toolchain_data.get('autotyper_profile') == old_name:
-                self.app.config['Toolchains'][toolchain_key]['autotyper_profile'] = new_name
+        for toolchain in self.app.config.get('Toolchains', {}).values():
+            if toolchain.autotyper_profile == old_name:
+                toolchain.autotyper_profile = new_name
                 
-        self.app.save_config()
+        self.app.save_config('AutoTyperProfiles', 'Options', 'Toolchains')
         
         self.populate_profile_list()
         self.profile_var.set(new_name)
@@ -880,11 +875,11 @@ class AutoTyperProfileEditor(tk.Toplevel):
             if self.app.config.get('Options', {}).get('active_auto_typer_profile') == profile_name:
                 self.app.config['Options']['active_auto_typer_profile'] = '-- No Profile Selected --'
 
-            for toolchain_key in list(self.app.config.get('Toolchains', {}).keys()):
-                if self.app.config['Toolchains'][toolchain_key].get('autotyper_profile') == profile_name:
-                    self.app.config['Toolchains'][toolchain_key]['autotyper_profile'] = '-- No Profile Selected --'
+            for toolchain in self.app.config.get('Toolchains', {}).values():
+                if toolchain.autotyper_profile == profile_name:
+                    toolchain.autotyper_profile = '-- No Profile Selected --'
             
-            self.app.save_config()
+            self.app.save_config('AutoTyperProfiles', 'Options', 'Toolchains')
 
             self.populate_profile_list()
             self.profile_var.set(self.profile_combo['values'][0] if self.profile_combo['values'] else '')
@@ -893,8 +888,9 @@ class AutoTyperProfileEditor(tk.Toplevel):
     def delete_row(self, row_frame, tab_key):
         row_to_delete = next((r for r in self.command_rows[tab_key] if r['frame'] == row_frame), None)
         if row_to_delete:
-            row_to_delete['frame'].destroy()
+            row_to_delete['frame'].pack_forget()
             self.command_rows[tab_key].remove(row_to_delete)
+            self.row_pool[tab_key].append(row_to_delete)
             self.save_profile_data()
 
     def move_row(self, row_frame, tab_key, direction):
@@ -914,7 +910,7 @@ class AutoTyperProfileEditor(tk.Toplevel):
     def save_and_close(self):
         self.save_profile_data()
         self.app.config['Geometry']['autotyper_profile_editor'] = self.geometry()
-        self.app.save_config()
+        self.app.save_config('Geometry')
         if self.on_close_callback:
             self.on_close_callback()
         self.destroy()
@@ -925,6 +921,7 @@ class SettingsWindow(tk.Toplevel):
         super().__init__(parent)
         self.transient(parent)
         self.title("Global Settings")
+        started = time.perf_counter()
         self.app = app_controller
         self.on_close_callback = on_close_callback
         
@@ -935,7 +932,8 @@ class SettingsWindow(tk.Toplevel):
 
         self.vars = {}
         self.clean_vars = {}
-        self.autotyper_state_vars = {} 
+        self.autotyper_columns = [] # Step frames per column, each with its command rows; reused on profile changes
+        self.loading_autotyper = False
         self.master_switch_var = tk.BooleanVar()
         
         main_frame = ttk.Frame(self, padding=10)
@@ -974,12 +972,13 @@ class SettingsWindow(tk.Toplevel):
         ttk.Button(button_frame, text="Save & Close", command=self.save_and_close, style="Save.TButton").pack()
         
         self.protocol("WM_DELETE_WINDOW", self.save_and_close)
-        self.load_settings_into_ui()
+        self.load_settings_into_ui(defer_autotyper=True)
+        self.app.log_window_opened(self, started)
 
     def create_paths_frame(self, parent):
         frame = ttk.LabelFrame(parent, text="Paths to Tools", padding=10)
         frame.columnconfigure(1, weight=1)
-        paths = self.app.get_default_config()['Paths'].keys()
+        paths = DEFAULT_CONFIG['Paths'].keys()
         for i, key in enumerate(p for p in paths if not p.startswith('last_')):
             ttk.Label(frame, text=f"{key.replace('_', ' ').title()}:").grid(row=i, column=0, sticky='w', pady=2)
             self.vars[key] = tk.StringVar(name=f"settings_path_{key}")
@@ -1014,7 +1013,10 @@ class SettingsWindow(tk.Toplevel):
         self.dynamic_autotyper_frame.columnconfigure(0, weight=1)
         self.dynamic_autotyper_frame.columnconfigure(1, weight=1)
         self.dynamic_autotyper_frame.columnconfigure(2, weight=1)
-
+        for i in range(3):
+            column = ttk.Frame(self.dynamic_autotyper_frame)
+            column.grid(row=0, column=i, sticky='new', padx=(0, 10) if i < 2 else 0)
+            self.autotyper_columns.append({'frame': column, 'steps': []})
 
         self.dynamic_autotyper_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
         canvas.create_window((0, 0), window=self.dynamic_autotyper_frame, anchor="nw")
@@ -1042,86 +1044,79 @@ class SettingsWindow(tk.Toplevel):
         return frame
 
     def rebuild_dynamic_autotyper_ui(self, *args):
-        for widget in self.dynamic_autotyper_frame.winfo_children():
-            widget.destroy()
-        self.autotyper_state_vars.clear()
-
         new_profile = self.vars['active_auto_typer_profile'].get()
-        if not new_profile: return
+        if not new_profile:
+            for column in self.autotyper_columns: self._hide_after(column['steps'], 0)
+            return
         
         self.app.config['Options']['active_auto_typer_profile'] = new_profile
         
         current_toolchain = self.app.toolchain_type.get()
         if current_toolchain and current_toolchain not in UNDELETABLE_ITEMS.get('Toolchains', {}):
-            self.app.config['Toolchains'][current_toolchain]['autotyper_profile'] = new_profile
+            self.app.config['Toolchains'][current_toolchain].autotyper_profile = new_profile
             
-        self.app.save_config()
+        self.app.save_config('Options', 'Toolchains')
 
-        try:
-            profile_data_str = self.app.config.get('AutoTyperProfiles', {}).get(new_profile, '{}')
-            profile_data = ast.literal_eval(profile_data_str)
-        except (ValueError, SyntaxError):
-            profile_data = {}
-            
-        is_master_enabled = profile_data.get('master_enabled', 'False').lower() == 'true'
-        self.master_switch_var.set(is_master_enabled)
+        profile = self.app.config.get('AutoTyperProfiles', {}).get(new_profile) or AutoTyperProfile()
+        self.master_switch_var.set(profile.master_enabled)
 
-        columns = [ttk.Frame(self.dynamic_autotyper_frame) for _ in range(3)]
-        for i, col in enumerate(columns):
-            col.grid(row=0, column=i, sticky='new', padx=(0, 10) if i < 2 else 0)
-        
         steps_by_column = defaultdict(list)
-        for step_key, step_data in sorted(profile_data.items()):
-            if not isinstance(step_data, dict): continue
-            steps_by_column[step_data.get('column', 1)].append((step_key, step_data))
-
-        toolchain_name = self.app.toolchain_type.get()
-        toolchain_data = self.app.config.get('Toolchains', {}).get(toolchain_name, {})
-        try:
-            buttons_data = ast.literal_eval(toolchain_data.get('custom_buttons', '{}'))
-        except (ValueError, SyntaxError):
-            buttons_data = {}
-
-        for col_num, steps in sorted(steps_by_column.items()):
-            parent_col = columns[col_num - 1]
-            for step_key, step in steps:
-                if not step.get('commands'): continue
-
-                step_frame = ttk.LabelFrame(parent_col, text=step.get('name', step_key), padding=5)
-                step_frame.pack(fill='x', expand=True, pady=(0, 10))
-                
-                for j, command_item in enumerate(step.get('commands', [])):
-                    label_key = command_item.get('label', 'Button1')
-                    command_str = command_item.get('command', '')
-                    label_button_name = buttons_data.get(label_key, {}).get('name', label_key) or label_key
-
-                    row_frame = ttk.Frame(step_frame); row_frame.pack(fill='x', pady=1)
-
-                    is_enabled = command_item.get('enabled', 'False').lower() == 'true'
-                    check_var = tk.BooleanVar(value=is_enabled)
-                    ttk.Checkbutton(row_frame, variable=check_var).pack(side='left')
-                    
-                    key = (new_profile, step_key, j)
-                    match = re.search(r'%b(\d+)', command_str)
-                    if match:
-                        text_var = tk.StringVar(value=command_item.get('text', ''))
-                        
-                        label_entry_frame = ttk.Frame(row_frame)
-                        label_entry_frame.pack(side='left', fill='x', expand=True, padx=(5,0))
-                        ttk.Label(label_entry_frame, text=f"{label_button_name}:").pack(side='left', padx=(0, 5))
-                        ttk.Entry(label_entry_frame, textvariable=text_var, width=int(match.group(1))).pack(side='left', fill='x', expand=True)
-                        
-                        self.autotyper_state_vars[key] = (check_var, text_var)
-                        text_var.trace_add('write', lambda *a, k=key: self._on_autotyper_state_change(k))
-                    else:
-                        preview = command_str.replace('%C', 'CTRL+').replace('%A', 'ALT+')
-                        ttk.Label(row_frame, text=f"{label_button_name}: {preview}").pack(side='left', anchor='w', padx=(5,0))
-                        self.autotyper_state_vars[key] = (check_var, None)
-                    
-                    check_var.trace_add('write', lambda *a, k=key: self._on_autotyper_state_change(k))
+        for step_key, step in profile.ordered_steps():
+            if step.commands:
+                steps_by_column[step.column].append((step_key, step))
+
+        toolchain = self.app.config.get('Toolchains', {}).get(self.app.toolchain_type.get()) or Toolchain()
+
+        # Frames and rows are reused by position and rebound to the new profile; only missing ones are created
+        self.loading_autotyper = True
+        for col_num, column in enumerate(self.autotyper_columns, start=1):
+            steps = steps_by_column.get(col_num, [])
+            for i, (step_key, step) in enumerate(steps):
+                if i == len(column['steps']):
+                    column['steps'].append({'frame': ttk.LabelFrame(column['frame'], padding=5), 'rows': []})
+                step_slot = column['steps'][i]
+                step_slot['frame'].config(text=step.name or step_key)
+                step_slot['frame'].pack(fill='x', expand=True, pady=(0, 10))
+                for j, command_item in enumerate(step.commands):
+                    if j == len(step_slot['rows']):
+                        step_slot['rows'].append(self._create_autotyper_row(step_slot['frame']))
+                    self._bind_autotyper_row(step_slot['rows'][j], command_item, toolchain)
+                self._hide_after(step_slot['rows'], len(step.commands))
+            self._hide_after(column['steps'], len(steps))
+        self.loading_autotyper = False
         
         self.app.update_autotyper_indicator()
 
+    def _create_autotyper_row(self, parent):
+        row = {'frame': ttk.Frame(parent), 'check_var': tk.BooleanVar(), 'text_var': tk.StringVar(), 'item': None}
+        ttk.Checkbutton(row['frame'], variable=row['check_var']).pack(side='left')
+        row['label'] = ttk.Label(row['frame'])
+        row['label'].pack(side='left', anchor='w', padx=(5,0))
+        row['entry'] = ttk.Entry(row['frame'], textvariable=row['text_var'])
+        row['check_var'].trace_add('write', lambda *a, r=row: self._on_autotyper_state_change(r))
+        row['text_var'].trace_add('write', lambda *a, r=row: self._on_autotyper_state_change(r))
+        return row
+
+    def _bind_autotyper_row(self, row, command_item, toolchain):
+        label_button_name = toolchain.button(command_item.label).name or command_item.label
+        row['item'] = command_item
+        row['check_var'].set(command_item.enabled)
+        match = re.search(r'%b(\d+)', command_item.command)
+        if match:
+            row['label'].config(text=f"{label_button_name}:")
+            row['text_var'].set(command_item.text)
+            row['entry'].config(width=int(match.group(1)))
+            row['entry'].pack(side='left', fill='x', expand=True, padx=(5,0))
+        else:
+            preview = command_item.command.replace('%C', 'CTRL+').replace('%A', 'ALT+')
+            row['label'].config(text=f"{label_button_name}: {preview}")
+            row['entry'].pack_forget()
+        row['frame'].pack(fill='x', pady=1)
+
+    def _hide_after(self, slots, count):
+        for slot in slots[count:]:
+            slot['frame'].pack_forget()
+
     def refresh_profile_display(self):
         if not self.winfo_exists(): return
         
@@ -1183,13 +1178,13 @@ class SettingsWindow(tk.Toplevel):
         if not self.winfo_exists(): return
         if ext in self.clean_vars:
             self.app.config['CleanStates'][ext] = str(self.clean_vars[ext].get())
-            self.app.save_config()
+            self.app.save_config('CleanStates')
 
     def _on_path_var_change(self, key):
         if not self.winfo_exists(): return
         if key in self.vars:
             self.app.config['Paths'][key] = str(self.vars[key].get())
-            self.app.save_config()
+            self.app.save_config('Paths')
 
     def create_misc_options_frame(self, parent):
         frame = ttk.LabelFrame(parent, text="Misc Options", padding=10)
@@ -1197,9 +1192,46 @@ class SettingsWindow(tk.Toplevel):
         self.vars['dark_mode'].trace_add('write', lambda *a, k='dark_mode': self._on_option_var_change(k, *a))
         ttk.Checkbutton(frame, text="Dark Mode (Requires Restart)", variable=self.vars['dark_mode']).pack(anchor='w')
 
+        scrollback_frame = ttk.Frame(frame)
+        scrollback_frame.pack(anchor='w', pady=(5,0))
+        ttk.Label(scrollback_frame, text="Status Window Lines (0 = unlimited):").pack(side='left')
+        self.vars['status_scrollback_lines'] = tk.StringVar(name='settings_status_scrollback_lines', value=str(STATUS_SCROLLBACK_LINES))
+        self.vars['status_scrollback_lines'].trace_add('write', lambda *a, k='status_scrollback_lines': self._on_option_var_change(k, *a))
+        ttk.Entry(scrollback_frame, textvariable=self.vars['status_scrollback_lines'], width=8).pack(side='left', padx=(5,0))
+
+        jobs_frame = ttk.Frame(frame)
+        jobs_frame.pack(anchor='w', pady=(5,0))
+        ttk.Label(jobs_frame, text="Parallel Jobs (internal commands at once):").pack(side='left')
+        self.vars['max_parallel_jobs'] = tk.StringVar(name='settings_max_parallel_jobs', value='1')
+        self.vars['max_parallel_jobs'].trace_add('write', lambda *a, k='max_parallel_jobs': self._on_option_var_change(k, *a))
+        ttk.Entry(jobs_frame, textvariable=self.vars['max_parallel_jobs'], width=4).pack(side='left', padx=(5,0))
+
+        cache_frame = ttk.Frame(frame)
+        cache_frame.pack(anchor='w', fill='x', pady=(5,0))
+        ttk.Label(cache_frame, text="Artifact Cache Folder (empty = off):").pack(side='left')
+        self.vars['artifact_cache_dir'] = tk.StringVar(name='settings_artifact_cache_dir')
+        self.vars['artifact_cache_dir'].trace_add('write', lambda *a, k='artifact_cache_dir': self._on_option_var_change(k, *a))
+        ttk.Entry(cache_frame, textvariable=self.vars['artifact_cache_dir'], width=30).pack(side='left', padx=(5,0), fill='x', expand=True)
+        ttk.Button(cache_frame, text="...", width=3, command=self.browse_artifact_cache).pack(side='left', padx=(5,0))
+
+        cache_options_frame = ttk.Frame(frame)
+        cache_options_frame.pack(anchor='w', pady=(5,0))
+        ttk.Label(cache_options_frame, text="Cache Size (MB):").pack(side='left')
+        self.vars['artifact_cache_mb'] = tk.StringVar(name='settings_artifact_cache_mb', value='1024')
+        self.vars['artifact_cache_mb'].trace_add('write', lambda *a, k='artifact_cache_mb': self._on_option_var_change(k, *a))
+        ttk.Entry(cache_options_frame, textvariable=self.vars['artifact_cache_mb'], width=6).pack(side='left', padx=(5,0))
+        self.vars['artifact_cache_hardlinks'] = tk.BooleanVar(name='settings_artifact_cache_hardlinks')
+        self.vars['artifact_cache_hardlinks'].trace_add('write', lambda *a, k='artifact_cache_hardlinks': self._on_option_var_change(k, *a))
+        ttk.Checkbutton(cache_options_frame, text="Restore by hard link", variable=self.vars['artifact_cache_hardlinks']).pack(side='left', padx=(10,0))
+
         return frame
 
-    def load_settings_into_ui(self):
+    def browse_artifact_cache(self):
+        from tkinter import filedialog # Loaded on first use, not at startup
+        if path := filedialog.askdirectory(initialdir=self.vars['artifact_cache_dir'].get() or os.path.expanduser('~')):
+            self.vars['artifact_cache_dir'].set(path)
+
+    def load_settings_into_ui(self, defer_autotyper=False):
         for section_name in ['Paths', 'Options']:
             for key, value in self.app.config.get(section_name, {}).items():
                 if key in self.vars:
@@ -1207,7 +1239,9 @@ class SettingsWindow(tk.Toplevel):
                     if isinstance(var, tk.BooleanVar): var.set(value.lower() == 'true')
                     else: var.set(value)
         
-        self.refresh_profile_display()
+        # On open, the auto-typer rows are filled once the rest of the window is up
+        if defer_autotyper: self.after_idle(self.refresh_profile_display)
+        else: self.refresh_profile_display()
         self.refresh_clean_checkboxes()
 
     def open_toolchain_editor(self):
@@ -1222,27 +1256,16 @@ class SettingsWindow(tk.Toplevel):
     def open_auto_typer_editor(self):
         AutoTyperProfileEditor(self, self.app, self.load_settings_into_ui)
 
-    def _on_autotyper_state_change(self, key):
-        if not self.winfo_exists(): return 
+    def _on_autotyper_state_change(self, row):
+        if self.loading_autotyper or not self.winfo_exists(): return 
 
-        check_var, text_var = self.autotyper_state_vars.get(key, (None, None))
-        if not check_var: return
-        
-        profile_name, step_key, index = key
+        command_item = row['item']
+        if not command_item: return
         
-        try:
-            profile_str = self.app.config.get('AutoTyperProfiles', {}).get(profile_name, '{}')
-            profile_data = ast.literal_eval(profile_str)
-            
-            command_item = profile_data[step_key]['commands'][index]
-            command_item['enabled'] = str(check_var.get())
-            if text_var:
-                command_item['text'] = text_var.get()
-
-            self.app.config['AutoTyperProfiles'][profile_name] = str(profile_data)
-            self.app.save_config()
-        except (ValueError, SyntaxError, KeyError, IndexError):
-            pass 
+        command_item.enabled = row['check_var'].get()
+        if row['entry'].winfo_manager():
+            command_item.text = row['text_var'].get()
+        self.app.save_config('AutoTyperProfiles')
 
     def _on_master_switch_change(self, *args):
         if not self.winfo_exists(): return
@@ -1250,28 +1273,22 @@ class SettingsWindow(tk.Toplevel):
         profile_name = self.vars['active_auto_typer_profile'].get()
         if not profile_name: return
 
-        try:
-            profile_str = self.app.config.get('AutoTyperProfiles', {}).get(profile_name, '{}')
-            profile_data = ast.literal_eval(profile_str)
-            
-            profile_data['master_enabled'] = str(self.master_switch_var.get())
-            
-            self.app.config['AutoTyperProfiles'][profile_name] = str(profile_data)
-            self.app.save_config()
-            self.app.update_autotyper_indicator()
-        except (ValueError, SyntaxError, KeyError):
-            pass
+        profile = self.app.config.get('AutoTyperProfiles', {}).get(profile_name)
+        if not profile: return
+        profile.master_enabled = self.master_switch_var.get()
+        self.app.save_config('AutoTyperProfiles')
+        self.app.update_autotyper_indicator()
 
     def _on_option_var_change(self, key, *args):
         if not self.winfo_exists(): return
         if key in self.vars:
             self.app.config['Options'][key] = str(self.vars[key].get())
-            self.app.save_config()
+            self.app.save_config('Options')
 
     def save_and_close(self):
         self.app.config['Geometry']['settings_window'] = self.geometry()
         self.app.config['CleanStates'] = {ext: str(var.get()) for ext, var in self.clean_vars.items()}
-        self.app.save_config()
+        self.app.save_config('Geometry', 'CleanStates')
         self.app.populate_ui_from_config()
         if self.on_close_callback:
             self.on_close_callback()
@@ -1279,7 +1296,8 @@ class SettingsWindow(tk.Toplevel):
 
     def browse_file(self, var):
         #if path := filedialog.askopenfilename(): var.set(path)
-         if path := filedialog.askopenfilename(initialdir=os.getcwd()):var.set(path)
+         from tkinter import filedialog
+         if path := filedialog.askopenfilename(initialdir=self.app.project.folder):var.set(path)
 
 class ToolchainEditorWindow(tk.Toplevel):
     """A Toplevel window for creating, editing, and deleting toolchains."""
@@ -1288,6 +1306,7 @@ class ToolchainEditorWindow(tk.Toplevel):
         self.transient(parent)
         self.grab_set()
         self.title("Toolchain Editor")
+        started = time.perf_counter()
         self.app = app_controller
         self.vars = {}
         self.preview_vars = {}
@@ -1296,6 +1315,9 @@ class ToolchainEditorWindow(tk.Toplevel):
         self.loading_data = False
         self.toolchain_path_var = tk.StringVar()
         self.autotyper_profile_var = tk.StringVar()
+        self.diagnostics_var = tk.StringVar()
+        self.watch_patterns_var = tk.StringVar()
+        self.build_steps_var = tk.StringVar()
         
         saved_geom = self.app.config.get('Geometry', {}).get('toolchain_editor')
         if not saved_geom or saved_geom == '':
@@ -1318,6 +1340,7 @@ class ToolchainEditorWindow(tk.Toplevel):
         if self.app.toolchain_type.get() in self.combobox['values']:
             self.combobox.set(self.app.toolchain_type.get())
         self.load_toolchain_data()
+        self.app.log_window_opened(self, started)
 
     def create_top_frame(self, parent):
         frame = ttk.LabelFrame(parent, text="Toolchain Management", padding=10)
@@ -1342,8 +1365,21 @@ class ToolchainEditorWindow(tk.Toplevel):
         self.autotyper_profile_combo.grid(row=3, column=1, sticky='ew', padx=5)
         self.autotyper_profile_var.trace_add('write', self.save_current_toolchain_data)
 
+        ttk.Label(frame, text="Error Format:").grid(row=4, column=0, sticky='w', padx=5, pady=2)
+        diagnostics_combo = ttk.Combobox(frame, textvariable=self.diagnostics_var, values=[''] + sorted(DIAGNOSTIC_FORMATS))
+        diagnostics_combo.grid(row=4, column=1, sticky='ew', padx=5)
+        self.diagnostics_var.trace_add('write', self.save_current_toolchain_data)
+
+        ttk.Label(frame, text="Watch Patterns:").grid(row=5, column=0, sticky='w', padx=5, pady=2)
+        ttk.Entry(frame, textvariable=self.watch_patterns_var).grid(row=5, column=1, sticky='ew', padx=5)
+        self.watch_patterns_var.trace_add('write', self.save_current_toolchain_data)
+
+        ttk.Label(frame, text="Pipeline Steps:").grid(row=6, column=0, sticky='w', padx=5, pady=2)
+        ttk.Entry(frame, textvariable=self.build_steps_var).grid(row=6, column=1, sticky='ew', padx=5)
+        self.build_steps_var.trace_add('write', self.save_current_toolchain_data)
+
         button_frame = ttk.Frame(frame)
-        button_frame.grid(row=0, column=2, rowspan=4, padx=5)
+        button_frame.grid(row=0, column=2, rowspan=7, padx=5)
         ttk.Button(button_frame, text="Add New", command=self.add_new_toolchain).pack(fill='x', pady=1)
         ttk.Button(button_frame, text="Copy", command=self.copy_toolchain).pack(fill='x', pady=1)
         ttk.Button(button_frame, text="Delete", command=self.delete_toolchain, style="Danger.TButton").pack(fill='x', pady=1)
@@ -1379,6 +1415,8 @@ class ToolchainEditorWindow(tk.Toplevel):
             self.vars[f'{key}_name'] = tk.StringVar()
             self.vars[f'{key}_command'] = tk.StringVar()
             self.vars[f'{key}_color'] = tk.StringVar(value='#F0F0F0')
+            self.vars[f'{key}_inputs'] = tk.StringVar()
+            self.vars[f'{key}_outputs'] = tk.StringVar()
             self.preview_vars[key] = tk.StringVar()
 
             if i > 1 and i != 6:
@@ -1409,7 +1447,12 @@ class ToolchainEditorWindow(tk.Toplevel):
             preview_label = ttk.Label(frame, textvariable=self.preview_vars[key], relief='sunken', padding=2, anchor='w', wraplength=pixel_width, justify='left')
             preview_label.grid(row=2, column=1, columnspan=3, sticky='w', pady=(2,0))
 
-            for var in [self.vars[f'{key}_name'], self.vars[f'{key}_command'], self.vars[f'{key}_color']]:
+            ttk.Label(frame, text="Inputs:").grid(row=3, column=0, sticky='w', pady=(2,0))
+            ttk.Entry(frame, textvariable=self.vars[f'{key}_inputs'], width=40).grid(row=3, column=1, columnspan=3, sticky='w', pady=(2,0))
+            ttk.Label(frame, text="Outputs:").grid(row=4, column=0, sticky='w', pady=(2,0))
+            ttk.Entry(frame, textvariable=self.vars[f'{key}_outputs'], width=40).grid(row=4, column=1, columnspan=3, sticky='w', pady=(2,0))
+
+            for var in [self.vars[f'{key}_name'], self.vars[f'{key}_command'], self.vars[f'{key}_color'], self.vars[f'{key}_inputs'], self.vars[f'{key}_outputs']]:
                 var.trace_add('write', self.save_current_toolchain_data)
             self.vars[f'{key}_command'].trace_add('write', lambda *a, k=key: self.update_preview(k))
             name_entry.bind("<FocusOut>", self.save_current_toolchain_data)
@@ -1422,7 +1465,8 @@ class ToolchainEditorWindow(tk.Toplevel):
             '%f': 'Full Source Path', '%s': 'Source Stem (no ext)', '%o': 'Output Stem (no ext)', 
             '%e': 'Editor Path', '%m': 'Emulator Path', '%h': 'Header Tool Path', 
             '%g': 'Signer Tool Path', '%t': 'Toolchain Path', '%term': 'Terminal Path',
-            'EXTERNAL': 'This will spawn the command as an \nexternal process'
+            'EXTERNAL': 'This will spawn the command as an \nexternal process',
+            'Outputs': 'Files the command creates. The button is\nskipped while they are newer than its Inputs\n(default %f and its includes). Comma-separated,\nwildcards ok'
         }
         items = sorted(list(legend.items()))
         for i, (key, desc) in enumerate(items):
@@ -1463,49 +1507,52 @@ class ToolchainEditorWindow(tk.Toplevel):
             self.toolchain_name_var.set("")
             self.toolchain_path_var.set("")
             self.autotyper_profile_var.set('-- No Profile Selected --')
+            self.diagnostics_var.set("")
+            self.watch_patterns_var.set("")
+            self.build_steps_var.set("")
             self.last_saved_toolchain.set("")
             for i in range(1, 11):
                 key = f'Button{i}'
                 self.vars[f'{key}_name'].set('')
                 self.vars[f'{key}_command'].set('')
                 self.vars[f'{key}_color'].set('#F0F0F0')
+                self.vars[f'{key}_inputs'].set('')
+                self.vars[f'{key}_outputs'].set('')
                 self.color_labels[key].config(background='#F0F0F0')
-                self.update_preview(key)
             self.loading_data = False
             return
 
         self.toolchain_name_var.set(toolchain_name)
         self.last_saved_toolchain.set(toolchain_name)
 
-        toolchain_data = self.app.config.get('Toolchains', {}).get(toolchain_name, {})
-        self.toolchain_path_var.set(toolchain_data.get('path', ''))
+        toolchain = self.app.config.get('Toolchains', {}).get(toolchain_name) or Toolchain()
+        self.toolchain_path_var.set(toolchain.path)
+        self.diagnostics_var.set(toolchain.diagnostics)
+        self.watch_patterns_var.set(toolchain.watch_patterns)
+        self.build_steps_var.set(", ".join(step.action for step in toolchain.build_steps))
         
-        profile = toolchain_data.get('autotyper_profile', '-- No Profile Selected --')
+        profile = toolchain.autotyper_profile
         if profile in all_profiles:
             self.autotyper_profile_var.set(profile)
         else:
             self.autotyper_profile_var.set('-- No Profile Selected --')
 
-        try:
-            buttons_data = ast.literal_eval(toolchain_data.get('custom_buttons', '{}'))
-        except (ValueError, SyntaxError):
-            buttons_data = {}
-        
         for i in range(1, 11):
             key = f'Button{i}'
-            data = buttons_data.get(key, {})
-            self.vars[f'{key}_name'].set(data.get('name', ''))
-            self.vars[f'{key}_command'].set(data.get('command', ''))
-            color = data.get('color', '#F0F0F0')
+            button = toolchain.button(key)
+            self.vars[f'{key}_name'].set(button.name)
+            self.vars[f'{key}_command'].set(button.command)
+            color = button.color
             self.vars[f'{key}_color'].set(color)
+            self.vars[f'{key}_inputs'].set(button.inputs)
+            self.vars[f'{key}_outputs'].set(button.outputs)
             self.color_labels[key].config(background=color)
-            self.update_preview(key)
         
         self.loading_data = False
 
     def update_preview(self, button_key):
         command_str = self.vars[f'{button_key}_command'].get().strip()
-        if command_str.lower().startswith('button'):
+        if command_str.lower().startswith('button') or command_str.startswith('('):
             preview_text = f"Composite Action: {command_str}"
         else:
             paths = self.app.config.get('Paths', {})
@@ -1557,18 +1604,26 @@ class ToolchainEditorWindow(tk.Toplevel):
         if not toolchain_name or toolchain_name not in self.app.config['Toolchains']:
             return
 
-        buttons_data = {f'Button{i}': {
-                'name': self.vars[f'Button{i}_name'].get(),
-                'command': self.vars[f'Button{i}_command'].get(),
-                'color': self.vars[f'Button{i}_color'].get()
-            } for i in range(1, 11)}
-        self.app.config['Toolchains'][toolchain_name]['custom_buttons'] = str(buttons_data)
-        self.app.config['Toolchains'][toolchain_name]['path'] = self.toolchain_path_var.get()
-        self.app.config['Toolchains'][toolchain_name]['autotyper_profile'] = self.autotyper_profile_var.get()
+        toolchain = self.app.config['Toolchains'][toolchain_name]
+        for i in range(1, 11):
+            button = toolchain.buttons.setdefault(f'Button{i}', Button())
+            button.name = self.vars[f'Button{i}_name'].get()
+            button.command = self.vars[f'Button{i}_command'].get()
+            button.color = self.vars[f'Button{i}_color'].get()
+            button.inputs = self.vars[f'Button{i}_inputs'].get().strip()
+            button.outputs = self.vars[f'Button{i}_outputs'].get().strip()
+        toolchain.path = self.toolchain_path_var.get()
+        toolchain.autotyper_profile = self.autotyper_profile_var.get()
+        toolchain.diagnostics = self.diagnostics_var.get().strip()
+        toolchain.watch_patterns = self.watch_patterns_var.get().strip()
+        # Steps are edited by action name; a step kept in the list keeps its name, outputs and on_error from the INI
+        existing = {step.action: step for step in toolchain.build_steps}
+        toolchain.build_steps = [existing.get(action) or BuildStep(action) for action in map(str.strip, self.build_steps_var.get().split(',')) if action]
         self.app.needs_ui_rebuild = True
-        self.app.save_config()
+        self.app.save_config('Toolchains')
 
     def add_new_toolchain(self):
+        from tkinter import simpledialog # Loaded on first use, not at startup
         new_name = simpledialog.askstring("New Toolchain", "Enter a name for the new toolchain:", parent=self)
         if not new_name or not new_name.strip(): return
         new_name = new_name.strip()
@@ -1577,12 +1632,12 @@ class ToolchainEditorWindow(tk.Toplevel):
             messagebox.showerror("Error", f"Toolchain '{new_name}' already exists or is a reserved name.", parent=self)
             return
 
-        self.app.config['Toolchains'][new_name] = copy.deepcopy(DEFAULT_CONFIG['Toolchains']['7800ASMDevKit'])
-        blank_buttons = {f'Button{i}': {'name': '', 'command': '', 'color': '#F0F0F0'} for i in range(1, 11)}
-        self.app.config['Toolchains'][new_name]['custom_buttons'] = str(blank_buttons)
-        self.app.config['Toolchains'][new_name]['autotyper_profile'] = '-- No Profile Selected --'
+        new_toolchain = Toolchain.from_ini(DEFAULT_CONFIG['Toolchains']['7800ASMDevKit'])
+        new_toolchain.buttons = {f'Button{i}': Button() for i in range(1, 11)}
+        new_toolchain.autotyper_profile = '-- No Profile Selected --'
+        self.app.config['Toolchains'][new_name] = new_toolchain
 
-        self.app.save_config()
+        self.app.save_config('Toolchains')
         self.populate_toolchain_list()
         self.combobox.set(new_name)
         self.load_toolchain_data()
@@ -1597,6 +1652,7 @@ class ToolchainEditorWindow(tk.Toplevel):
             messagebox.showerror("Error", "Cannot copy a reserved toolchain.", parent=self)
             return
 
+        from tkinter import simpledialog
         while True:
             new_name = simpledialog.askstring("Copy Toolchain", "Enter a new name for the copied toolchain:", parent=self)
 
@@ -1623,7 +1679,7 @@ class ToolchainEditorWindow(tk.Toplevel):
             # If all checks pass, copy the toolchain
             toolchain_data_to_copy = copy.deepcopy(self.app.config['Toolchains'][old_name])
             self.app.config['Toolchains'][new_name] = toolchain_data_to_copy
-            self.app.save_config()
+            self.app.save_config('Toolchains')
 
             self.populate_toolchain_list()
             self.combobox.set(new_name)
@@ -1641,7 +1697,7 @@ class ToolchainEditorWindow(tk.Toplevel):
 
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete the '{toolchain_name}' toolchain?", parent=self):
             del self.app.config['Toolchains'][toolchain_name]
-            self.app.save_config()
+            self.app.save_config('Toolchains')
             self.populate_toolchain_list()
             if self.combobox['values']:
                 self.combobox.current(0)
@@ -1655,16 +1711,17 @@ class ToolchainEditorWindow(tk.Toplevel):
             self.app.needs_ui_rebuild = True
 
     def choose_color(self, button_key):
+        from tkinter import colorchooser # Loaded on first use, not at startup
         initial_color = self.vars[f'{button_key}_color'].get()
         color_code = colorchooser.askcolor(title="Choose button color", initialcolor=initial_color, parent=self)
         if color_code and color_code[1]:
             self.vars[f'{button_key}_color'].set(color_code[1])
-            self.color_labels[key].config(background=color_code[1])
+            self.color_labels[button_key].config(background=color_code[1])
 
     def save_and_close(self):
         self.save_current_toolchain_data()
         self.app.config['Geometry']['toolchain_editor'] = self.geometry()
-        self.app.save_config()
+        self.app.save_config('Geometry')
         if self.app.needs_ui_rebuild:
             self.app.on_toolchain_selected()
             self.app.needs_ui_rebuild = False
@@ -1677,6 +1734,7 @@ class ToolchainOptionsEditor(tk.Toplevel):
         self.transient(parent)
         self.grab_set()
         self.title(f"Toolchain Options for '{toolchain_name}'")
+        started = time.perf_counter()
         self.app = app_controller
         self.toolchain_name = toolchain_name
         self.option_rows = [] 
@@ -1700,6 +1758,7 @@ class ToolchainOptionsEditor(tk.Toplevel):
         
         self.load_options()
         self.protocol("WM_DELETE_WINDOW", self.save_and_close)
+        self.app.log_window_opened(self, started)
 
     def create_scrollable_area(self, parent):
         container = ttk.LabelFrame(parent, text="Configurable Options", padding=10)
@@ -1723,11 +1782,8 @@ class ToolchainOptionsEditor(tk.Toplevel):
             row['frame'].destroy()
         self.option_rows.clear()
         
-        toolchain_data = self.app.config.get('Toolchains', {}).get(self.toolchain_name, {})
-        try:
-            options_list = ast.literal_eval(toolchain_data.get('toolchain_options', '[]'))
-        except (ValueError, SyntaxError):
-            options_list = []
+        toolchain = self.app.config.get('Toolchains', {}).get(self.toolchain_name) or Toolchain()
+        options_list = toolchain.options
         
         for option in options_list:
             self.create_option_row(option)
@@ -1735,8 +1791,8 @@ class ToolchainOptionsEditor(tk.Toplevel):
         if not options_list:
             self.rebuild_preview_options()
 
-    def create_option_row(self, option_data=None):
-        if option_data is None: option_data = {}
+    def create_option_row(self, option=None):
+        if option is None: option = ToolchainOption()
         
         row_frame = ttk.Frame(self.scrollable_frame)
         row_frame.pack(fill='x', pady=5)
@@ -1748,29 +1804,25 @@ class ToolchainOptionsEditor(tk.Toplevel):
         del_btn.grid(row=0, column=0, padx=(0, 10))
 
         ttk.Label(row_frame, text="Name:").grid(row=0, column=1, padx=(0, 2))
-        name_var = tk.StringVar(value=option_data.get('name', ''))
+        name_var = tk.StringVar(value=option.name)
         ttk.Entry(row_frame, textvariable=name_var).grid(row=0, column=2, sticky='ew')
         name_var.trace_add('write', self.rebuild_preview_options)
 
         ttk.Label(row_frame, text="Flag:").grid(row=0, column=3, padx=(10, 2))
-        flag_var = tk.StringVar(value=option_data.get('flag', ''))
+        flag_var = tk.StringVar(value=option.flag)
         ttk.Entry(row_frame, textvariable=flag_var).grid(row=0, column=4, sticky='ew')
 
         ttk.Label(row_frame, text="Target:").grid(row=0, column=5, padx=(10, 2))
 
-        toolchain_data = self.app.config.get('Toolchains', {}).get(self.toolchain_name, {})
-        try:
-            buttons_data = ast.literal_eval(toolchain_data.get('custom_buttons', '{}'))
-        except (ValueError, SyntaxError):
-            buttons_data = {}
+        toolchain = self.app.config.get('Toolchains', {}).get(self.toolchain_name) or Toolchain()
         
         button_display_map = {
-            (buttons_data.get(f'Button{i}', {}).get('name') or f'Button{i}'): f'Button{i}'
-            for i in range(1, 11) if buttons_data.get(f'Button{i}', {}).get('name', '').strip()
+            toolchain.button(f'Button{i}').name: f'Button{i}'
+            for i in range(1, 11) if toolchain.button(f'Button{i}').name.strip()
         }
         button_key_map = {v: k for k, v in button_display_map.items()}
 
-        target_var = tk.StringVar(value=option_data.get('target', ''))
+        target_var = tk.StringVar(value=option.target)
         target_display_var = tk.StringVar()
 
         def on_target_select(*args):
@@ -1871,10 +1923,8 @@ class ToolchainOptionsEditor(tk.Toplevel):
             if self.toolchain_editor_window and self.toolchain_editor_window.winfo_exists():
                 base_command = self.toolchain_editor_window.vars.get(f'{target_button}_command').get()
             else:
-                toolchain_data = self.app.config.get('Toolchains', {}).get(self.toolchain_name, {})
-                buttons_data = ast.literal_eval(toolchain_data.get('custom_buttons', '{}'))
-                base_command = buttons_data.get(target_button, {}).get('command', '')
-        except (ValueError, SyntaxError, AttributeError):
+                base_command = self.app.config['Toolchains'][self.toolchain_name].button(target_button).command
+        except (KeyError, AttributeError):
             base_command = ''
         
         resolved_cmd = self.app.resolve_command_placeholders(
@@ -1906,12 +1956,12 @@ class ToolchainOptionsEditor(tk.Toplevel):
         for row in self.option_rows:
             name, flag, target = row['vars']['name'].get().strip(), row['vars']['flag'].get().strip(), row['vars']['target'].get()
             if name and flag and target:
-                new_options_list.append({'name': name, 'flag': flag, 'target': target})
+                new_options_list.append(ToolchainOption(name, flag, target))
 
-        self.app.config['Toolchains'][self.toolchain_name]['toolchain_options'] = str(new_options_list)
+        self.app.config['Toolchains'][self.toolchain_name].options = new_options_list
         self.app.config['Geometry']['toolchain_options_editor'] = self.geometry()
         
-        self.app.save_config()
+        self.app.save_config('Toolchains', 'Geometry')
         self.app.on_toolchain_selected()
         self.destroy()
 
@@ -1952,7 +2002,7 @@ class ConfigEditorWindow(tk.Toplevel):
         update_rollback_frame.grid(row=0, column=0, sticky='ew')
         update_rollback_frame.columnconfigure(0, weight=1); update_rollback_frame.columnconfigure(1, weight=1)
         
-        ttk.Button(update_rollback_frame, text="Update devCMDcycle.py", command=self.update_dev_cycle_file, style="Accent.TButton").grid(row=0, column=0, sticky='ew', padx=(0,5))
+        ttk.Button(update_rollback_frame, text="Update engineCMDcycle.py", command=self.update_dev_cycle_file, style="Accent.TButton").grid(row=0, column=0, sticky='ew', padx=(0,5))
         ttk.Button(update_rollback_frame, text="Roll Back", command=self.rollback_file, style="Danger.TButton").grid(row=0, column=1, sticky='ew', padx=(5,0))
 
         manual_ops_frame = ttk.Frame(controls_container); manual_ops_frame.grid(row=0, column=1, sticky='ns', padx=5)
@@ -1978,10 +2028,11 @@ class ConfigEditorWindow(tk.Toplevel):
             if section == 'Toolchains':
                 for name, t_data in data.items():
                     if name not in UNDELETABLE_ITEMS.get('Toolchains', {}):
-                        parser[f'Toolchain:{name}'] = {k: str(v) for k, v in t_data.items()}
+                        parser[f'Toolchain:{name}'] = t_data.to_ini()
             elif isinstance(data, dict):
-                 parser[section] = {k: str(v) for k, v in data.items()}
+                 parser[section] = {k: ini_value(v) for k, v in data.items()}
 
+        import io
         string_io = io.StringIO()
         parser.write(string_io)
         self.input_text.delete("1.0", tk.END)
@@ -2012,9 +2063,11 @@ class ConfigEditorWindow(tk.Toplevel):
         self.update_timer = self.after(500, self.convert_ini_to_py)
 
     def _format_value(self, value):
+        import ast # Loaded on first use, not at startup
         try:
             obj = ast.literal_eval(value)
             if isinstance(obj, (dict, list)):
+                import pprint # Loaded on first use, not at startup
                 pretty_string = pprint.pformat(obj, indent=4, width=120, sort_dicts=False)
                 return f"str(\n{''.join(['    ' + line for line in pretty_string.splitlines(True)])}    )"
             return repr(value)
@@ -2053,7 +2106,7 @@ class ConfigEditorWindow(tk.Toplevel):
         except configparser.Error: pass
         
     def update_dev_cycle_file(self):
-        target_py_file = os.path.abspath(__file__)
+        target_py_file = os.path.abspath(engineCMDcycle.__file__) # DEFAULT_CONFIG lives in the engine
         script_backup_dir = os.path.join(os.path.dirname(target_py_file), SCRIPT_BACKUP_DIR)
         os.makedirs(script_backup_dir, exist_ok=True)
 
@@ -2065,6 +2118,7 @@ class ConfigEditorWindow(tk.Toplevel):
         if not ConfirmationDialog(self.master, "Confirm Update", confirm_msg).result: return
 
         generated_config = self.output_text.get("1.0", tk.END).strip()
+        import shutil # Loaded on first use, not at startup
         try:
             shutil.copy2(target_py_file, backup_path)
             with open(target_py_file, 'r', encoding='utf-8') as f: lines = f.readlines()
@@ -2095,16 +2149,18 @@ class ConfigEditorWindow(tk.Toplevel):
             if os.path.exists(backup_path): shutil.move(backup_path, target_py_file)
     
     def rollback_file(self):
-        target_py_file = os.path.abspath(__file__)
+        target_py_file = os.path.abspath(engineCMDcycle.__file__) # DEFAULT_CONFIG lives in the engine
         script_backup_dir = os.path.join(os.path.dirname(target_py_file), SCRIPT_BACKUP_DIR)
         os.makedirs(script_backup_dir, exist_ok=True)
         
+        import glob, shutil # Loaded on first use, not at startup
         backups = sorted(glob.glob(os.path.join(script_backup_dir, f"{os.path.basename(target_py_file)}_backup*")))
         if not backups: return InfoDialog(self.master, "No Backups", f"No backups found in:\n{script_backup_dir}")
 
         choice = RollbackDialog(self.master, "Roll Back Script", f"Latest backup: {os.path.basename(backups[-1])}").result
         if not choice: return
         
+        from tkinter import filedialog
         backup_to_restore = backups[-1] if choice == "latest" else filedialog.askopenfilename(
             title="Select a backup file", initialdir=script_backup_dir,
             filetypes=(("Backup Files", f"{os.path.basename(target_py_file)}_backup*"), ("All files", "*.*"))
@@ -2136,81 +2192,468 @@ class ConfigEditorWindow(tk.Toplevel):
 
     def copy_to_clipboard(self): self.clipboard_clear(); self.clipboard_append(self.output_text.get("1.0", tk.END))
 
+class HistoryWindow(tk.Toplevel):
+    """Shows the build history of the current source file's project: per-step trends and the individual runs."""
+    RUN_LIMIT = 500
+
+    def __init__(self, parent, app_controller):
+        super().__init__(parent)
+        self.transient(parent)
+        self.app = app_controller
+        self.history = self.app.runner.history(self.app.command_context())
+        self.title(f"Build History - {self.history.path}")
+
+        saved_geom = self.app.config.get('Geometry', {}).get('history_window')
+        if not saved_geom or saved_geom == '':
+            saved_geom = self.app.config.get('DefaultGeometry', {}).get('history_window', '1000x600')
+        self.geometry(saved_geom)
+
+        main_frame = ttk.Frame(self, padding=10)
+        main_frame.pack(fill="both", expand=True)
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.rowconfigure(0, weight=1)
+        main_frame.rowconfigure(1, weight=2)
+
+        self.trends_tree = self.create_tree(main_frame, "Steps (select one to filter the runs below)", 0,
+            [('toolchain', "Toolchain", 140), ('step', "Step", 160), ('runs', "Runs", 60), ('failures', "Failed", 60),
+             ('average', "Average", 80), ('recent', "Last 5", 80), ('change', "Change", 70), ('last', "Last Run", 140)])
+        self.runs_tree = self.create_tree(main_frame, "Runs", 1,
+            [('started', "Started", 140), ('toolchain', "Toolchain", 120), ('step', "Step", 120), ('duration', "Duration", 80),
+             ('status', "Status", 70), ('exit', "Exit", 50), ('output', "Output", 80), ('inputs', "Inputs", 130), ('command', "Command", 400)])
+        self.trends_tree.bind('<<TreeviewSelect>>', lambda e: self.load_runs())
+
+        bottom_frame = ttk.Frame(main_frame)
+        bottom_frame.grid(row=2, column=0, sticky='ew', pady=(10, 0))
+        self.summary_label = ttk.Label(bottom_frame, text="")
+        self.summary_label.pack(side='left')
+        ttk.Button(bottom_frame, text="Close", command=self.save_and_close).pack(side='right')
+        ttk.Button(bottom_frame, text="Refresh", command=self.refresh).pack(side='right', padx=5)
+
+        self.refresh()
+        self.protocol("WM_DELETE_WINDOW", self.save_and_close)
+
+    def create_tree(self, parent, title, row, columns):
+        frame = ttk.LabelFrame(parent, text=title, padding=5)
+        frame.grid(row=row, column=0, sticky='nsew', pady=(0, 5))
+        frame.rowconfigure(0, weight=1)
+        frame.columnconfigure(0, weight=1)
+        tree = ttk.Treeview(frame, columns=[c[0] for c in columns], show='headings', selectmode='browse')
+        for column, heading, width in columns:
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, stretch=column in ('command', 'step'))
+        scrollbar = ttk.Scrollbar(frame, orient='vertical', command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.grid(row=0, column=0, sticky='nsew')
+        scrollbar.grid(row=0, column=1, sticky='ns')
+        return tree
+
+    @staticmethod
+    def format_time(timestamp):
+        return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp)) if timestamp else ''
+
+    def refresh(self):
+        self.trends_tree.delete(*self.trends_tree.get_children())
+        self.step_keys = {}
+        import sqlite3 # Loaded with the history, not at startup
+        try: trends = self.history.trends()
+        except sqlite3.Error as e:
+            self.summary_label.config(text=f"Could not read {self.history.path}: {e}")
+            return
+        for row in trends:
+            change = f"{(row['recent'] / row['earlier'] - 1) * 100:+.0f}%" if row['earlier'] else ''
+            item = self.trends_tree.insert('', 'end', values=(row['toolchain'], row['name'] or row['button'], row['runs'], row['failures'],
+                                                              f"{row['average']:.2f}s", f"{row['recent']:.2f}s", change, self.format_time(row['last'])))
+            self.step_keys[item] = (row['toolchain'], row['button'])
+        self.summary_label.config(text=f"{sum(row['runs'] for row in trends)} completed runs of {len(trends)} steps")
+        self.load_runs()
+
+    def load_runs(self):
+        self.runs_tree.delete(*self.runs_tree.get_children())
+        toolchain, button = self.step_keys.get(next(iter(self.trends_tree.selection()), None), (None, None))
+        import sqlite3
+        try: runs = self.history.runs(self.RUN_LIMIT, toolchain=toolchain, button=button)
+        except sqlite3.Error: return
+        for row in runs:
+            output = f"{row['output_bytes'] / 1024:.1f} KB" if row['output_bytes'] is not None else ''
+            self.runs_tree.insert('', 'end', values=(self.format_time(row['started']), row['toolchain'], row['name'] or row['button'],
+                                                     f"{row['duration']:.2f}s", row['status'], '' if row['returncode'] is None else row['returncode'],
+                                                     output, row['inputs_hash'] or '', row['command']))
+
+    def save_and_close(self):
+        self.app.config['Geometry']['history_window'] = self.geometry()
+        self.app.save_config('Geometry')
+        self.destroy()
+
+
+class LogSearchWindow(tk.Toplevel):
+    """Search results for the Status Window's search box: this session's output and the logs of past runs.
+
+    Past runs are looked up in the build history's index of error and
+    warning lines; 'Search every line' instead streams through the kept logs
+    on a background thread. Logs are never loaded whole: opening a result
+    shows only the lines around it.
+    """
+    MAX_RESULTS = 1000
+    CONTEXT_LINES = 20
+
+    def __init__(self, parent, app_controller, query):
+        super().__init__(parent)
+        self.transient(parent)
+        self.app = app_controller
+        self.history = self.app.runner.history(self.app.command_context())
+        self.results = {} # item -> (run row or None for this session, line number, text)
+        self.search_id = 0 # Bumped to stop a full-text search that is still running
+        self.title("Search Output")
+
+        saved_geom = self.app.config.get('Geometry', {}).get('log_search_window')
+        if not saved_geom or saved_geom == '':
+            saved_geom = self.app.config.get('DefaultGeometry', {}).get('log_search_window', '1000x500')
+        self.geometry(saved_geom)
+
+        main_frame = ttk.Frame(self, padding=10)
+        main_frame.pack(fill="both", expand=True)
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.rowconfigure(1, weight=1)
+
+        search_frame = ttk.Frame(main_frame)
+        search_frame.grid(row=0, column=0, sticky='ew', pady=(0, 5))
+        search_frame.columnconfigure(0, weight=1)
+        self.query_var = tk.StringVar(value=query)
+        entry = ttk.Entry(search_frame, textvariable=self.query_var)
+        entry.grid(row=0, column=0, sticky='ew')
+        entry.bind("<Return>", lambda e: self.search()); entry.bind("<KP_Enter>", lambda e: self.search())
+        self.full_text_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(search_frame, text="Search every line of past logs (slower)", variable=self.full_text_var, command=self.search).grid(row=0, column=1, padx=5)
+        ttk.Button(search_frame, text="Search", command=self.search).grid(row=0, column=2)
+
+        tree_frame = ttk.Frame(main_frame)
+        tree_frame.grid(row=1, column=0, sticky='nsew')
+        tree_frame.rowconfigure(0, weight=1); tree_frame.columnconfigure(0, weight=1)
+        self.tree = ttk.Treeview(tree_frame, columns=('where', 'line', 'kind', 'text'), show='headings', selectmode='browse')
+        for column, heading, width in (('where', "Where", 260), ('line', "Line", 60), ('kind', "Kind", 70), ('text', "Text", 600)):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, stretch=column == 'text')
+        scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.grid(row=0, column=0, sticky='nsew'); scrollbar.grid(row=0, column=1, sticky='ns')
+        self.tree.bind('<Double-1>', lambda e: self.open_result())
+        self.tree.bind('<Return>', lambda e: self.open_result())
+
+        bottom_frame = ttk.Frame(main_frame)
+        bottom_frame.grid(row=2, column=0, sticky='ew', pady=(10, 0))
+        self.summary_label = ttk.Label(bottom_frame, text="")
+        self.summary_label.pack(side='left')
+        ttk.Button(bottom_frame, text="Close", command=self.save_and_close).pack(side='right')
+        ttk.Button(bottom_frame, text="Show", command=self.open_result).pack(side='right', padx=5)
+
+        self.protocol("WM_DELETE_WINDOW", self.save_and_close)
+        self.search()
+
+    def add_result(self, run, line_no, kind, text):
+        where = "This session" if run is None else \
+            f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['started']))}  {run['toolchain']}: {run['name'] or run['button']}"
+        item = self.tree.insert('', 'end', values=(where, line_no, kind, text))
+        self.results[item] = (run, line_no, text)
+
+    def search(self):
+        self.search_id += 1
+        self.tree.delete(*self.tree.get_children())
+        self.results.clear()
+        query = self.query_var.get().strip()
+        if not query: return
+        self.app.status_renderer.render_pending() # Include output that is still queued
+        import itertools # Loaded on first use, not at startup
+        for line_no, text in itertools.islice(self.app.scrollback.search(query), self.MAX_RESULTS):
+            self.add_result(None, line_no, '', text)
+        session_count = len(self.results)
+
+        if self.full_text_var.get():
+            self.summary_label.config(text=f"{session_count} matches in this session, searching past logs...")
+            found = queue.Queue()
+            threading.Thread(target=self.grep_logs, args=(query, self.search_id, found), daemon=True).start()
+            self.after(50, self.show_grep_results, self.search_id, found, session_count)
+            return
+        import sqlite3 # Loaded with the history, not at startup
+        try: rows = self.history.search(query, self.MAX_RESULTS)
+        except sqlite3.Error as e:
+            self.summary_label.config(text=f"Could not read {self.history.path}: {e}")
+            return
+        for row in rows: self.add_result(row, row['line'], row['kind'], row['text'])
+        self.summary_label.config(text=f"{session_count} matches in this session, {len(rows)} error/warning lines in past runs")
+
+    def grep_logs(self, query, search_id, found):
+        # Runs on its own thread with its own connection, as SQLite connections stay on their thread
+        history = BuildHistory(self.history.path)
+        import sqlite3 # Loaded with the history, not at startup
+        try:
+            count = 0
+            for run in history.logged_runs():
+                if not os.path.exists(run['log']): continue
+                for line_no, text in grep_log(run['log'], query):
+                    if search_id != self.search_id or count >= self.MAX_RESULTS: return
+                    found.put((run, line_no, text))
+                    count += 1
+        except (sqlite3.Error, OSError, EOFError) as e:
+            found.put(e)
+        finally:
+            history.close()
+            found.put(None)
+
+    def show_grep_results(self, search_id, found, session_count):
+        if search_id != self.search_id or not self.winfo_exists(): return
+        while True:
+            try: result = found.get_nowait()
+            except queue.Empty:
+                self.after(50, self.show_grep_results, search_id, found, session_count)
+                return
+            if result is None: break
+            if isinstance(result, Exception):
+                self.summary_label.config(text=f"Error reading the logs: {result}")
+                return
+            self.add_result(*result[:2], '', result[2])
+        self.summary_label.config(text=f"{session_count} matches in this session, {len(self.results) - session_count} lines in past logs")
+
+    def open_result(self):
+        selection = self.tree.selection()
+        if not selection: return
+        run, line_no, text = self.results[selection[0]]
+        if run is None:
+            widget_line = line_no - self.app.scrollback.spilled_lines
+            if widget_line >= 1:
+                self.app.show_status_line(widget_line)
+            else:
+                InfoDialog(self, "Search Output", f"Line {line_no} is no longer in the Status Window; use 'Save Log...' for the full session.\n\n{text}")
+            return
+        if not run['log'] or not os.path.exists(run['log']):
+            InfoDialog(self, "Search Output", f"The log of this run has been removed.\n\n{text}")
+            return
+        self.show_excerpt(run, line_no)
+
+    def show_excerpt(self, run, line_no):
+        first = max(1, line_no - self.CONTEXT_LINES)
+        excerpt_win = tk.Toplevel(self)
+        excerpt_win.title(f"{run['name'] or run['button']} - {os.path.basename(run['log'])}, line {line_no}")
+        excerpt_win.geometry("900x500"); excerpt_win.transient(self)
+        text_area = tk.Text(excerpt_win, wrap='none', font=("Courier", 9))
+        scrollbar = ttk.Scrollbar(excerpt_win, orient='vertical', command=text_area.yview)
+        text_area.config(yscrollcommand=scrollbar.set)
+        text_area.pack(side="left", fill="both", expand=True); scrollbar.pack(side="right", fill="y")
+        text_area.tag_configure("match", background="#ffc107", foreground="black")
+        try:
+            for number, text in read_log_lines(run['log'], first, line_no + self.CONTEXT_LINES):
+                text_area.insert('end', f"{number:>7}  {text}\n", "match" if number == line_no else ())
+        except (OSError, EOFError) as e:
+            text_area.insert('end', f"Error reading {run['log']}: {e}\n")
+        text_area.see(f"{line_no - first + 1}.0")
+        text_area.config(state='disabled')
+
+    def save_and_close(self):
+        self.search_id += 1
+        self.app.config['Geometry']['log_search_window'] = self.geometry()
+        self.app.save_config('Geometry')
+        self.destroy()
+
+
+class ProblemsWindow(tk.Toplevel):
+    """Live list of the errors and warnings found in the output since the last button press.
+
+    Double-click an entry (or press Enter) to open the file at that line in
+    the editor. New entries are appended as the output arrives.
+    """
+    def __init__(self, parent, app_controller):
+        super().__init__(parent)
+        self.app = app_controller
+        self.diagnostics = self.app.runner.diagnostics
+        self.items = {} # item -> Diagnostic
+        self.generation = None
+        self.title("Problems")
+
+        saved_geom = self.app.config.get('Geometry', {}).get('problems_window')
+        if not saved_geom or saved_geom == '':
+            saved_geom = self.app.config.get('DefaultGeometry', {}).get('problems_window', '900x400')
+        self.geometry(saved_geom)
+
+        main_frame = ttk.Frame(self, padding=10)
+        main_frame.pack(fill="both", expand=True)
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.rowconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(main_frame, columns=('kind', 'location', 'message', 'step'), show='headings', selectmode='browse')
+        for column, heading, width in (('kind', "Kind", 70), ('location', "Location", 280), ('message', "Message", 420), ('step', "Step", 110)):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, stretch=column == 'message')
+        self.tree.tag_configure('error', foreground='#dc3545')
+        self.tree.tag_configure('warning', foreground='#b8860b')
+        scrollbar = ttk.Scrollbar(main_frame, orient='vertical', command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.grid(row=0, column=0, sticky='nsew'); scrollbar.grid(row=0, column=1, sticky='ns')
+        self.tree.bind('<Double-1>', lambda e: self.open_selected())
+        self.tree.bind('<Return>', lambda e: self.open_selected())
+
+        bottom_frame = ttk.Frame(main_frame)
+        bottom_frame.grid(row=1, column=0, columnspan=2, sticky='ew', pady=(10, 0))
+        self.summary_label = ttk.Label(bottom_frame, text="")
+        self.summary_label.pack(side='left')
+        ttk.Button(bottom_frame, text="Close", command=self.save_and_close).pack(side='right')
+        ttk.Button(bottom_frame, text="Open in Editor", command=self.open_selected).pack(side='right', padx=5)
+
+        self.protocol("WM_DELETE_WINDOW", self.save_and_close)
+        self.refresh()
+
+    def refresh(self):
+        """Adds the entries the tree doesn't show yet, or starts over after the list was cleared."""
+        if self.generation != self.diagnostics.generation:
+            self.tree.delete(*self.tree.get_children())
+            self.items.clear()
+            self.generation = self.diagnostics.generation
+        for diagnostic in self.diagnostics.entries[len(self.items):]:
+            item = self.tree.insert('', 'end', values=(diagnostic.kind, diagnostic.location, diagnostic.message, diagnostic.job.name), tags=(diagnostic.kind,))
+            self.items[item] = diagnostic
+        self.summary_label.config(text=self.diagnostics.summary() or "No problems found")
+
+    def open_selected(self):
+        selection = self.tree.selection()
+        if selection: self.app.open_diagnostic(self.items[selection[0]])
+
+    def save_and_close(self):
+        self.app.config['Geometry']['problems_window'] = self.geometry()
+        self.app.save_config('Geometry')
+        self.app.problems_window = None
+        self.destroy()
+
+
+class StartupProfile:
+    """Time spent in each phase of starting the window, reported with --startup-profile."""
+    def __init__(self, started=None):
+        self.last = self.started = started if started is not None else time.perf_counter()
+        self.phases = []
+
+    def mark(self, phase):
+        """Ends `phase` now; the next one starts here."""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        """The phases in order, with the total up to the first paint against STARTUP_TARGET_MS."""
+        names = [phase for phase, _ in self.phases]
+        painted = self.phases[:names.index('first paint') + 1] if 'first paint' in names else self.phases
+        total_ms = sum(seconds for _, seconds in painted) * 1000
+        lines = [f"  {phase:<26}{seconds * 1000:8.1f} ms" for phase, seconds in painted]
+        lines.append(f"  {'total':<26}{total_ms:8.1f} ms ({'within' if total_ms <= STARTUP_TARGET_MS else 'over'} the {STARTUP_TARGET_MS} ms target)")
+        lines += [f"  {phase:<26}{seconds * 1000:8.1f} ms (after the first paint)" for phase, seconds in self.phases[len(painted):]]
+        return "Startup profile:\n" + "\n".join(lines)
+
+
 class DevCommanderApp:
-    """The main application class."""
-    def __init__(self, root):
+    """The main application class.
+
+    Each project of the workspace has its own config, ConfigStore,
+    ProcessManager and CommandRunner; `self.config`, `self.config_store`,
+    `self.process_manager` and `self.runner` are those of the active one.
+    """
+    DIAGNOSTICS_POLL_MS = 100
+    ACTION_BUTTON_GRID = {'Button1': (0, 3, 1), 'Button2': (1, 0, 1), 'Button3': (1, 1, 1), 'Button4': (1, 2, 1), 'Button5': (1, 3, 1),
+                          'Button6': (2, 0, 2), 'Button7': (2, 2, 2), 'Button8': (3, 0, 2), 'Button9': (3, 2, 2), 'Button10':(4, 0, 4)} # Row, column, span
+    IDLE_CHECK_MS = 60000 # How often idle projects are unloaded
+
+    def __init__(self, root, startup=None, report_startup=False):
         self.root = root
+        self.startup, self.report_startup = startup or StartupProfile(), report_startup
         self.root.title(f"Developer Command Cycle v{APP_VERSION}")
         self.config = {}
-        self.process, self.master_fd = None, None
         self.output_queue = queue.Queue()
+        self.scrollback = Scrollback()
         self.command_running = False
         self.source_file = tk.StringVar()
         self.toolchain_type = tk.StringVar()
         self.always_on_top_var = tk.BooleanVar()
+        self.target_job = tk.StringVar()
         self.initial_on_top_state, self.needs_ui_rebuild = False, False
         self.toolchain_option_vars, self.action_buttons = {}, {}
+        self.action_button_states, self.action_button_styles = {}, {} # Shown (name, style) per button; style name per color
+        self.option_rows, self.preview_rows, self.preview_labels, self.loading_options = [], [], {}, False
         self.settings_window_instance = None
+        self.problems_window, self.polling_diagnostics = None, False
+        self.watch, self.watch_var, self.watch_button_keys, self.watch_update_timer = None, tk.BooleanVar(value=False), [], None
+        self.ui_traces_added, self.updating_project_tabs = False, False
+        self.secondary_panes_built = False # The workspace tabs and the Status Window's input/search rows follow the first paint
+        self.workspace, self.project = Workspace(os.getcwd()), None
 
         self.load_config()
+        self.startup.mark('load_config')
         
         saved_geom = self.config.get('Geometry', {}).get('main_window') or self.config.get('DefaultGeometry', {}).get('main_window', '800x600')
         self.root.geometry(saved_geom)
         
         self.apply_theme()
         self.configure_styles()
+        self.startup.mark('apply_theme')
         self.setup_ui()
+        self.startup.mark('setup_ui')
         self.populate_ui_from_config()
+        self.startup.mark('populate_ui_from_config')
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-        self.root.after(100, self.process_output_queue)
+        self.root.after_idle(self.finish_startup)
+
+    def finish_startup(self):
+        """Starts what the main window does not need for its first paint, once that is done."""
+        self.startup.mark('first paint')
+        self.build_secondary_panes()
+        self.startup.mark('secondary panes')
+        self.status_renderer.start()
+        self.root.after(self.IDLE_CHECK_MS, self.unload_idle_projects)
+        if self.report_startup:
+            report = self.startup.report()
+            print(report)
+            self.log_output(report, tag='info')
 
     def get_default_config(self):
         return copy.deepcopy(DEFAULT_CONFIG)
 
     def load_config(self):
-        parser = configparser.ConfigParser(interpolation=None, allow_no_value=True)
-        parser.optionxform = str
-
-        if os.path.exists(CONFIG_FILE_NAME):
-            self.config = defaultdict(dict)
-            parser.read(CONFIG_FILE_NAME)
-            for section in parser.sections():
-                if section.startswith('Toolchain:'):
-                    _, name = section.split(':', 1)
-                    if 'Toolchains' not in self.config: self.config['Toolchains'] = {}
-                    self.config['Toolchains'][name] = dict(parser.items(section))
-                else:
-                    self.config[section].update(dict(parser.items(section)))
-        else:
-            self.config = self.get_default_config()
-            self.save_config()
+        self.use_project(self.workspace.active)
 
+    def load_project(self, project):
+        """Reads a project's INI (creating it from the defaults if needed) and gives it its own store, job slots and runner."""
+        created = project.load(self.get_default_config)
         # Merge undeletable items to ensure they are always present at runtime
         for section, items in UNDELETABLE_ITEMS.items():
-            if section not in self.config: self.config[section] = {}
-            self.config[section].update(items)
+            if section not in project.config: project.config[section] = {}
+            project.config[section].update(items)
+        # Parse the Toolchains/AutoTyperProfiles strings once; everything after this works on model objects
+        build_config_model(project.config)
+        project.store = ConfigStore(project.ini_path, lambda: project.config, exclude=UNDELETABLE_ITEMS,
+                                    schedule=self.root.after, cancel=self.root.after_cancel,
+                                    on_error=lambda e: self.log_output(f"Error saving {project.ini_path}: {e}", tag='error'))
+        project.manager = ProcessManager(self.output_queue, self.root.after, on_change=self._on_jobs_changed)
+        project.runner = CommandRunner(project.manager, self.root.after, self.log_output,
+                                       on_job_start=self._on_job_start, on_auto_typed=self._on_auto_typed)
+        if created:
+            project.store.mark_dirty()
+            project.store.flush()
+
+    def use_project(self, project):
+        """Makes `project` the one the window shows and runs commands for, loading it first if needed."""
+        if not project.loaded: self.load_project(project)
+        self.project = project
+        self.workspace.activate(project)
+        self.config, self.config_store = project.config, project.store
+        self.process_manager, self.runner = project.manager, project.runner
+
+    def source_path(self):
+        """The source file as an absolute path; a relative one is taken relative to the active project's folder."""
+        source = self.source_file.get()
+        return os.path.join(self.project.folder, source) if source else ''
 
-    def save_config(self):
-        parser = configparser.ConfigParser(interpolation=None)
-        parser.optionxform = str
-        
-        config_to_save = copy.deepcopy(self.config)
-        
-        # Filter out undeletable items before saving to INI
-        for section, items in UNDELETABLE_ITEMS.items():
-            if section in config_to_save:
-                for key in items:
-                    if key in config_to_save[section]:
-                        del config_to_save[section][key]
+    def save_config(self, *sections):
+        # Marks the given sections (or everything) as changed; the ConfigStore
+        # batches these into a single atomic write. Undeletable items are
+        # filtered out by the store when rendering.
+        self.config_store.mark_dirty(*sections)
 
-        for section, data in config_to_save.items():
-            if section == 'Toolchains':
-                for name, t_data in data.items():
-                    parser[f'Toolchain:{name}'] = {k: str(v) for k, v in t_data.items()}
-            elif isinstance(data, dict):
-                 parser[section] = {k: str(v) for k, v in data.items()}
-            
-        with open(CONFIG_FILE_NAME, 'w') as f: parser.write(f)
+    def flush_config(self):
+        return self.config_store.flush()
 
     def apply_theme(self):
         is_dark = self.config.get('Options', {}).get('dark_mode', 'False').lower() == 'true'
@@ -2252,25 +2695,43 @@ class DevCommanderApp:
     def setup_ui(self):
         main_frame = ttk.Frame(self.root, padding=10)
         main_frame.pack(fill='both', expand=True)
-        main_frame.columnconfigure(0, weight=1); main_frame.rowconfigure(3, weight=1)
+        main_frame.columnconfigure(0, weight=1); main_frame.rowconfigure(4, weight=1)
+
+        self.workspace_frame = ttk.Frame(main_frame) # Filled in by build_secondary_panes
+        self.workspace_frame.grid(row=0, column=0, sticky='ew')
         
-        top_container = ttk.Frame(main_frame); top_container.grid(row=0, column=0, sticky='ew')
+        top_container = ttk.Frame(main_frame); top_container.grid(row=1, column=0, sticky='ew')
         top_container.columnconfigure(0, weight=1)
         self.create_project_widgets(top_container).grid(row=0, column=0, sticky='ewns')
         self.create_top_right_widgets(top_container).grid(row=0, column=1, sticky='ne', padx=10)
         
         self.dynamic_options_frame = ttk.LabelFrame(main_frame, text="Toolchain Options", padding=10)
-        self.dynamic_options_frame.grid(row=1, column=0, sticky='ew', pady=5)
+        self.dynamic_options_frame.grid(row=2, column=0, sticky='ew', pady=5)
+        self.toolchain_options_cb_frame = ttk.Frame(self.dynamic_options_frame)
+        self.toolchain_options_cb_frame.pack(side='left', fill='x', expand=True)
+        self.toolchain_options_cb_frame.bind('<Configure>', self._update_preview_wraps)
+        self.option_checks_frame = ttk.Frame(self.toolchain_options_cb_frame); self.option_checks_frame.pack(fill='x')
+        self.option_previews_frame = ttk.Frame(self.toolchain_options_cb_frame); self.option_previews_frame.pack(fill='x')
         
         self.actions_frame = ttk.LabelFrame(main_frame, text="Actions", padding=10)
-        self.actions_frame.grid(row=2, column=0, sticky='ew', pady=5)
+        self.actions_frame.grid(row=3, column=0, sticky='ew', pady=5)
         
-        self.create_status_widgets(main_frame).grid(row=3, column=0, sticky='nsew', pady=5)
+        self.create_status_widgets(main_frame).grid(row=4, column=0, sticky='nsew', pady=5)
+
+    def build_secondary_panes(self):
+        """Builds what the main window's first paint can do without: the workspace
+        tabs and the input and search rows under the Status Window."""
+        self.create_workspace_widgets(self.workspace_frame).pack(fill='x', pady=(0,5))
+        self.create_status_controls(self.status_frame)
+        self.secondary_panes_built = True
+        self.update_autotyper_indicator()
+        self.refresh_project_tabs()
+        self._on_jobs_changed()
 
     def populate_ui_from_config(self):
         paths = self.config.get('Paths', {})
         self.source_file.set(paths.get('last_source', ''))
-        self.source_file.trace_add('write', self._save_paths_to_config)
+        if not self.ui_traces_added: self.source_file.trace_add('write', self._save_paths_to_config)
         
         all_toolchains = sorted(list(self.config.get('Toolchains', {}).keys()))
         self.toolchain_combo['values'] = all_toolchains
@@ -2283,10 +2744,13 @@ class DevCommanderApp:
         else:
             self.toolchain_type.set('-- Select Toolchain --')
 
-        self.toolchain_type.trace_add('write', self.on_toolchain_selected)
+        if not self.ui_traces_added: self.toolchain_type.trace_add('write', self.on_toolchain_selected)
         self.on_toolchain_selected()
         self.apply_misc_options()
-        self.update_autotyper_indicator()
+        if self.secondary_panes_built:
+            self.update_autotyper_indicator()
+            self.refresh_project_tabs()
+        self.ui_traces_added = True
 
     def _save_paths_to_config(self, *args):
         self.config['Paths']['last_source'] = self.source_file.get()
@@ -2297,14 +2761,91 @@ class DevCommanderApp:
         self.always_on_top_var.set(on_top)
         self.root.wm_attributes("-topmost", on_top)
         self.initial_on_top_state = on_top
-        if hasattr(self, 'restart_label'):
+        try: self.scrollback.max_lines = int(self.config.get('Options', {}).get('status_scrollback_lines', STATUS_SCROLLBACK_LINES))
+        except ValueError: self.scrollback.max_lines = STATUS_SCROLLBACK_LINES
+        try: max_jobs = max(1, int(self.config.get('Options', {}).get('max_parallel_jobs', 1)))
+        except ValueError: max_jobs = 1
+        self.status_renderer.prefix_jobs = max_jobs > 1
+        self.process_manager.set_max_jobs(max_jobs)
+        if hasattr(self, 'restart_label') and not self.ui_traces_added:
             self.always_on_top_var.trace_add('write', self._check_topmost_change)
 
     def _check_topmost_change(self, *args):
         changed = self.always_on_top_var.get() != self.initial_on_top_state
         self.restart_label.config(text="Restart Required" if changed else "")
         self.config['Options']['always_on_top'] = str(self.always_on_top_var.get())
-        self.save_config() # Save this change immediately
+        self.save_config('Options')
+
+    def create_workspace_widgets(self, parent):
+        frame = ttk.Frame(parent)
+        frame.columnconfigure(0, weight=1)
+        self.project_tabs = ttk.Notebook(frame, height=0)
+        self.project_tabs.grid(row=0, column=0, sticky='ew')
+        self.project_tabs.bind("<<NotebookTabChanged>>", self.on_project_tab_changed)
+        ttk.Button(frame, text="Add Project...", command=self.add_project).grid(row=0, column=1, padx=(5,0))
+        self.close_project_button = ttk.Button(frame, text="Close Project", command=self.close_project)
+        self.close_project_button.grid(row=0, column=2, padx=(5,0))
+        return frame
+
+    def refresh_project_tabs(self):
+        self.updating_project_tabs = True
+        try:
+            for tab in self.project_tabs.tabs(): self.project_tabs.forget(tab)
+            for project in self.workspace.projects:
+                self.project_tabs.add(ttk.Frame(self.project_tabs, height=0), text=project.name)
+            self.project_tabs.select(self.workspace.projects.index(self.project))
+        finally:
+            self.updating_project_tabs = False
+        self.close_project_button.config(state='disabled' if self.project is self.workspace.projects[0] else 'normal')
+
+    def on_project_tab_changed(self, event=None):
+        if self.updating_project_tabs: return
+        project = self.workspace.projects[self.project_tabs.index('current')]
+        if project is not self.project: self.switch_project(project)
+
+    def switch_project(self, project):
+        """Makes another workspace project the active one. Its jobs, and those of the project left, keep running."""
+        if self.watch:
+            self.watch_var.set(False)
+            self.toggle_watch()
+        self._save_paths_to_config()
+        self.save_config('Paths')
+        self.flush_config()
+        if self.problems_window and self.problems_window.winfo_exists(): self.problems_window.save_and_close()
+        try:
+            self.use_project(project)
+        except (OSError, configparser.Error) as e:
+            self.log_output(f"Error: could not open the project in {project.folder}: {e}", tag='error')
+            return self.refresh_project_tabs()
+        self.workspace.save()
+        self.populate_ui_from_config()
+        self._on_jobs_changed()
+        self.problems_button.config(text="Problems")
+        self.log_output(f"\n--- Project '{project.name}' ({project.folder}) ---", tag='info')
+        self.unload_idle_projects(reschedule=False)
+
+    def unload_idle_projects(self, reschedule=True):
+        for project in self.workspace.unload_idle():
+            self.log_output(f"Project '{project.name}' is idle and was unloaded; it is read again when you switch back.", tag='info')
+        if reschedule: self.root.after(self.IDLE_CHECK_MS, self.unload_idle_projects)
+
+    def add_project(self):
+        from tkinter import filedialog
+        if not (folder := filedialog.askdirectory(title="Add Project Folder", initialdir=os.path.dirname(self.project.folder))): return
+        project = self.workspace.add(folder)
+        self.workspace.save()
+        self.switch_project(project)
+
+    def close_project(self):
+        """Removes the active project from the workspace (not the folder it was started in) and goes back to that one."""
+        project = self.project
+        if project is self.workspace.projects[0]: return
+        if project.busy: return self.log_output(f"Project '{project.name}' still has jobs running; stop them first.", tag='error')
+        self.switch_project(self.workspace.projects[0])
+        if self.workspace.remove(project):
+            self.workspace.save()
+            self.refresh_project_tabs()
+            self.log_output(f"Project '{project.name}' closed.", tag='info')
 
     def create_project_widgets(self, parent):
         frame = ttk.LabelFrame(parent, text="Project", padding=10)
@@ -2315,8 +2856,62 @@ class DevCommanderApp:
         ttk.Label(frame, text="Toolchain:").grid(row=1, column=0, sticky='w', padx=5, pady=2)
         self.toolchain_combo = ttk.Combobox(frame, textvariable=self.toolchain_type, state='readonly', exportselection=False)
         self.toolchain_combo.grid(row=1, column=1, sticky='w')
+        ttk.Label(frame, text="Watch:").grid(row=2, column=0, sticky='w', padx=5, pady=2)
+        watch_frame = ttk.Frame(frame); watch_frame.grid(row=2, column=1, columnspan=2, sticky='ew')
+        ttk.Checkbutton(watch_frame, text="On change, run", variable=self.watch_var, command=self.toggle_watch).pack(side='left')
+        self.watch_combo = ttk.Combobox(watch_frame, state='readonly', width=24, exportselection=False)
+        self.watch_combo.pack(side='left', padx=5)
+        self.watch_combo.bind("<<ComboboxSelected>>", self.on_watch_button_selected)
+        self.watch_status_label = ttk.Label(watch_frame, text="", foreground='gray')
+        self.watch_status_label.pack(side='left')
+        self.source_file.trace_add('write', self.schedule_watch_update)
         return frame
 
+    def update_watch_buttons(self):
+        """Fills the Watch drop-down with the toolchain's buttons and restarts watching if the button changed."""
+        toolchain = self.config.get('Toolchains', {}).get(self.toolchain_type.get())
+        buttons = [(key, button.name) for key, button in toolchain.buttons.items() if button.name and button.command.strip()] if toolchain else []
+        self.watch_button_keys = [key for key, _ in buttons]
+        self.watch_combo['values'] = [f"{name} ({key})" for key, name in buttons]
+        selected = toolchain.watch_button if toolchain and toolchain.watch_button in self.watch_button_keys else ''
+        if selected: self.watch_combo.current(self.watch_button_keys.index(selected))
+        else: self.watch_combo.set('')
+        if self.watch and (not selected or self.watch.button_key != selected): self.toggle_watch()
+        elif self.watch: self.watch.update_paths()
+
+    def on_watch_button_selected(self, event=None):
+        toolchain = self.config.get('Toolchains', {}).get(self.toolchain_type.get())
+        if not toolchain or self.watch_combo.current() < 0: return
+        toolchain.watch_button = self.watch_button_keys[self.watch_combo.current()]
+        self.save_config('Toolchains')
+        if self.watch: self.toggle_watch()
+
+    def toggle_watch(self):
+        """Starts or stops Watch mode to match the checkbox, restarting it for the current toolchain and button."""
+        if self.watch:
+            self.watch.stop()
+            self.watch = None
+            self.watch_status_label.config(text="")
+        if not self.watch_var.get(): return
+        index = self.watch_combo.current()
+        if index < 0 or not self.source_file.get():
+            self.watch_var.set(False)
+            return self.log_output("Watch: select a source file and the button to run first.", tag='error')
+        self.watch = WatchMode(self.runner, self.root.after, self.root.after_cancel, lambda callback: self.root.after(0, callback),
+                               self.command_context, self.watch_button_keys[index], on_status=lambda text: self.watch_status_label.config(text=text))
+        self.watch.start()
+        self.log_output(f"Watch: '{self.watch_combo.get()}' runs whenever the source changes.", tag='info')
+
+    def schedule_watch_update(self, *args):
+        # The source file is typed a character at a time; follow it once it has settled
+        if not self.watch: return
+        if self.watch_update_timer: self.root.after_cancel(self.watch_update_timer)
+        self.watch_update_timer = self.root.after(500, self._update_watch_paths)
+
+    def _update_watch_paths(self):
+        self.watch_update_timer = None
+        if self.watch: self.watch.update_paths()
+
     def create_top_right_widgets(self, parent):
         frame = ttk.Frame(parent, padding=(0, 5))
         frame.columnconfigure(0, weight=1)
@@ -2325,45 +2920,61 @@ class DevCommanderApp:
         self.restart_label = ttk.Label(frame, text="", foreground='#ff4444', font=('Helvetica', 8, 'italic'))
         self.restart_label.grid(row=1, column=0, sticky='w', padx=(20,0))
         ttk.Button(frame, text="About", command=self.open_about_window).grid(row=2, column=0, sticky='ew', pady=(10,2))
-        ttk.Button(frame, text="Exit", command=self.on_closing).grid(row=3, column=0, sticky='ew', pady=2)
+        ttk.Button(frame, text="History", command=self.open_history_window).grid(row=3, column=0, sticky='ew', pady=2)
+        ttk.Button(frame, text="Exit", command=self.on_closing).grid(row=4, column=0, sticky='ew', pady=2)
         return frame
 
-    def rebuild_action_buttons(self):
-        for widget in self.actions_frame.winfo_children(): widget.destroy()
-        self.action_buttons.clear()
-        
+    def create_action_buttons(self):
+        """Creates the Actions frame's buttons once; rebuild_action_buttons shows and updates them per toolchain."""
         for i in range(4): self.actions_frame.columnconfigure(i, weight=1)
         
         ttk.Button(self.actions_frame, text="Settings", command=lambda: self.log_and_run("Settings", self.open_settings)).grid(row=0, column=0, padx=2, pady=2, sticky='ew')
         ttk.Button(self.actions_frame, text="Open Folder", command=lambda: self.log_and_run("Open Folder", self.open_project_folder)).grid(row=0, column=1, padx=2, pady=2, sticky='ew')
         ttk.Button(self.actions_frame, text="Clean", command=lambda: self.log_and_run("Clean", self.clean_project), style="Danger.TButton").grid(row=0, column=2, padx=2, pady=2, sticky='ew')
 
-        toolchain_name = self.toolchain_type.get()
-        if not toolchain_name: return
-        toolchain_data = self.config.get('Toolchains', {}).get(toolchain_name, {})
-        try: buttons_data = ast.literal_eval(toolchain_data.get('custom_buttons', '{}'))
-        except (ValueError, SyntaxError): buttons_data = {}
+        for key, (row, col, span) in self.ACTION_BUTTON_GRID.items():
+            btn = ttk.Button(self.actions_frame, command=lambda k=key: self.execute_custom_button(k))
+            btn.grid(row=row, column=col, columnspan=span, sticky='ew', padx=2, pady=2); btn.grid_remove()
+            self.action_buttons[key] = btn
+        self.pipeline_button = ttk.Button(self.actions_frame, command=self.run_pipeline)
+        self.pipeline_button.grid(row=5, column=0, columnspan=4, sticky='ew', padx=2, pady=2); self.pipeline_button.grid_remove()
 
-        style = ttk.Style()
-        grid_map = {'Button1': (0, 3, 1), 'Button2': (1, 0, 1), 'Button3': (1, 1, 1), 'Button4': (1, 2, 1), 'Button5': (1, 3, 1), 
-                    'Button6': (2, 0, 2), 'Button7': (2, 2, 2), 'Button8': (3, 0, 2), 'Button9': (3, 2, 2), 'Button10':(4, 0, 4)}
-        
-        for i in range(1, 11):
-            key = f"Button{i}"
-            if name := buttons_data.get(key, {}).get('name'):
-                color = buttons_data[key].get('color', '#F0F0F0')
-                style_name = f"{key}.TButton"
-                try:
-                    r, g, b = self.root.winfo_rgb(color)
-                    text_color = 'black' if (r*299 + g*587 + b*114) / 65535 > 0.5 else 'white'
-                    style.configure(style_name, background=color, foreground=text_color, padding=5, font=('Helvetica', 10))
-                    style.map(style_name, background=[('active', color)], foreground=[('active', text_color)])
-                except tk.TclError: style.configure(style_name, background=color)
+    def rebuild_action_buttons(self):
+        self.update_watch_buttons()
+        if not self.action_buttons: self.create_action_buttons()
 
-                row, col, span = grid_map.get(key)
-                btn = ttk.Button(self.actions_frame, text=name, style=style_name, command=lambda k=key: self.execute_custom_button(k))
-                btn.grid(row=row, column=col, columnspan=span, sticky='ew', padx=2, pady=2)
-                self.action_buttons[key] = btn
+        toolchain_name = self.toolchain_type.get()
+        toolchain = (self.config.get('Toolchains', {}).get(toolchain_name) if toolchain_name else None) or Toolchain()
+
+        # Only buttons whose name or color changed are touched; a button without a name is hidden
+        for key, btn in self.action_buttons.items():
+            button = toolchain.button(key)
+            shown = (button.name, self.action_button_style(button.color)) if button.name else None
+            if shown == self.action_button_states.get(key): continue
+            self.action_button_states[key] = shown
+            if shown:
+                btn.config(text=shown[0], style=shown[1]); btn.grid()
+            else: btn.grid_remove()
+
+        if toolchain.build_steps:
+            text = "Pipeline: " + " > ".join(step.label for step in toolchain.build_steps)
+            if self.pipeline_button.cget('text') != text: self.pipeline_button.config(text=text)
+            self.pipeline_button.grid()
+        else: self.pipeline_button.grid_remove()
+
+    def action_button_style(self, color):
+        """The ttk style of an action button in `color`, configured the first time the color is used."""
+        style_name = self.action_button_styles.get(color)
+        if style_name: return style_name
+        style_name = self.action_button_styles[color] = f"Action{len(self.action_button_styles)}.TButton"
+        style = ttk.Style()
+        try:
+            r, g, b = self.root.winfo_rgb(color)
+            text_color = 'black' if (r*299 + g*587 + b*114) / 65535 > 0.5 else 'white'
+            style.configure(style_name, background=color, foreground=text_color, padding=5, font=('Helvetica', 10))
+            style.map(style_name, background=[('active', color)], foreground=[('active', text_color)])
+        except tk.TclError: style.configure(style_name, background=color)
+        return style_name
 
     def create_status_widgets(self, parent):
         frame = ttk.LabelFrame(parent, text="Status Window", padding=10)
@@ -2374,6 +2985,7 @@ class DevCommanderApp:
         self.output_text.config(yscrollcommand=scrollbar.set)
         self.output_text.grid(row=0, column=0, sticky='nsew'); scrollbar.grid(row=0, column=1, sticky='ns')
         self.ansi_handler = AnsiColorHandler(self.output_text)
+        self.status_renderer = StatusRenderer(self.root, self.output_text, self.ansi_handler, self.output_queue, self.scrollback)
         try:
             bold_font = tkfont.Font(self.output_text, self.output_text.cget("font"), weight="bold")
             italic_font = tkfont.Font(self.output_text, self.output_text.cget("font"), slant="italic")
@@ -2382,36 +2994,99 @@ class DevCommanderApp:
             self.output_text.tag_configure("info", foreground="#17a2b8")
             self.output_text.tag_configure("user_input", foreground="#007bff", font=italic_font)
             self.output_text.tag_configure("prompt", foreground="#ffc107", font=italic_font)
+            self.output_text.tag_configure("search_match", background="#ffc107", foreground="black")
         except tk.TclError: pass
+        self.status_frame = frame
+        return frame
 
+    def create_status_controls(self, frame):
+        """The input and search rows under the Status Window."""
         input_frame = ttk.Frame(frame); input_frame.grid(row=1, column=0, columnspan=2, sticky='ew', pady=(5,0))
         input_frame.columnconfigure(1, weight=1)
         self.autotyper_label = ttk.Label(input_frame, text="", foreground='#ff4444', font=('Helvetica', 10, 'bold'))
         self.autotyper_label.grid(row=0, column=0, padx=(0,5))
         self.input_entry = ttk.Entry(input_frame); self.input_entry.grid(row=0, column=1, sticky='ew')
         self.input_entry.bind("<Return>", self.send_input_to_process); self.input_entry.bind("<KP_Enter>", self.send_input_to_process)
-        ttk.Button(input_frame, text="Enter", command=self.send_input_to_process).grid(row=0, column=2, padx=5)
+        self.job_combo = ttk.Combobox(input_frame, textvariable=self.target_job, state='readonly', width=14)
+        self.job_combo.grid(row=0, column=2, padx=(5,0))
+        ttk.Button(input_frame, text="Enter", command=self.send_input_to_process).grid(row=0, column=3, padx=5)
         self.break_button = ttk.Button(input_frame, text="Break", command=self.send_break_signal, state='disabled')
-        self.break_button.grid(row=0, column=3, padx=5)
-        return frame
+        self.break_button.grid(row=0, column=4, padx=5)
+        ttk.Button(input_frame, text="Save Log...", command=self.save_status_log).grid(row=0, column=5)
+
+        search_frame = ttk.Frame(frame); search_frame.grid(row=2, column=0, columnspan=2, sticky='ew', pady=(5,0))
+        search_frame.columnconfigure(1, weight=1)
+        ttk.Label(search_frame, text="Search:").grid(row=0, column=0, padx=(0,5))
+        self.search_entry = ttk.Entry(search_frame); self.search_entry.grid(row=0, column=1, sticky='ew')
+        self.search_entry.bind("<Return>", self.open_log_search); self.search_entry.bind("<KP_Enter>", self.open_log_search)
+        ttk.Button(search_frame, text="Find", command=self.open_log_search).grid(row=0, column=2, padx=5)
+        self.problems_button = ttk.Button(search_frame, text="Problems", command=self.open_problems_window)
+        self.problems_button.grid(row=0, column=3)
+
+    def open_problems_window(self):
+        if self.problems_window and self.problems_window.winfo_exists():
+            self.problems_window.lift()
+        else:
+            self.problems_window = ProblemsWindow(self.root, self)
+
+    def poll_diagnostics(self):
+        """Picks up new errors and warnings while jobs run, updating the Problems button and window."""
+        diagnostics = self.runner.diagnostics
+        diagnostics.collect()
+        count = len(diagnostics.entries)
+        self.problems_button.config(text=f"Problems ({count})" if count else "Problems")
+        if self.problems_window and self.problems_window.winfo_exists(): self.problems_window.refresh()
+        if diagnostics.jobs: self.root.after(self.DIAGNOSTICS_POLL_MS, self.poll_diagnostics)
+        else: self.polling_diagnostics = False
+
+    def open_diagnostic(self, diagnostic):
+        """Opens the diagnostic's file at its line with the 'edit_line' action."""
+        if not diagnostic.file:
+            return InfoDialog(self.root, "Problems", f"This message doesn't name a source file:\n\n{diagnostic.message}")
+        template = self.config.get('Actions', {}).get('edit_line') or DEFAULT_CONFIG['Actions']['edit_line']
+        command = self.command_context().resolve(template, replacements_override={
+            'f': shlex.quote(diagnostic.file), 'l': str(diagnostic.line or 1), 'c': str(diagnostic.column or 1)})
+        self.runner.run_external_command(self.command_context(), command)
+
+    def open_log_search(self, event=None):
+        if query := self.search_entry.get().strip():
+            LogSearchWindow(self.root, self, query)
+
+    def show_status_line(self, line):
+        """Scrolls the Status Window to a line and highlights it."""
+        self.output_text.tag_remove("search_match", '1.0', tk.END)
+        self.output_text.tag_add("search_match", f"{line}.0", f"{line}.end")
+        self.output_text.see(f"{line}.0")
+
+    def save_status_log(self):
+        initial_dir = os.path.dirname(self.source_path()) or self.project.folder
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(initialdir=initial_dir, initialfile="devCMDcycle.log", defaultextension=".log",
+                                            filetypes=[("Log files", "*.log"), ("All files", "*.*")])
+        if not path: return
+        self.status_renderer.render_pending() # Include anything still queued
+        try:
+            self.scrollback.export(path)
+            self.log_output(f"Status Window log saved to {path}", tag='info')
+        except OSError as e:
+            self.log_output(f"Error saving log: {e}", tag='error')
 
     def on_toolchain_selected(self, *args):
-        for widget in self.dynamic_options_frame.winfo_children():
-            widget.destroy()
         self.toolchain_option_vars.clear()
         
         toolchain_name = self.toolchain_type.get()
         
         self.config['Paths']['last_toolchain'] = toolchain_name
-        self.save_config() 
         
         if not toolchain_name or toolchain_name in UNDELETABLE_ITEMS.get('Toolchains', {}): 
+            self.show_toolchain_options(Toolchain(), toolchain_name)
+            self.save_config('Paths')
             self.rebuild_action_buttons()
             return
 
-        toolchain_data = self.config.get('Toolchains', {}).get(toolchain_name, {})
+        toolchain = self.config.get('Toolchains', {}).get(toolchain_name) or Toolchain()
         
-        new_profile = toolchain_data.get('autotyper_profile')
+        new_profile = toolchain.autotyper_profile
         all_profiles = self.config.get('AutoTyperProfiles', {})
         
         if new_profile and new_profile in all_profiles:
@@ -2423,44 +3098,54 @@ class DevCommanderApp:
             if new_profile: 
                  self.log_output(f"Warning: Toolchain specifies profile '{new_profile}', but it was not found. Falling back.", tag='error')
 
-        self.save_config() 
+        self.save_config('Paths', 'Options')
         self.update_autotyper_indicator()
         
-        try: toolchain_options = ast.literal_eval(toolchain_data.get('toolchain_options', '[]'))
-        except (ValueError, SyntaxError): toolchain_options = []
-        try: buttons_data = ast.literal_eval(toolchain_data.get('custom_buttons', '{}'))
-        except (ValueError, SyntaxError): buttons_data = {}
 
-        self.toolchain_options_cb_frame = ttk.Frame(self.dynamic_options_frame)
-        self.toolchain_options_cb_frame.pack(side='left', fill='x', expand=True)
-        self.toolchain_options_cb_frame.bind('<Configure>', self._update_preview_wraps)
+        self.show_toolchain_options(toolchain, toolchain_name)
+        self.rebuild_action_buttons()
+        if self.settings_window_instance and self.settings_window_instance.winfo_exists():
+            self.settings_window_instance.refresh_profile_display()
 
-        preview_targets = set()
-        for option in toolchain_options:
-            name, flag, target = option.get('name', ''), option.get('flag', ''), option.get('target', 'None')
-            key = f"{toolchain_name}_{name.replace(' ', '_')}"
-            var = tk.BooleanVar(name=f"toolchain_var_{key}", value=self.config.get('ToolchainStates', {}).get(key, 'False').lower() == 'true')
-            ttk.Checkbutton(self.toolchain_options_cb_frame, text=name, variable=var).pack(anchor='w')
-            self.toolchain_option_vars[name] = (var, target, flag)
-            var.trace_add('write', lambda *a, t=target: self._update_toolchain_state_and_preview(t))
-            preview_targets.add(target)
+    def show_toolchain_options(self, toolchain, toolchain_name):
+        """Shows the toolchain's option checkboxes and command previews, rebinding the rows kept from the last toolchain."""
+        states = self.config.get('ToolchainStates', {})
+        self.loading_options = True
+        for i, option in enumerate(toolchain.options):
+            if i == len(self.option_rows):
+                row = {'var': tk.BooleanVar(), 'target': None}
+                row['check'] = ttk.Checkbutton(self.option_checks_frame, variable=row['var'])
+                row['var'].trace_add('write', lambda *a, r=row: self._on_toolchain_option_toggled(r))
+                self.option_rows.append(row)
+            row = self.option_rows[i]
+            row['target'] = option.target or 'None'
+            row['var'].set(states.get(option.state_key(toolchain_name), 'False').lower() == 'true')
+            if row['check'].cget('text') != option.name: row['check'].config(text=option.name)
+            row['check'].pack(anchor='w')
+            self.toolchain_option_vars[option.name] = (row['var'], row['target'], option.flag)
+        for row in self.option_rows[len(toolchain.options):]: row['check'].pack_forget()
+        self.loading_options = False
 
         self.preview_labels = {}
-        for target in sorted(list(preview_targets)):
-            if target == 'None': continue
-            button_name = buttons_data.get(target, {}).get('name', target)
-            preview_container = ttk.Frame(self.toolchain_options_cb_frame)
-            preview_container.pack(fill='x', pady=(5,0))
-            ttk.Label(preview_container, text=f"{button_name or target} Preview:", foreground="gray").pack(side='left', anchor='nw', padx=(0,5))
-            
-            preview_label = ttk.Label(preview_container, text="", relief='sunken', padding=2, justify='left')
-            preview_label.pack(fill='x', expand=True)
-            self.preview_labels[target] = preview_label
+        preview_targets = sorted({row[1] for row in self.toolchain_option_vars.values()} - {'None'})
+        for i, target in enumerate(preview_targets):
+            if i == len(self.preview_rows):
+                container = ttk.Frame(self.option_previews_frame)
+                title = ttk.Label(container, foreground="gray")
+                title.pack(side='left', anchor='nw', padx=(0,5))
+                label = ttk.Label(container, text="", relief='sunken', padding=2, justify='left')
+                label.pack(fill='x', expand=True)
+                self.preview_rows.append((container, title, label))
+            container, title, label = self.preview_rows[i]
+            button_name = toolchain.buttons[target].name if target in toolchain.buttons else target
+            title.config(text=f"{button_name or target} Preview:")
+            container.pack(fill='x', pady=(5,0))
+            self.preview_labels[target] = label
             self._update_toolchain_state_and_preview(target)
-        
-        self.rebuild_action_buttons()
-        if self.settings_window_instance and self.settings_window_instance.winfo_exists():
-            self.settings_window_instance.refresh_profile_display()
+        for container, _, _ in self.preview_rows[len(preview_targets):]: container.pack_forget()
+
+    def _on_toolchain_option_toggled(self, row):
+        if not self.loading_options: self._update_toolchain_state_and_preview(row['target'])
 
     def _update_preview_wraps(self, event=None):
         if not hasattr(self, 'preview_labels') or not hasattr(self, 'toolchain_options_cb_frame'): return
@@ -2479,26 +3164,31 @@ class DevCommanderApp:
             self.config['ToolchainStates'][key] = str(var.get())
 
         if target_button and target_button in self.preview_labels:
-            try:
-                toolchain_data = self.config['Toolchains'][toolchain_name]
-                buttons_data = ast.literal_eval(toolchain_data.get('custom_buttons', '{}'))
-                base_command = buttons_data.get(target_button, {}).get('command', '')
-            except (KeyError, ValueError, SyntaxError): base_command = ''
+            toolchain = self.config.get('Toolchains', {}).get(toolchain_name) or Toolchain()
+            base_command = toolchain.button(target_button).command
 
             preview_cmd = self.resolve_command_placeholders(
                 action_key=None, command_override=base_command,
-                replacements_override={'t': toolchain_data.get('path', toolchain_name)}, 
+                replacements_override={'t': toolchain.path or toolchain_name}, 
                 resolve_tool_paths=False, target_button=target_button
             )
             self.preview_labels[target_button].config(text=preview_cmd)
         
-        self.save_config()
+        self.save_config('ToolchainStates')
 
     def on_closing(self):
         self._save_paths_to_config()
         self.config['Geometry']['main_window'] = self.root.geometry()
-        self.save_config()
-        if self.process and self.process.poll() is None: self.process.terminate()
+        self.save_config('Paths', 'Geometry')
+        self.flush_config()
+        if self.watch: self.watch.stop()
+        for project in self.workspace.projects:
+            if not project.loaded: continue
+            project.store.flush()
+            project.manager.terminate_all()
+            project.runner.close()
+        self.workspace.save()
+        self.scrollback.close()
         self.root.destroy()
     #commented out to make this change for windows, as it refused to open the right directory
     #def browse_source_file(self):
@@ -2507,48 +3197,35 @@ class DevCommanderApp:
     #        self.save_config()
     
     def browse_source_file(self):
-        current_source = self.source_file.get()
+        current_source = self.source_path()
         if current_source and os.path.isfile(current_source):
             # If a valid source file is already loaded, start in its directory.
             initial_dir = os.path.dirname(current_source)
         else:
-            # Otherwise, start in the current working directory.
-            initial_dir = os.getcwd()
+            # Otherwise, start in the project's folder.
+            initial_dir = self.project.folder
 
+        from tkinter import filedialog
         if path := filedialog.askopenfilename(initialdir=initial_dir):
             self.source_file.set(path)
-            self.save_config()
+            self.save_config('Paths')
 
     def browse_output_file(self):
         InfoDialog(self.root, "Information", "The output path is now determined automatically based on the Source File.")
 
+    def log_window_opened(self, window, started):
+        self.log_output(f"{window.title()} opened in {(time.perf_counter() - started) * 1000:.0f} ms", tag='info')
+
     def log_output(self, text, raw=False, tag=None):
-        def _log():
-            self.output_text.config(state='normal')
-            if raw: self.ansi_handler.write(text)
-            else: self.output_text.insert(tk.END, text + '\n', (tag,) if tag else ())
-            self.output_text.see(tk.END)
-            self.output_text.config(state='disabled')
-        if self.root.winfo_exists(): self.root.after(0, _log)
-
-    def process_output_queue(self):
-        try:
-            while True: self.log_output(self.output_queue.get_nowait(), raw=True)
-        except queue.Empty: pass
-        finally: self.root.after(100, self.process_output_queue)
+        # Safe to call from any thread: the StatusRenderer picks this up on its next frame,
+        # in order with the process output already queued.
+        self.output_queue.put(text if raw else (text, tag))
 
     def is_autotyper_active(self):
-        profile_name = self.config['Options'].get('active_auto_typer_profile')
-        if not profile_name or profile_name == '-- No Profile Selected --':
-            return False
-        try:
-            profile_str = self.config['AutoTyperProfiles'].get(profile_name, '{}')
-            profile_data = ast.literal_eval(profile_str)
-            return profile_data.get('master_enabled', 'False').lower() == 'true'
-        except (ValueError, SyntaxError):
-            return False
+        return active_auto_typer_profile(self.config) is not None
 
     def update_autotyper_indicator(self):
+        if not self.secondary_panes_built: return
         self.autotyper_label.config(text="A-R" if self.is_autotyper_active() else "")
 
     def _on_settings_close(self):
@@ -2561,6 +3238,9 @@ class DevCommanderApp:
         else:
             self.settings_window_instance = SettingsWindow(self.root, self, self._on_settings_close)
 
+    def open_history_window(self):
+        HistoryWindow(self.root, self)
+
     def open_about_window(self):
         about_win = tk.Toplevel(self.root)
         about_win.title(f"Developer Command Cycle v{APP_VERSION} - User Manual")
@@ -2582,13 +3262,19 @@ class DevCommanderApp:
         text_area.tag_configure("bold", font=fonts['bold']); text_area.tag_configure("italic", font=fonts['italic'])
         text_area.tag_configure("mono", font=fonts['mono'], background="#f0f0f0", lmargin1=20, lmargin2=20, rmargin=20, spacing1=5, spacing3=5, wrap='none')
 
+        save_stats, job_stats = self.config_store.stats, self.process_manager.stats
         manual_content = [
                 (f"Developer Command Cycle v{APP_VERSION} - User Manual\n", "h1"),
                 (f"Author: RetroGameGirl (v{APP_VERSION})\n\n", ""),
-                (f"Script Location:\n", "h3"),
+                ("Script Location:\n", "h3"),
                 (f"The currently running script is located at:\n{os.path.abspath(__file__)}\n\n", "mono"),
-                (f"Current Working Directory:\n", "h3"),
-                (f"The project INI file will be loaded from or saved to:\n{os.getcwd()}\n\n", "mono"),
+                ("Project Folder:\n", "h3"),
+                (f"The project INI file will be loaded from or saved to:\n{self.project.folder}\n\n", "mono"),
+                ("Config Saves This Session:\n", "h3"),
+                (f"{save_stats['requests']} change(s) saved with {save_stats['writes']} disk write(s); {self.config_store.writes_avoided} write(s) avoided by batching.\n\n", "mono"),
+                ("Command Output This Session:\n", "h3"),
+                (f"{job_stats['bytes_read'] / 1e6:.1f} MB from {job_stats['exits']} finished command(s) in {job_stats['reads']} read(s), "
+                 f"queued as {job_stats['output_items']} chunk(s); fastest command {job_stats['peak_read_rate'] / 1e6:.1f} MB/s.\n\n", "mono"),
                 ("1. INTRODUCTION\n", "h2"),
                 ("Welcome to the Developer Command Cycle. This tool is a graphical front-end for automating command-line build processes. While it began as a personal utility for Atari 7800 homebrew development, it has evolved into a flexible, toolchain-based application suitable for any command-line driven project.\n\n"
                  "The core philosophy is to provide a simple, persistent UI for complex build chains, removing the need to repeatedly type commands. Everything is designed to be highly configurable through graphical menus, from tool paths to custom action buttons.\n\n", ""),
@@ -2610,12 +3296,12 @@ class DevCommanderApp:
                  " • Auto-Typer System: Create profiles for automating interactions with command-line tools that require user input.\n\n", ""),
                 ("The INI File:\n", "h3"),
                 (f"All settings are stored in `{CONFIG_FILE_NAME}`, located in your project's working directory (wherever you run the script from). This file is created automatically on the first run, allowing for per-project configurations.", ""),
-                ("Crucially, any change you make in the Settings, Toolchain, or Auto-Typer windows is saved to this file the moment it happens", "bold"),
-                (" (e.g., when you toggle a checkbox or click away from a text field). This ensures your configuration is always up-to-date without needing to manually save before closing a window.\n\n", ""),
+                ("Crucially, any change you make in the Settings, Toolchain, or Auto-Typer windows is saved to this file as soon as it happens", "bold"),
+                (" (e.g., when you toggle a checkbox or click away from a text field). Changes made in quick succession are batched into a single write, and anything still pending is written when the application closes. This ensures your configuration is always up-to-date without needing to manually save before closing a window.\n\n", ""),
                 ("The Backup Folders:\n", "h3"),
                 (f"The application automatically creates two backup folders to protect your data:\n"
-                 f" • `{INI_BACKUP_DIR}`: Created in your project's current working directory. This folder stores backups of your `{CONFIG_FILE_NAME}` file whenever you reset to the default configuration.\n"
-                 f" • `{SCRIPT_BACKUP_DIR}`: Created in the same directory where the `devCMDcycle.py` script itself is located. This stores backups of the actual program file whenever you use the built-in editor to update its internal `DEFAULT_CONFIG`.\n"
+                 f" • `{INI_BACKUP_DIR}`: Created in the project's folder. This folder stores backups of your `{CONFIG_FILE_NAME}` file whenever you reset to the default configuration.\n"
+                 f" • `{SCRIPT_BACKUP_DIR}`: Created in the same directory where the `devCMDcycle.py` script itself is located. This stores backups of the actual program file whenever you use the built-in editor to update the `DEFAULT_CONFIG` in `engineCMDcycle.py`.\n"
                  "This separation keeps your project-specific settings and the core application backups organized and safe.\n\n", ""),
                 ("4. THE MAIN WINDOW\n", "h2"),
                 ("The main window is your central hub for managing and building your project.\n\n", ""),
@@ -2631,7 +3317,8 @@ class DevCommanderApp:
                 (" • Clean: Deletes temporary build files from your project directory based on the extensions configured in Settings.\n", ""),
                 (" • Custom Buttons (Button 1-10): These are fully configurable. They can run a single command, an external program, or a sequence of other button actions.\n\n", ""),
                 ("Status Window:\n", "h3"),
-                ("This is where all output from your build tools is displayed in real-time. It supports ANSI color codes for better readability. An input box at the bottom allows you to send commands to interactive tools, and the 'Break' button can terminate a running process.\n\n", ""),
+                ("This is where all output from your build tools is displayed in real-time. It supports ANSI color codes (including 256-color, truecolor and background colors) for better readability. An input box at the bottom allows you to send commands to interactive tools, and the 'Break' button can terminate a running process. To stay fast in long sessions the window only keeps the most recent lines (10000 by default, set under Settings > Misc Options); older output is moved to a temporary file, and 'Save Log...' writes the complete session, including that older output, to a file of your choice.\n"
+                 "Several internal commands can run at the same time: set 'Parallel Jobs' under Settings > Misc Options (1 by default). Commands started while all slots are busy wait for a free one. With more than one slot, every output line is prefixed with the job it came from (e.g. `[2:Build]`), and the drop-down next to the input box selects which running job receives typed input and the 'Break' signal.\n\n", ""),
                 ("5. ADVANCED FEATURES & COMMANDS\n", "h2"),
                 ("The true power of the application lies in its flexible command system.\n\n", ""),
                 ("Command Placeholders:\n", "h3"),
@@ -2647,7 +3334,25 @@ class DevCommanderApp:
                  " • `%term`: Path to the Terminal\n\n", ""),
                 ("Composite & External Commands:\n", "h3"),
                 (" • **Composite Actions:** You can chain multiple button actions together by listing their internal names, separated by commas, in a button's command field. For example, a command of `Button3,Button4,Button6` will execute the actions for Button 3, then Button 4, and finally Button 6 in sequence. This is perfect for creating a complete 'Build, Header, and Run' sequence with one click.\n"
+                 "   Steps that don't depend on each other can run at the same time: `>` means 'then' (like a comma), `|` runs both sides in parallel, and parentheses group steps. For example, `(Button3|Button8)>Button4>Button6` runs Button 3 and Button 8 together, then Button 4 once both have succeeded, then Button 6. If a step fails, the steps that depend on it are skipped. When the chain ends, the Status Window reports the total time, the critical path (the longest chain of steps) and the scheduling overhead, i.e. the time spent between one step ending and the next one starting. Buttons used in a chain may themselves be composites. Parallel steps only overlap if 'Parallel Jobs' in the Settings allows more than one job.\n"
+                 f" • **Incremental Builds:** A button can list the files it creates in its 'Outputs' field (e.g. `%s.s.bin`) and, optionally, the files it reads in 'Inputs' (default `%f` together with every file it pulls in through `include`, `incbin`, `.include`, `.incbin` or `#include \"...\"`, followed recursively). Both fields are comma-separated and accept placeholders and wildcards. When such a button runs, directly or as part of a chain, it is skipped and reported as 'up to date' if its command line is unchanged, its outputs are still as it left them and none of its inputs have changed since its last successful run. The record is kept in `{BUILD_CACHE_FILE_NAME}` in the project folder; deleting the outputs (e.g. with Clean) forces a rebuild.\n"
                  " • **External Commands:** If you need to run a command in a new, separate terminal window (useful for GUIs or interactive tools), simply add the prefix `EXTERNAL:` to the command string. For example: `EXTERNAL:%m a7800 -cart %s.a78`.\n\n", ""),
+                ("Workspaces\n", "h3"),
+                (f"One window can switch between several project folders. 'Add Project...' (top of the main window) adds a folder as a tab; each project has its own `{CONFIG_FILE_NAME}` in its folder (created from the defaults if it has none yet), its own source file, toolchain and Parallel Jobs, and its own jobs, which keep running while you look at another project (their output still appears in the Status Window). A project's INI is only read the first time you open its tab, and projects you haven't used for ten minutes, or beyond the three most recent ones, are dropped from memory once nothing of theirs is running and read again when you come back. The folder the program was started in is always the first tab; the list of the others is kept in `{WORKSPACE_FILE_NAME}` there. 'Close Project' removes the current tab from the workspace without touching its files.\n\n", ""),
+                ("Artifact Cache\n", "h3"),
+                ("Set an 'Artifact Cache Folder' in the Settings (Misc Options) to keep the outputs of buttons and pipeline steps that declare 'Outputs'. The folder can be shared by all your projects. Each stored build is identified by its command line, the tool it runs and the contents of its inputs, so after switching git branches and back, or in a second copy of a project, the step is not run again: its outputs are copied back from the cache and the Status Window reports 'restored from the artifact cache' together with the hits and misses so far. 'Restore by hard link' links the files instead of copying them, which is instant and saves space, but only use it if your tools write new output files rather than changing them in place. When the cache grows past its size limit, the builds used least recently are removed.\n\n", ""),
+                ("Command Line Mode\n", "h3"),
+                ("Started with arguments, the program runs a single button and exits without opening any window, e.g. `devCMDcycle.py --toolchain cc65 --run Button9 --source game.c`. Buttons can be given by key or by name; without --toolchain or --source the last ones selected here are used. Placeholders, the option checkboxes as saved for the toolchain, its Auto-Typer profile, composite commands and up-to-date checks all work as they do in the window. Output goes to stdout and the exit code is that of the failing command (0 when everything succeeded), so it can be used from Makefiles and scripts. Run `devCMDcycle.py --help` for all options.\n\n", ""),
+                ("Build History\n", "h3"),
+                (f"Every command a button runs, here or in command line mode, is recorded in `{HISTORY_FILE_NAME}` in the source file's folder: the resolved command, toolchain and button, when it started and how long it took, its exit code, how much output it produced and a hash of the source file and its includes. Skipped 'up to date' steps and EXTERNAL launches are recorded as well. The 'History' button (top right of the main window) lists each step with its number of runs and failures, its average time and the average of its last five runs, with the change between the two showing whether a step is getting slower; select a step to see only its runs. `devCMDcycle.py --history [N]` prints the same summary and the last N runs.\n\n", ""),
+                ("Saved Logs & Search\n", "h3"),
+                (f"The output of every internal command is also saved, gzip-compressed, in the `{LOG_DIR_NAME}` folder next to the source file; the logs of the newest {CommandRunner.LOG_KEEP_RUNS} runs are kept. Lines mentioning an error or a warning are indexed word by word in the build history. Type into the 'Search' box under the Status Window and press Enter to list the matching lines of the current session (including output already scrolled out of the window) and the indexed error and warning lines of past runs. Tick 'Search every line of past logs' to search the complete logs instead; this reads through them in the background. Double-click a result to jump to it in the Status Window, or to see the lines around it in its saved log. From the command line, use `--search TEXT` (add `--full-text` to search every line).\n\n", ""),
+                ("Problems List\n", "h3"),
+                ("While a command runs, its output is checked for compiler and assembler messages (dasm/7800asm, cc65/ca65/ld65 and gcc/clang formats). The 'Problems' button under the Status Window shows how many were found since the last button press and opens a list of them; double-click an entry to open the file at that line in your editor. This uses the `edit_line` action (`%e +%l %f` by default, where `%l` is the line and `%c` the column; e.g. change it to `%e -g %f:%l` for VS Code). The format is chosen by the program that runs; the toolchain's 'Error Format' field in the Toolchain Editor can name one or more formats (comma-separated) instead, e.g. for a Makefile.\n\n", ""),
+                ("Pipelines\n", "h3"),
+                ("The `[Actions]` section of the INI file defines shared commands by name (e.g. `compile_dasm = %t %f`), with the same placeholders as the buttons. A toolchain's 'Pipeline Steps' (Toolchain Editor, `build_steps` in the INI) list actions to run one after another, e.g. `compile_cc65, sign_rom, add_header_a78`, so one definition can serve several toolchains. When a toolchain has steps, a 'Pipeline' button appears below its buttons. Each stage is reported with its time; a failing stage stops the pipeline. In the INI a step can also be written as a dict to give it a `name`, `inputs` and `outputs` (it is then skipped while up to date, as a button with outputs is) or `'on_error': 'continue'` to carry on after it fails, e.g. `{'action': 'compile_dasm', 'outputs': '%s.bin'}`. Toolchain options whose target is an action name add their flag to that stage. From the command line, use `--pipeline` instead of `--run`.\n\n", ""),
+                ("Watch Mode\n", "h3"),
+                ("Tick 'On change, run' in the Watch row of the main window and pick a button (e.g. Build, or a composite Build & Run) to have it run every time you save the source file or one of the files it includes. Changes are picked up within a fraction of a second (the watcher waits 200 ms for an editor to finish saving); files the button writes, its 'Outputs', never trigger it. Saving again while it still runs cancels the current run and starts over. The toolchain's 'Watch Patterns' field in the Toolchain Editor adds more files to watch (comma-separated, placeholders and wildcards allowed, e.g. `%p/gfx/*.png`); they also count as inputs for the up-to-date check. On Linux changes are reported by the system (inotify); elsewhere the files are checked twice a second. From the command line, add `--watch` to `--run`.\n\n", ""),
                 ("6. THE SETTINGS WINDOW\n", "h2"),
                 ("This window allows you to configure global settings and access the toolchain editors.\n\n", ""),
                 ("Paths to Tools:\n", "h3"),
@@ -2656,11 +3361,11 @@ class DevCommanderApp:
                 ("To streamline the creation of new configurations, both the Toolchain Editor and the Auto-Typer Profile Editor have a 'Copy' button. This allows you to duplicate a selected configuration and give it a new name. The application will validate the new name to ensure it doesn't already exist or conflict with a reserved system name.\n\n", ""),
                 ("Editing and Resetting the Default Config\n", "h3"),
                 ("The settings menu includes powerful tools for managing the application's built-in default configuration.\n"
-                 " • Edit Default Config: This opens a live editor that lets you modify the internal `DEFAULT_CONFIG` dictionary using the familiar INI format. When you click 'Update devCMDcycle.py', the script is patched, a backup is created, and you are given the option to immediately reset your current INI to use the new defaults.\n"
+                 " • Edit Default Config: This opens a live editor that lets you modify the internal `DEFAULT_CONFIG` dictionary using the familiar INI format. When you click 'Update engineCMDcycle.py', the engine script that holds it is patched, a backup is created, and you are given the option to immediately reset your current INI to use the new defaults.\n"
                  " • Roll Back: This restores the script from a previously created backup, undoing any changes to the defaults.\n"
                  " • Reset to Factory Defaults: This provides a safe way to reset your `.ini` file. It backs up your current INI and exits, allowing a fresh configuration to be generated on the next start.\n\n", ""),
                 ("The Auto-Typer Profile Editor\n", "h3"),
-                ("This window is the heart of the dynamic auto-typer system. You can create multiple profiles, each with up to 5 tabbed steps. Within each step, you can define a sequence of commands to be automatically typed into interactive prompts. It supports special placeholders like %b<num> to create text entry boxes in the main UI for dynamic input.\n\n", ""),
+                ("This window is the heart of the dynamic auto-typer system. You can create multiple profiles, each with up to 5 tabbed steps. Within each step, you can define a sequence of commands to be automatically typed into interactive prompts. It supports special placeholders like %b<num> to create text entry boxes in the main UI for dynamic input.\n\nEach profile can also have a 'Prompt', a regular expression matching the prompt of the program being typed into (the header profiles use `[$#>] ?$`, which matches prompts ending in '>', '$' or '#'). With a prompt, every command is sent as a whole line the moment the prompt appears, so a long header sequence finishes in well under a second and still works when the tool is slow. If the prompt does not appear within the 'Step Timeout', a warning is shown and the next command is sent anyway. Without a prompt, each command is sent once the program's output has been quiet for a moment, waiting no longer than the initial and per-command delays from the Settings window.\n\n", ""),
                 ("7. LICENSE INFORMATION\n", "h2"),
                 ("This software is licensed under the GNU General Public License version 3.\n"
                  "See [https://www.gnu.org/licenses/gpl-3.0.html](https://www.gnu.org/licenses/gpl-3.0.html) for details.\n", "")
@@ -2673,240 +3378,74 @@ class DevCommanderApp:
         for text, tag in manual_content: text_area.insert(tk.END, text, (tag,) if tag else ())
         text_area.config(state='disabled')
 
+    def command_context(self, toolchain_name=None):
+        """Snapshot of the selected toolchain and source file for resolving and running commands."""
+        return CommandContext(self.config, toolchain_name or self.toolchain_type.get(), self.source_path(),
+                              profile_name=self.config['Options'].get('active_auto_typer_profile'), project_folder=self.project.folder)
+
     def resolve_command_placeholders(self, action_key, replacements_override=None, resolve_tool_paths=True, command_override=None, target_button=None, toolchain_context=None):
         command_template = command_override if command_override is not None else self.config.get('Actions', {}).get(action_key, '')
-        
-        paths = self.config.get('Paths', {}); source_path_full = self.source_file.get()
-        source_stem = os.path.splitext(source_path_full)[0] if source_path_full else ''
-        
-        replacements = {'f': shlex.quote(source_path_full), 's': shlex.quote(source_stem), 'o': shlex.quote(source_stem)}
-        if resolve_tool_paths:
-            replacements.update({k: shlex.quote(paths.get(v, '')) for k, v in 
-                                 [('e', 'editor'), ('m', 'emulator'), ('h', 'header_tool'), ('g', 'signer_tool'), ('term', 'terminal')]})
-
-        current_toolchain_name = toolchain_context or self.toolchain_type.get()
-        if current_toolchain_name:
-            toolchain_path = self.config.get('Toolchains', {}).get(current_toolchain_name, {}).get('path', '')
-            replacements['t'] = shlex.quote(toolchain_path) if resolve_tool_paths and toolchain_path else toolchain_path or current_toolchain_name
-        
-        if replacements_override: replacements.update(replacements_override)
-        
-        resolved_cmd = command_template
-        for key, value in replacements.items(): resolved_cmd = resolved_cmd.replace(f'%{key}', value)
-
-        if target_button:
-            for _, (var, target, flag_template) in self.toolchain_option_vars.items():
-                if var.get() and target == target_button:
-                    resolved_cmd += f" {flag_template.replace('%s', source_stem).replace('%o', source_stem).replace('%f', source_path_full)}"
-        return resolved_cmd
+        return self.command_context(toolchain_context).resolve(command_template, target_button, resolve_tool_paths, replacements_override)
 
     def log_and_run(self, button_name, action, *args, **kwargs):
         self.log_output(f"\n--- {button_name} button pressed ---", tag='info'); action(*args, **kwargs)
 
-    def run_command(self, on_success, command_override, target_button, autotyper_trigger_key=None):
-        if self.command_running and self.process and self.process.poll() is None:
-            self.log_output("Error: An internal command is already running.", tag='error')
-            if on_success: self.root.after(10, on_success)
-            return
-
-        final_command_str = self.resolve_command_placeholders(action_key=None, command_override=command_override, target_button=target_button)
-        is_external, is_nop = final_command_str.strip().startswith('EXTERNAL:'), final_command_str.strip() == '%NOP'
+    def run_command(self, on_success, command_override, target_button, autotyper_trigger_key=None, on_failure=None):
+        self.runner.run_command(self.command_context(), command_override, target_button, autotyper_trigger_key, on_success, on_failure)
 
-        if is_external:
-            self.run_external_command(final_command_str.strip()[len('EXTERNAL:'):].strip(), on_success)
-            if autotyper_trigger_key: self.execute_internal_command("", on_success=None, autotyper_trigger_key=autotyper_trigger_key, close_after_typing=True)
-        elif is_nop or not final_command_str.strip():
-            if autotyper_trigger_key: self.execute_internal_command("", on_success, autotyper_trigger_key=autotyper_trigger_key, close_after_typing=True)
-            elif on_success: self.root.after(10, on_success)
-        else:
-            self.log_output(f"$ {final_command_str}", tag='user_input')
-            self.execute_internal_command(final_command_str, on_success, autotyper_trigger_key=autotyper_trigger_key)
+    def _on_job_start(self, job):
+        self.target_job.set(job.label)
+        if self.root.winfo_exists(): self.input_entry.focus_set()
+        if not self.polling_diagnostics:
+            self.polling_diagnostics = True
+            self.root.after(self.DIAGNOSTICS_POLL_MS, self.poll_diagnostics)
 
-    def run_external_command(self, command_to_run, on_success=None):
-        self.log_output(f"$ (External) {command_to_run}", tag='user_input')
-        try:
-            use_shell = sys.platform == "win32"
-            subprocess.Popen(command_to_run if use_shell else shlex.split(command_to_run), 
-                             cwd=os.path.dirname(self.source_file.get()) or None, shell=use_shell, 
-                             creationflags=subprocess.DETACHED_PROCESS if use_shell else 0)
-            if on_success: self.root.after(10, on_success)
-        except Exception as e:
-            self.log_output(f"Error launching external process: {e}", tag='error')
-            if on_success: self.root.after(10, on_success)
-
-    def execute_internal_command(self, command_string, on_success, autotyper_trigger_key=None, close_after_typing=False):
-        if self.command_running:
-            self.log_output("Error: An internal command is already running.", tag='error')
-            if on_success: self.root.after(10, on_success)
-            return
-
-        working_dir, is_dummy = (os.path.dirname(self.source_file.get()) if self.source_file.get() else None), not command_string.strip()
-        try:
-            self.set_command_running_state(True)
-            reader_thread_arg = None
-            if sys.platform != "win32":
-                cmd_list = ['/bin/sh', '-i'] if is_dummy else shlex.split(command_string)
-                self.master_fd, slave_fd = pty.openpty()
-                self.process = subprocess.Popen(cmd_list, stdin=slave_fd, stdout=slave_fd, stderr=subprocess.STDOUT, cwd=working_dir, preexec_fn=os.setsid)
-                os.close(slave_fd)
-                reader_thread_arg = self.master_fd
-            else:
-                # WINDOWS FIX: Use text=True and pass the stream object, not the file descriptor.
-                self.process = subprocess.Popen('cmd.exe' if is_dummy else command_string, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, stdin=subprocess.PIPE, cwd=working_dir, text=True, bufsize=1, creationflags=subprocess.CREATE_NO_WINDOW, shell=True)
-                reader_thread_arg = self.process.stdout
-
-            threading.Thread(target=self._read_stream_to_queue, args=(reader_thread_arg,), daemon=True).start()
-            self.root.after(100, self.poll_process, on_success)
-            if autotyper_trigger_key:
-                threading.Thread(target=self._run_automated_header_sequence, args=(autotyper_trigger_key, close_after_typing), daemon=True).start()
-        except Exception as e: 
-            self.log_output(f"An error occurred: {e}", tag='error'); self.set_command_running_state(False)
-
-    def _read_stream_to_queue(self, stream_obj_or_fd):
-        # WINDOWS FIX: This function now handles both the Windows text stream object
-        # and the Unix file descriptor correctly.
-        if sys.platform == "win32":
-            # On Windows, read line by line from the text stream object. This avoids the deadlock.
-            try:
-                for line in iter(stream_obj_or_fd.readline, ''):
-                    if not self.command_running: break
-                    self.output_queue.put(line)
-                stream_obj_or_fd.close()
-            except (IOError, ValueError):
-                # This can happen if the process closes abruptly.
-                pass
-        else:
-            # On Unix-like systems, continue to read from the raw file descriptor.
-            try:
-                while self.command_running:
-                    data = os.read(stream_obj_or_fd, 1024)
-                    if not data: break
-                    self.output_queue.put(data.decode('utf-8', errors='replace'))
-            except (OSError, ValueError):
-                pass
-            finally:
-                if self.master_fd is not None:
-                    try: os.close(self.master_fd)
-                    except OSError: pass
-
-
-    def poll_process(self, on_success_callback):
-        if not self.command_running or not self.process: return
-        if self.process.poll() is None: return self.root.after(100, self.poll_process, on_success_callback)
-        
-        tag, msg = ('success', 'successfully') if self.process.returncode == 0 else ('error', 'with error')
-        self.log_output(f"\n--- Process finished {msg} (Code: {self.process.returncode}) ---\n", tag=tag)
-        if on_success_callback and self.process.returncode == 0: self.root.after(10, on_success_callback)
-        
-        self.process, self.master_fd = None, None
-        self.set_command_running_state(False)
-
-    def set_command_running_state(self, is_running):
-        self.command_running = is_running
-        if self.root.winfo_exists():
-            self.break_button.config(state='normal' if is_running else 'disabled')
-            if is_running: self.input_entry.focus_set()
-
-    def _run_automated_header_sequence(self, trigger_key, close_after=False):
-        try:
-            opts = self.config['Options']
-            initial_delay = float(opts.get('header_initial_delay', 1.0))
-            command_delay = float(opts.get('header_command_delay', 0.5))
-            profile_name = opts.get('active_auto_typer_profile')
-            if not profile_name: return
-            profile_data = ast.literal_eval(self.config['AutoTyperProfiles'].get(profile_name, '{}'))
-        except (ValueError, SyntaxError, KeyError): return self.log_output("Error: Could not parse auto-typer profile.", tag='error')
-            
-        time.sleep(initial_delay)
-        for step_key, step in sorted(profile_data.items()):
-            if not isinstance(step, dict): continue
-            if not self.command_running: break
-            for item in step.get('commands', []):
-                if not self.command_running: break
-                if item.get('label') == trigger_key and item.get('enabled', 'False').lower() == 'true':
-                    command_str = re.sub(r'%b\d+', lambda m: item.get('text', ''), item.get('command', ''))
-                    self._send_auto_typer_command(command_str)
-                    time.sleep(command_delay)
-            
+    def _on_auto_typed(self, job):
         self.root.after(0, lambda: self.input_entry.delete(0, tk.END))
-        if close_after and self.process and self.process.poll() is None:
-            time.sleep(0.5)
-            self.log_output("\n--- Auto-typer sequence finished, closing dummy process. ---", tag='info')
-            self._send_bytes_to_process(b'exit\n')
-            if sys.platform == "win32": self.process.terminate()
-
-    def _send_auto_typer_command(self, command):
-        parts = re.split(r'(%[CA]<.>)', command)
-        for part in filter(None, parts):
-            if not self.command_running: break
-            if match := re.match(r'%([CA])<(.)>', part):
-                mod, key = match.groups()
-                self.log_output(f"Sending {mod.replace('C', 'CTRL').replace('A', 'ALT')}+{key}", tag='prompt')
-                if mod == 'C': self._send_bytes_to_process(bytes([ord(key.lower()) - ord('a') + 1]))
-                elif mod == 'A': self._send_bytes_to_process(b'\x1b' + key.lower().encode())
-            else:
-                self.log_output(f"$ {part}", tag='user_input')
-                for char in part: self._send_bytes_to_process(char.encode()); time.sleep(0.03)
-        self._send_bytes_to_process(b'\n')
 
-    def _send_bytes_to_process(self, data_bytes):
-        if self.command_running and self.process and self.process.poll() is None:
-            try:
-                if sys.platform != "win32" and self.master_fd: os.write(self.master_fd, data_bytes)
-                else: self.process.stdin.write(data_bytes.decode('utf-8', 'replace')); self.process.stdin.flush()
-            except (IOError, OSError, BrokenPipeError): self.log_output("Info: Process closed.", tag='info')
+    def _on_jobs_changed(self):
+        running = self.process_manager.running
+        self.command_running = bool(running)
+        if not self.secondary_panes_built or not self.root.winfo_exists(): return
+        labels = [job.label for job in running]
+        self.job_combo['values'] = labels
+        if self.target_job.get() not in labels: self.target_job.set(labels[-1] if labels else '')
+        self.break_button.config(state='normal' if running else 'disabled')
+
+    def get_target_job(self):
+        """The job selected for input and Break, falling back to the most recently started one."""
+        running = self.process_manager.running
+        return self.process_manager.get(self.target_job.get()) or (running[-1] if running else None)
 
     def send_input_to_process(self, event=None, command_to_send=None):
         data = command_to_send if command_to_send is not None else self.input_entry.get() + '\n'
-        if self.command_running and self.process and self.process.poll() is None:
+        job = self.get_target_job()
+        if job and job.is_running():
             self.log_output(data.strip(), tag='user_input')
-            self._send_bytes_to_process(data.encode())
+            self.runner.send(job, data.encode())
             if command_to_send is None: self.input_entry.delete(0, tk.END)
         elif not self.command_running and command_to_send is None:
             self.run_command(on_success=None, command_override=self.input_entry.get(), target_button=None)
             self.input_entry.delete(0, tk.END)
 
     def send_break_signal(self):
-        if self.process and self.process.poll() is None:
-            self.process.terminate()
-            self.log_output("\n--- Sent break signal ---\n", tag='error')
+        job = self.get_target_job()
+        if job and job.is_running():
+            job.terminate()
+            self.log_output(f"\n--- {self.runner.job_prefix(job)}Sent break signal ---\n", tag='error')
 
     def execute_custom_button(self, button_key):
-        try:
-            toolchain = self.config['Toolchains'][self.toolchain_type.get()]
-            buttons_data = ast.literal_eval(toolchain.get('custom_buttons', '{}'))
-            command = buttons_data.get(button_key, {}).get('command', '').strip()
-            name = buttons_data.get(button_key, {}).get('name', button_key)
-        except (KeyError, ValueError, SyntaxError): return
-
-        self.log_output(f"\n--- '{name}' button pressed ---", tag='info')
-        def is_autotyper_trigger(key):
-            if not self.is_autotyper_active(): return False
-            profile_name = self.config['Options'].get('active_auto_typer_profile')
-            try:
-                profile_data = ast.literal_eval(self.config['AutoTyperProfiles'].get(profile_name, '{}'))
-                return any(cmd.get('label') == key and cmd.get('enabled', 'False').lower() == 'true'
-                           for step in profile_data.values() if isinstance(step, dict) for cmd in step.get('commands', []))
-            except (ValueError, SyntaxError): return False
-
-        if not command and not is_autotyper_trigger(button_key): return
-        
-        action_queue = deque([b.strip() for b in command.split(',') if b.strip()] if ',' in command 
-                             else [command or '%NOP'])
-        
-        def run_next_in_chain():
-            if not action_queue: return
-            item = action_queue.popleft()
-            is_composite_step = ',' in command
-            target_button = item if is_composite_step else button_key
-            actual_cmd = buttons_data.get(target_button, {}).get('command', item) if is_composite_step else item
-            
-            self.run_command(on_success=run_next_in_chain if action_queue else None, command_override=actual_cmd,
-                             target_button=target_button, autotyper_trigger_key=target_button if is_autotyper_trigger(target_button) else None)
-        run_next_in_chain()
+        if self.toolchain_type.get() not in self.config['Toolchains']: return
+        self.runner.run_button(self.command_context(), button_key)
+        if not self.polling_diagnostics: self.poll_diagnostics() # The Problems list was cleared
+
+    def run_pipeline(self):
+        if self.toolchain_type.get() not in self.config['Toolchains']: return
+        self.runner.run_pipeline(self.command_context())
+        if not self.polling_diagnostics: self.poll_diagnostics()
 
     def clean_project(self):
-        source = self.source_file.get()
+        source = self.source_path()
         if not source: return self.log_output("Error: No source file specified.", tag='error')
         
         extensions = {ext for ext, state in self.config.get('CleanStates', {}).items() if state.lower() == 'true'}
@@ -2923,7 +3462,7 @@ class DevCommanderApp:
                         tag='success' if deleted_files else 'info')
 
     def open_project_folder(self):
-        source = self.source_file.get()
+        source = self.source_path()
         if not source or not os.path.isdir(d := os.path.dirname(source)):
             return self.log_output("Error: Source directory does not exist.", tag='error')
         try:
@@ -2933,12 +3472,14 @@ class DevCommanderApp:
         except Exception as e: self.log_output(f"Error opening folder: {e}", tag='error')
 
     def reset_config_to_defaults(self, confirmed=False):
-        if not os.path.exists(CONFIG_FILE_NAME):
+        ini_path = self.project.ini_path
+        if not os.path.exists(ini_path):
             return InfoDialog(self.root, "Nothing to Reset", "No .ini file was found.")
 
-        os.makedirs(INI_BACKUP_DIR, exist_ok=True)
+        backup_dir = os.path.join(self.project.folder, INI_BACKUP_DIR)
+        os.makedirs(backup_dir, exist_ok=True)
         backup_num = 1
-        while os.path.exists(backup_path := os.path.join(INI_BACKUP_DIR, f"{os.path.basename(CONFIG_FILE_NAME)}_backup{backup_num}")):
+        while os.path.exists(backup_path := os.path.join(backup_dir, f"{os.path.basename(ini_path)}_backup{backup_num}")):
             backup_num += 1
 
         if not confirmed:
@@ -2947,14 +3488,19 @@ class DevCommanderApp:
             if not ConfirmationDialog(self.root, "Confirm Reset & Exit", confirm_msg).result: return
             
         try:
-            shutil.move(CONFIG_FILE_NAME, backup_path)
+            self.config_store.discard() # A pending write must not recreate the INI we are backing up
+            import shutil
+            shutil.move(ini_path, backup_path)
             InfoDialog(self.root, "Reset Complete", "Configuration backed up. The application will now close.")
             self.root.destroy()
         except Exception as e:
             InfoDialog(self.root, "Error", f"Could not back up the INI file:\n{e}")
 
 if __name__ == "__main__":
+    startup = StartupProfile(STARTED)
+    startup.mark('imports')
     root = tk.Tk()
-    app = DevCommanderApp(root)
+    startup.mark('create window')
+    app = DevCommanderApp(root, startup, report_startup=REPORT_STARTUP)
     root.mainloop()
 
@@ -0,0 +1,3108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+####################################################################################
+# Copyright (C) 2025 RetroGameGirl (atariage)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+####################################################################################
+"""
+
+"""
+################################################################################
+#
+# COMMAND ENGINE
+#
+# Everything devCMDcycle.py needs to run a toolchain's commands, without the
+# GUI: the config model, INI reading and writing, placeholder resolution,
+# jobs, composite chains and incremental builds. The windows in
+# devCMDcycle.py are built on top of this module. It never imports tkinter,
+# so the command line mode starts without loading it:
+#
+#     python3 devCMDcycle.py --toolchain cc65 --run Button9 --source game.c
+#
+################################################################################
+"""
+
+import subprocess
+import os
+import sys
+import configparser
+import shlex
+import queue
+import threading
+import re
+import time
+import ast
+import io
+import fnmatch
+import json
+import heapq
+import functools
+import itertools
+import copy
+import signal
+import codecs
+import select
+from collections import deque, defaultdict
+
+
+# Conditional import for Unix-like systems for better terminal emulation
+if sys.platform != "win32":
+    import pty
+
+# --- Global Constants ---
+CONFIG_FILE_NAME = 'devCMDcycle_301.ini'
+APP_VERSION = "3.01"
+CONFIG_SAVE_DELAY_MS = 750 # Window in which config changes are coalesced into one write
+STATUS_SCROLLBACK_LINES = 10000 # Default Status Window line cap; older output moves to a spill file
+BUILD_CACHE_FILE_NAME = '.devCMDcycle_buildcache.json' # Per-project record used to skip up-to-date build steps
+HISTORY_FILE_NAME = '.devCMDcycle_history.sqlite3' # Per-project record of every command run
+LOG_DIR_NAME = '.devCMDcycle_logs' # Per-project folder with the compressed output of each run
+WORKSPACE_FILE_NAME = 'devCMDcycle_workspace.json' # Project folders the main window switches between, next to the first project's INI
+
+
+"""
+################################################################################
+#
+# UNDELETABLE ITEMS & DEFAULT CONFIGURATION
+#
+# This section defines the core structure of the application's settings.
+#
+# UNDELETABLE_ITEMS:
+# This dictionary contains system-critical items that are essential for the
+# application's stability. These items cannot be deleted by the user through
+# the UI and are not saved to the user's .ini file. They are merged into the
+# configuration at runtime to ensure they are always present.
+#
+# DEFAULT_CONFIG:
+# This dictionary contains all the default settings for the application. It is
+# the blueprint for the `devCMDcycle_210.ini` file that is automatically
+# created when the program runs for the first time. It serves as a complete
+# reference for all configuration options. Both live in the engine, so the
+# command line mode can fall back on the defaults when there is no INI yet.
+#
+################################################################################
+"""
+
+UNDELETABLE_ITEMS = {
+    'AutoTyperProfiles': {
+        '-- No Profile Selected --': str(
+            {'master_enabled': 'False', **{f'Step {i}': {'name': f'Step {i}', 'column': 1, 'commands': []} for i in range(1, 6)}}
+        )
+    },
+    'Toolchains': {
+        '-- Select Toolchain --': {
+            'autotyper_profile': '-- No Profile Selected --',
+            'build_steps': str([]),
+            'custom_buttons': str(
+                {f'Button{i}': {'name': '', 'command': '', 'color': '#F0F0F0'} for i in range(1, 11)}
+            ),
+            'path': '',
+            'toolchain_options': str([])
+        }
+    }
+}
+
+
+DEFAULT_CONFIG = {
+    'Actions': {
+        'add_header': '%h %s.bin',
+        'add_header_a78': '%h %o.a78',
+        'compile_cc65': '%t -t atari7800 -o %o.a78 %f',
+        'compile_dasm': '%t %f',
+        'edit': '%e %f',
+        'edit_line': '%e +%l %f',
+        'run': '%m a7800 -cart %o.a78',
+        'run_debug': '%m a7800 -cart %o.a78 -debug',
+        'sign_rom': '%g %o.a78'
+    },
+    'AutoTyperProfiles': {
+        '-- No Profile Selected --': str(
+    {   'master_enabled': 'False',
+        'Step 1': {'name': 'Step 1', 'column': 1, 'commands': []},
+        'Step 2': {'name': 'Step 2', 'column': 1, 'commands': []},
+        'Step 3': {'name': 'Step 3', 'column': 1, 'commands': []},
+        'Step 4': {'name': 'Step 4', 'column': 1, 'commands': []},
+        'Step 5': {'name': 'Step 5', 'column': 1, 'commands': []}}    ),
+        '7800AsmDevKit Header': str(
+    {   'master_enabled': 'False',
+        'prompt': '[$#>] ?$',
+        'step_timeout': '5.0',
+        'Step 1': {   'name': 'Cartridge & Memory',
+                      'column': 1,
+                      'commands': [   {'label': 'Button4', 'command': 'set linear', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set supergame', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set souper', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set bankset', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set absolute', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set activision', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set rom@4000', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set bank6@4000', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set ram@4000', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set mram@4000', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set hram@4000', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set bankram', 'enabled': 'False', 'text': ''}]},
+        'Step 2': {   'name': 'Hardware & IRQs',
+                      'column': 1,
+                      'commands': [   {'label': 'Button4', 'command': 'set pokey@440', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set pokey@450', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set pokey@800', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set pokey@4000', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set ym2151@460', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set covox@430', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set adpcm@420', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set irqpokey1', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set irqpokey2', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set irqym2151', 'enabled': 'False', 'text': ''}]},
+        'Step 3': {   'name': 'Controllers',
+                      'column': 2,
+                      'commands': [   {'label': 'Button4', 'command': 'set 7800joy1', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set 7800joy2', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set lightgun1', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set lightgun2', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set paddle1', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set paddle2', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set 2600joy1', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set 2600joy2', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set keypad1', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set keypad2', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set mega78001', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set mega78002', 'enabled': 'False', 'text': ''}]},
+        'Step 4': {   'name': 'Misc & TV',
+                      'column': 2,
+                      'commands': [   {'label': 'Button4', 'command': 'set hsc', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set savekey', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set xm', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set tvpal', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set tvntsc', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set composite', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'set mregion', 'enabled': 'False', 'text': ''}]},
+        'Step 5': {   'name': 'Final Actions',
+                      'column': 3,
+                      'commands': [   {'label': 'Button4', 'command': 'name "%b25"', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'save', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'strip', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'fix', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button4', 'command': 'exit', 'enabled': 'False', 'text': ''}]}}    ),
+        'cc65 Header': str(
+    {   'master_enabled': 'False',
+        'prompt': '[$#>] ?$',
+        'step_timeout': '5.0',
+        'Step 1': {   'name': 'Cartridge & Memory',
+                      'column': 1,
+                      'commands': [   {'label': 'Button5', 'command': 'set linear', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set supergame', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set souper', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set bankset', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set absolute', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set activision', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set rom@4000', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set bank6@4000', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set ram@4000', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set mram@4000', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set hram@4000', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set bankram', 'enabled': 'False', 'text': ''}]},
+        'Step 2': {   'name': 'Hardware & IRQs',
+                      'column': 1,
+                      'commands': [   {'label': 'Button5', 'command': 'set pokey@440', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set pokey@450', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set pokey@800', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set pokey@4000', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set ym2151@460', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set covox@430', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set adpcm@420', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set irqpokey1', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set irqpokey2', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set irqym2151', 'enabled': 'False', 'text': ''}]},
+        'Step 3': {   'name': 'Controllers',
+                      'column': 2,
+                      'commands': [   {'label': 'Button5', 'command': 'set 7800joy1', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set 7800joy2', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set lightgun1', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set lightgun2', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set paddle1', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set paddle2', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set 2600joy1', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set 2600joy2', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set keypad1', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set keypad2', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set mega78001', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set mega78002', 'enabled': 'False', 'text': ''}]},
+        'Step 4': {   'name': 'Misc & TV',
+                      'column': 2,
+                      'commands': [   {'label': 'Button5', 'command': 'set hsc', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set savekey', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set xm', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set tvpal', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set tvntsc', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set composite', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'set mregion', 'enabled': 'False', 'text': ''}]},
+        'Step 5': {   'name': 'Final Actions',
+                      'column': 3,
+                      'commands': [   {'label': 'Button5', 'command': 'name "%b25"', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'save', 'enabled': 'True', 'text': ''},
+                                      {'label': 'Button5', 'command': 'strip', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'fix', 'enabled': 'False', 'text': ''},
+                                      {'label': 'Button5', 'command': 'exit', 'enabled': 'False', 'text': ''}]}}    )
+    },
+    'CleanStates': {
+        '.a78': 'True',
+        '.a78.backup': 'True',
+        '.a78.map': 'True',
+        '.bin': 'True',
+        '.dbg': 'True',
+        '.list.txt': 'True',
+        '.lst': 'True',
+        '.map': 'True',
+        '.o': 'True',
+        '.s.a78': 'True',
+        '.s.a78.backup': 'True',
+        '.s.bin': 'True',
+        '.s.list.txt': 'True',
+        '.s.symbol.txt': 'True',
+        '.sym': 'True',
+        '.symbol.txt': 'True'
+    },
+    'DefaultGeometry': {
+        'autotyper_profile_editor': '1100x900',
+        'history_window': '1000x600',
+        'log_search_window': '1000x500',
+        'problems_window': '900x400',
+        'main_window': '800x1000',
+        'settings_window': '1360x825',
+        'toolchain_editor': '1285x853',
+        'toolchain_options_editor': '1000x900'
+    },
+    'Geometry': {
+        'autotyper_profile_editor': '1100x900',
+        'history_window': '1000x600',
+        'log_search_window': '1000x500',
+        'problems_window': '900x400',
+        'main_window': '800x1000',
+        'settings_window': '1217x825',
+        'toolchain_editor': '1285x853',
+        'toolchain_options_editor': '1000x900'
+    },
+    'Options': {
+        'active_auto_typer_profile': '-- No Profile Selected --',
+        'always_on_top': 'False',
+        'artifact_cache_dir': '',
+        'artifact_cache_hardlinks': 'False',
+        'artifact_cache_mb': '1024',
+        'clean_extensions': '.a78,.o,.bin,.s.a78,.s.bin,.lst,.list.txt,.s.list.txt,.sym,.symbol.txt,.s.symbol.txt,.map,.a78.map,.dbg,.a78.backup,.s.a78.backup',
+        'dark_mode': 'False',
+        'header_command_delay': '0.5',
+        'header_initial_delay': '1.0',
+        'max_parallel_jobs': '1',
+        'status_scrollback_lines': '10000'
+    },
+    'Paths': {
+        'editor': 'xed',
+        'emulator': 'a7800',
+        'header_tool': '7800header',
+        'last_source': '',
+        'last_toolchain': '-- Select Toolchain --',
+        'signer_tool': '7800sign',
+        'terminal': 'gnome-terminal'
+    },
+    'ToolchainStates': {
+        '7800ASMDevKit_Generate_List_File': 'False',
+        '7800ASMDevKit_Generate_Symbol_File': 'False',
+        '7800ASMDevKit_Run_in_debug_mode': 'True',
+        '7800ASMDevKit_Run_with_Debug': 'False',
+        'cc65_Add_Debug_Info': 'False',
+        'cc65_Create_Map_File': 'False',
+        'cc65_Run_(debug)': 'True',
+        'cc65_Run_in_debug_mode': 'False'
+    },
+    'Toolchains': {
+        '7800ASMDevKit': {
+            'autotyper_profile': '7800AsmDevKit Header',
+            'build_steps': str(
+    ['compile_dasm', 'add_header']    ),
+            'custom_buttons': str(
+    {   'Button1': {'name': 'Terminal', 'command': 'EXTERNAL:%term', 'color': '#e0e0e0'},
+        'Button2': {'name': 'Edit', 'command': 'EXTERNAL:%e %f', 'color': '#e0e0e0'},
+        'Button3': {'name': 'Build', 'command': '%t %f', 'color': '#add8e6', 'outputs': '%s.s.bin'},
+        'Button4': {'name': 'Header', 'command': '%h %s.s.bin', 'color': '#add8e6'},
+        'Button5': {'name': 'Build>Header', 'command': 'Button3,Button4', 'color': '#c1a9c3'},
+        'Button6': {'name': 'Run', 'command': 'EXTERNAL:%m a7800 -cart %s.s.a78', 'color': '#90ee90'},
+        'Button7': {'name': 'Build>Header>Run', 'command': 'Button3,Button4,Button6', 'color': '#c1a9c3'},
+        'Button8': {'name': '', 'command': '', 'color': '#e0e0e0'},
+        'Button9': {'name': '', 'command': '', 'color': '#e0e0e0'},
+        'Button10': {'name': '', 'command': '', 'color': '#F0F0F0'}}    ),
+            'path': '7800asm',
+            'toolchain_options': str(
+    [   {'name': 'Generate List File', 'flag': '-l', 'target': 'Button3'},
+        {'name': 'Generate Symbol File', 'flag': '-s', 'target': 'Button3'},
+        {'name': 'Run in debug mode', 'flag': '-debug', 'target': 'Button6'}]    )
+        },
+        'cc65': {
+            'autotyper_profile': 'cc65 Header',
+            'build_steps': str(
+    ['compile_cc65', 'sign_rom', 'add_header_a78']    ),
+            'custom_buttons': str(
+    {   'Button1': {'name': 'Terminal', 'command': 'EXTERNAL:%term', 'color': '#e0e0e0'},
+        'Button2': {'name': 'Edit', 'command': 'EXTERNAL:%e %f', 'color': '#e0e0e0'},
+        'Button3': {'name': 'Build', 'command': '%t -t atari7800 -o %s.bin %f', 'color': '#add8e6', 'outputs': '%s.bin'},
+        'Button4': {'name': 'Sign', 'command': '%g %s.bin', 'color': '#add8e6'},
+        'Button5': {'name': 'Header', 'command': '%h %s.bin', 'color': '#add8e6'},
+        'Button6': {'name': 'Run', 'command': 'EXTERNAL:%m a7800 -cart %s.a78', 'color': '#90ee90'},
+        'Button7': {'name': 'Build>Sign>Header', 'command': 'Button3,Button4,Button5', 'color': '#c3a9c3'},
+        'Button8': {'name': '', 'command': '', 'color': '#e0e0e0'},
+        'Button9': {'name': 'Build>Sign>Header>Run', 'command': 'Button3,Button4,Button5,Button6', 'color': '#c1a9c3'},
+        'Button10': {'name': '', 'command': '', 'color': '#e0e0e0'}}    ),
+            'path': 'cl65',
+            'toolchain_options': str(
+    [   {'name': 'Create Map File', 'flag': '-m %s.map', 'target': 'Button3'},
+        {'name': 'Add Debug Info', 'flag': '-g', 'target': 'Button3'},
+        {'name': 'Run in debug mode', 'flag': '-debug', 'target': 'Button6'}]    )
+        }
+    }
+}
+
+
+"""
+################################################################################
+#
+# CONFIG MODEL
+#
+# Toolchains and Auto-Typer profiles are stored in the INI file as Python-repr
+# strings. These classes hold them in parsed form: the strings are parsed once
+# when the config is loaded, the editors mutate the objects directly, and they
+# are only turned back into strings when the INI file is written.
+#
+################################################################################
+"""
+
+BUTTON_KEYS = tuple(f'Button{i}' for i in range(1, 11))
+
+
+def _literal(value, default):
+    """Parses a repr string from the INI file, falling back to `default`."""
+    if not isinstance(value, str): return value
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return default
+    return parsed if isinstance(parsed, type(default)) else default
+
+def _is_true(value):
+    return str(value).lower() == 'true'
+
+def ini_value(value):
+    """Returns the string stored in the INI file for a config value."""
+    return value.to_ini() if hasattr(value, 'to_ini') else str(value)
+
+
+class Button:
+    """One of the ten custom action buttons of a toolchain.
+
+    `inputs` and `outputs` are optional comma-separated file lists (placeholders
+    and wildcards allowed). A button that declares outputs is skipped while they
+    are up to date with its inputs, which default to `%f` plus every file it
+    includes.
+    """
+    __slots__ = ('name', 'command', 'color', 'inputs', 'outputs')
+
+    def __init__(self, name='', command='', color='#F0F0F0', inputs='', outputs=''):
+        self.name, self.command, self.color = name, command, color
+        self.inputs, self.outputs = inputs, outputs
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('name', ''), data.get('command', ''), data.get('color', '#F0F0F0'), data.get('inputs', ''), data.get('outputs', ''))
+
+    def to_dict(self):
+        data = {'name': self.name, 'command': self.command, 'color': self.color}
+        if self.inputs: data['inputs'] = self.inputs
+        if self.outputs: data['outputs'] = self.outputs
+        return data
+
+
+class ToolchainOption:
+    """A checkbox on the main window that appends `flag` to the `target` button's command."""
+    __slots__ = ('name', 'flag', 'target')
+
+    def __init__(self, name='', flag='', target=''):
+        self.name, self.flag, self.target = name, flag, target
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('name', ''), data.get('flag', ''), data.get('target', ''))
+
+    def to_dict(self):
+        return {'name': self.name, 'flag': self.flag, 'target': self.target}
+
+    def state_key(self, toolchain_name):
+        """Key of this option's checkbox state in the ToolchainStates section."""
+        return f"{toolchain_name}_{self.name.replace(' ', '_')}"
+
+
+class BuildStep:
+    """One stage of a toolchain's build pipeline (`build_steps`).
+
+    `action` names the shared command in the Actions section. Stored as just
+    the action name, or as a dict when the stage also has a display `name`,
+    `inputs`/`outputs` for the up-to-date check (as on a Button) or
+    `on_error` set to 'continue' to run the remaining stages after it fails.
+    """
+    __slots__ = ('action', 'name', 'inputs', 'outputs', 'on_error')
+
+    def __init__(self, action='', name='', inputs='', outputs='', on_error='stop'):
+        self.action, self.name = action, name
+        self.inputs, self.outputs, self.on_error = inputs, outputs, on_error
+
+    @classmethod
+    def from_value(cls, value):
+        if isinstance(value, dict):
+            return cls(value.get('action', ''), value.get('name', ''), value.get('inputs', ''), value.get('outputs', ''), value.get('on_error', 'stop'))
+        return cls(str(value))
+
+    def to_value(self):
+        data = {'action': self.action}
+        if self.name: data['name'] = self.name
+        if self.inputs: data['inputs'] = self.inputs
+        if self.outputs: data['outputs'] = self.outputs
+        if self.on_error != 'stop': data['on_error'] = self.on_error
+        return self.action if len(data) == 1 else data
+
+    @property
+    def label(self):
+        return self.name or self.action
+
+
+class Toolchain:
+    """A toolchain section (`[Toolchain:<name>]`) of the INI file.
+
+    `diagnostics` names the DIAGNOSTIC_FORMATS used to find errors in its
+    output (comma-separated); empty means picking them by the program run.
+    `watch_button` is the button Watch mode runs, and `watch_patterns` the
+    comma-separated globs it watches besides the source and its includes.
+
+    `build_steps`, `buttons` and `options` read from the INI file stay as
+    their strings in `raw` until first used, so loading a config with many
+    toolchains only parses the ones the session touches.
+    """
+    __slots__ = ('path', 'autotyper_profile', 'build_steps', 'buttons', 'options', 'diagnostics', 'watch_button', 'watch_patterns', 'extra', 'raw')
+    LAZY_FIELDS = {'build_steps': 'build_steps', 'buttons': 'custom_buttons', 'options': 'toolchain_options'} # Field -> INI key
+
+    def __init__(self, path='', autotyper_profile='-- No Profile Selected --', build_steps=None, buttons=None, options=None, diagnostics='',
+                 watch_button='', watch_patterns='', extra=None, raw=None):
+        self.raw = raw if raw is not None else {}
+        self.path = path
+        self.autotyper_profile = autotyper_profile
+        if 'build_steps' not in self.raw: self.build_steps = build_steps if build_steps is not None else []
+        if 'buttons' not in self.raw: self.buttons = buttons if buttons is not None else {key: Button() for key in BUTTON_KEYS}
+        if 'options' not in self.raw: self.options = options if options is not None else []
+        self.diagnostics = diagnostics
+        self.watch_button, self.watch_patterns = watch_button, watch_patterns
+        self.extra = extra if extra is not None else {}
+
+    def __getattr__(self, name):
+        # Only reached for an unset slot, i.e. a field still waiting in `raw`
+        if name not in self.LAZY_FIELDS or name not in self.raw: raise AttributeError(name)
+        value = getattr(self, f'parse_{name}')(self.raw.pop(name))
+        setattr(self, name, value)
+        return value
+
+    def __setattr__(self, name, value):
+        # A field set before it was read replaces its INI string
+        if name in self.LAZY_FIELDS: getattr(self, 'raw', {}).pop(name, None)
+        object.__setattr__(self, name, value)
+
+    @staticmethod
+    def parse_buttons(value):
+        buttons_data = _literal(value, {})
+        buttons = {key: Button.from_dict(buttons_data.get(key, {})) for key in BUTTON_KEYS}
+        buttons.update({key: Button.from_dict(b) for key, b in buttons_data.items() if key not in buttons and isinstance(b, dict)})
+        return buttons
+
+    @staticmethod
+    def parse_build_steps(value):
+        return [BuildStep.from_value(step) for step in _literal(value, []) if isinstance(step, (str, dict))]
+
+    @staticmethod
+    def parse_options(value):
+        return [ToolchainOption.from_dict(o) for o in _literal(value, []) if isinstance(o, dict)]
+
+    @classmethod
+    def from_ini(cls, data):
+        data = dict(data)
+        return cls(path=data.pop('path', ''),
+                   autotyper_profile=data.pop('autotyper_profile', '-- No Profile Selected --'),
+                   diagnostics=data.pop('diagnostics', ''),
+                   watch_button=data.pop('watch_button', ''),
+                   watch_patterns=data.pop('watch_patterns', ''),
+                   raw={field: data.pop(key, '{}' if field == 'buttons' else '[]') for field, key in cls.LAZY_FIELDS.items()},
+                   extra=data)
+
+    def to_ini(self):
+        raw = self.raw
+        return {'autotyper_profile': self.autotyper_profile,
+                'build_steps': str(raw['build_steps']) if 'build_steps' in raw else str([step.to_value() for step in self.build_steps]),
+                'custom_buttons': str(raw['buttons']) if 'buttons' in raw else str({key: button.to_dict() for key, button in self.buttons.items()}),
+                **({'diagnostics': self.diagnostics} if self.diagnostics else {}),
+                'path': self.path,
+                'toolchain_options': str(raw['options']) if 'options' in raw else str([option.to_dict() for option in self.options]),
+                **({'watch_button': self.watch_button} if self.watch_button else {}),
+                **({'watch_patterns': self.watch_patterns} if self.watch_patterns else {}),
+                **self.extra}
+
+    def button(self, key):
+        return self.buttons.get(key) or Button()
+
+
+class StepCommand:
+    """A single line typed by the Auto-Typer when its label button is pressed."""
+    __slots__ = ('label', 'command', 'enabled', 'text')
+
+    def __init__(self, label='Button1', command='', enabled=False, text=''):
+        self.label, self.command, self.enabled, self.text = label, command, enabled, text
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('label', 'Button1'), data.get('command', ''), _is_true(data.get('enabled', 'False')), data.get('text', ''))
+
+    def to_dict(self):
+        return {'label': self.label, 'command': self.command, 'enabled': str(self.enabled), 'text': self.text}
+
+
+class Step:
+    """A tab of an Auto-Typer profile, shown as one group in the Settings window."""
+    __slots__ = ('name', 'column', 'commands')
+
+    def __init__(self, name='', column=1, commands=None):
+        self.name, self.column = name, column
+        self.commands = commands if commands is not None else []
+
+    @classmethod
+    def from_dict(cls, data, default_name=''):
+        return cls(data.get('name', default_name), data.get('column', 1),
+                   [StepCommand.from_dict(c) for c in data.get('commands', []) if isinstance(c, dict)])
+
+    def to_dict(self):
+        return {'name': self.name, 'column': self.column, 'commands': [c.to_dict() for c in self.commands]}
+
+
+class AutoTyperProfile:
+    """An entry of the AutoTyperProfiles section.
+
+    `prompt` is a regular expression matching the prompt of the program being
+    typed into. With one, each command is sent as soon as the prompt shows up
+    (waiting at most `step_timeout` seconds); without one, each command is
+    sent once the program's output goes quiet, with the header delays from
+    the Settings as the limit. The default header profiles use `[$#>] ?$`.
+
+    A profile read from the INI file keeps its string in `raw` and is
+    parsed the first time one of its fields is used.
+    """
+    __slots__ = ('master_enabled', 'steps', 'prompt', 'step_timeout', 'extra', 'raw')
+    FIELDS = ('master_enabled', 'steps', 'prompt', 'step_timeout', 'extra')
+
+    def __init__(self, master_enabled=False, steps=None, extra=None, prompt='', step_timeout=5.0):
+        self.raw = None
+        self.master_enabled = master_enabled
+        self.steps = steps if steps is not None else {}
+        self.extra = extra if extra is not None else {}
+        self.prompt, self.step_timeout = prompt, step_timeout
+
+    @classmethod
+    def blank(cls):
+        return cls(steps={f'Step {i}': Step(f'Step {i}') for i in range(1, 6)})
+
+    @classmethod
+    def from_ini(cls, value):
+        profile = cls.__new__(cls)
+        profile.raw = value
+        return profile
+
+    def __getattr__(self, name):
+        # Only reached while the fields are unset, i.e. `raw` has not been parsed yet
+        if name not in self.FIELDS or self.raw is None: raise AttributeError(name)
+        self.__init__(*self.parse_ini(self.raw))
+        return getattr(self, name)
+
+    def __setattr__(self, name, value):
+        # Setting one field of an unparsed profile parses it first, so the others are kept
+        if name in self.FIELDS and getattr(self, 'raw', None) is not None: self.__init__(*self.parse_ini(self.raw))
+        object.__setattr__(self, name, value)
+
+    @staticmethod
+    def parse_ini(value):
+        """The constructor arguments for a profile's INI string."""
+        data = _literal(value, {})
+        steps, extra = {}, {}
+        for key, item in data.items():
+            if key in ('master_enabled', 'prompt', 'step_timeout'): continue
+            if isinstance(item, dict): steps[key] = Step.from_dict(item, key)
+            else: extra[key] = item
+        try: step_timeout = float(data.get('step_timeout', 5.0))
+        except (TypeError, ValueError): step_timeout = 5.0
+        return _is_true(data.get('master_enabled', 'False')), steps, extra, str(data.get('prompt', '')), step_timeout
+
+    def to_ini(self):
+        if self.raw is not None: return str(self.raw)
+        expect = {'prompt': self.prompt, 'step_timeout': str(self.step_timeout)} if self.prompt else {}
+        return str({'master_enabled': str(self.master_enabled), **expect,
+                    **{key: step.to_dict() for key, step in self.steps.items()},
+                    **self.extra})
+
+    def ordered_steps(self):
+        return sorted(self.steps.items())
+
+    def enabled_commands(self, label):
+        """Yields the enabled commands triggered by `label`, in execution order."""
+        for _, step in self.ordered_steps():
+            for item in step.commands:
+                if item.label == label and item.enabled: yield item
+
+    def is_trigger(self, label):
+        return any(True for _ in self.enabled_commands(label))
+
+
+def build_config_model(config):
+    """Converts the Toolchains and AutoTyperProfiles sections of a raw config to model objects, in place."""
+    config['Toolchains'] = {name: data if isinstance(data, Toolchain) else Toolchain.from_ini(data)
+                            for name, data in config.get('Toolchains', {}).items()}
+    config['AutoTyperProfiles'] = {name: data if isinstance(data, AutoTyperProfile) else AutoTyperProfile.from_ini(data)
+                                   for name, data in config.get('AutoTyperProfiles', {}).items()}
+    return config
+
+
+def atomic_write(path, content):
+    """Replaces `path` with `content` via a temp file and rename, so readers never see a partial file."""
+    import tempfile # Loaded with the first write, not at startup
+    target = os.path.abspath(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(target)}.", suffix='.tmp', dir=os.path.dirname(target))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file as 0600; keep the permissions a plain open() would have given it
+        if os.path.exists(target):
+            os.chmod(tmp_path, os.stat(target).st_mode & 0o7777)
+        else:
+            umask = os.umask(0); os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, target)
+    except BaseException:
+        try: os.remove(tmp_path)
+        except OSError: pass
+        raise
+
+
+class ConfigStore:
+    """Coalesces config saves and writes the INI file atomically.
+
+    Callers mark the config sections they changed as dirty instead of writing
+    the file themselves. Only dirty sections are re-rendered; the rest of the
+    file is reused from the previous write. The actual write happens once per
+    save window (or on flush) via a temp file, fsync and rename, and is
+    skipped entirely if the rendered content did not change.
+    """
+    def __init__(self, path, get_config, exclude=None, schedule=None, cancel=None, on_error=None, delay_ms=CONFIG_SAVE_DELAY_MS):
+        self.path = path
+        self.get_config = get_config
+        self.exclude = exclude or {}
+        self.schedule, self.cancel = schedule, cancel
+        self.on_error = on_error
+        self.delay_ms = delay_ms
+        self.timer = None
+        self.all_dirty = True
+        self.dirty_sections = set()
+        self.section_cache = {}
+        self.last_written = None
+        self.stats = {'requests': 0, 'writes': 0, 'coalesced': 0, 'unchanged': 0}
+
+    @property
+    def writes_avoided(self):
+        return self.stats['requests'] - self.stats['writes']
+
+    def mark_dirty(self, *sections):
+        """Records changed sections (all sections if none are given) and schedules a flush."""
+        self.stats['requests'] += 1
+        if sections: self.dirty_sections.update(sections)
+        else: self.all_dirty = True
+
+        if self.schedule is None:
+            self.flush()
+        elif self.timer is None:
+            self.timer = self.schedule(self.delay_ms, self._on_timer)
+        else:
+            self.stats['coalesced'] += 1
+
+    def discard(self):
+        """Drops pending changes without writing them."""
+        self._cancel_timer()
+        self.dirty_sections.clear()
+        self.all_dirty = False
+
+    def _cancel_timer(self):
+        if self.timer is not None and self.cancel:
+            try: self.cancel(self.timer)
+            except Exception: pass
+        self.timer = None
+
+    def _on_timer(self):
+        self.timer = None
+        self.flush()
+
+    def render_section(self, section, data):
+        parser = configparser.ConfigParser(interpolation=None)
+        parser.optionxform = str
+        excluded = self.exclude.get(section, {})
+        if section == 'Toolchains':
+            for name, t_data in data.items():
+                if name not in excluded:
+                    parser[f'Toolchain:{name}'] = t_data.to_ini()
+        elif isinstance(data, dict):
+            parser[section] = {k: ini_value(v) for k, v in data.items() if k not in excluded}
+        string_io = io.StringIO()
+        parser.write(string_io)
+        return string_io.getvalue()
+
+    def flush(self):
+        """Writes pending changes now. Returns True if the file was written."""
+        self._cancel_timer()
+        if not self.all_dirty and not self.dirty_sections: return False
+
+        config = self.get_config()
+        if self.all_dirty: self.section_cache.clear()
+        for section in self.dirty_sections: self.section_cache.pop(section, None)
+        self.all_dirty = False
+        self.dirty_sections.clear()
+
+        parts = []
+        for section, data in config.items():
+            if section not in self.section_cache:
+                self.section_cache[section] = self.render_section(section, data)
+            parts.append(self.section_cache[section])
+        for stale in set(self.section_cache) - set(config): del self.section_cache[stale]
+
+        content = ''.join(parts)
+        if content == self.last_written:
+            self.stats['unchanged'] += 1
+            return False
+        try:
+            atomic_write(self.path, content)
+        except OSError as e:
+            self.all_dirty = True # Retry everything on the next save
+            if self.on_error: self.on_error(e)
+            else: raise
+            return False
+        self.last_written = content
+        self.stats['writes'] += 1
+        return True
+
+
+class Project:
+    """One project folder of a workspace, with its own INI file, config and job slots.
+
+    The config is only read when the project is first activated (`load`) and
+    can be dropped again (`unload`) once the project is idle. `store`,
+    `manager` and `runner` (its ConfigStore, ProcessManager and
+    CommandRunner) are set up by whoever loads it.
+    """
+    def __init__(self, folder):
+        self.folder = os.path.abspath(folder)
+        self.ini_path = os.path.join(self.folder, CONFIG_FILE_NAME)
+        self.config = self.store = self.manager = self.runner = None
+        self.last_active = 0.0 # time.monotonic() when it was last the active project
+
+    @property
+    def name(self):
+        return os.path.basename(self.folder) or self.folder
+
+    @property
+    def loaded(self):
+        return self.config is not None
+
+    @property
+    def busy(self):
+        """Whether it still has jobs running or waiting for a slot."""
+        return bool(self.manager and (self.manager.running or self.manager.waiting))
+
+    def load(self, default_config):
+        """Reads the INI file, or starts from `default_config()` if there is none yet. Returns True if the file is new."""
+        if os.path.exists(self.ini_path):
+            self.config = read_config(self.ini_path)
+            return False
+        self.config = build_config_model(default_config())
+        return True
+
+    def unload(self):
+        """Writes pending changes and frees the config. Returns False (and keeps it) if jobs are still running."""
+        if self.busy: return False
+        if self.store: self.store.flush()
+        if self.runner: self.runner.close()
+        self.config = self.store = self.manager = self.runner = None
+        return True
+
+
+class Workspace:
+    """The project folders the main window switches between, kept in WORKSPACE_FILE_NAME.
+
+    The folder the program is started in is always the first project; the
+    file is only written once a second one is added. At most
+    `max_loaded` projects keep their config in memory, and a project idle
+    for `idle_seconds` is unloaded even below that.
+    """
+    VERSION = 1
+
+    def __init__(self, home, max_loaded=3, idle_seconds=600):
+        self.home = os.path.abspath(home)
+        self.path = os.path.join(self.home, WORKSPACE_FILE_NAME)
+        self.max_loaded, self.idle_seconds = max_loaded, idle_seconds
+        self.projects = [Project(self.home)]
+        self.active_folder = self.home
+        try:
+            with open(self.path, encoding='utf-8') as f: data = json.load(f)
+            if data.get('version') == self.VERSION:
+                for folder in data.get('projects', []):
+                    if os.path.isdir(folder) and not self.get(folder): self.projects.append(Project(folder))
+                if self.get(data.get('active', '')): self.active_folder = os.path.abspath(data['active'])
+        except (OSError, ValueError, AttributeError, TypeError):
+            pass
+
+    def get(self, folder):
+        folder = os.path.abspath(folder) if folder else ''
+        return next((project for project in self.projects if project.folder == folder), None)
+
+    @property
+    def active(self):
+        return self.get(self.active_folder) or self.projects[0]
+
+    def save(self):
+        if len(self.projects) == 1 and not os.path.exists(self.path): return
+        atomic_write(self.path, json.dumps({'version': self.VERSION, 'active': self.active_folder,
+                                            'projects': [project.folder for project in self.projects[1:]]}, indent=1))
+
+    def add(self, folder):
+        """Adds a project folder (or returns the one already there)."""
+        project = self.get(folder)
+        if not project:
+            project = Project(folder)
+            self.projects.append(project)
+        return project
+
+    def remove(self, project):
+        """Removes a project other than the first. Returns False if it still has jobs running."""
+        if project is self.projects[0] or not project.unload(): return False
+        self.projects.remove(project)
+        if self.active_folder == project.folder: self.active_folder = self.home
+        return True
+
+    def activate(self, project):
+        self.active_folder = project.folder
+        project.last_active = time.monotonic()
+
+    def unload_idle(self, now=None):
+        """Unloads inactive, idle projects: those over the max_loaded newest and any idle for idle_seconds. Returns them."""
+        now = time.monotonic() if now is None else now
+        active = self.active
+        candidates = sorted((project for project in self.projects if project.loaded and project is not active and not project.busy),
+                            key=lambda project: project.last_active, reverse=True)
+        unloaded = []
+        for rank, project in enumerate(candidates, start=1):
+            if (rank >= self.max_loaded or now - project.last_active >= self.idle_seconds) and project.unload():
+                unloaded.append(project)
+        return unloaded
+
+
+class Scrollback:
+    """Bounded history of everything shown in the Status Window.
+
+    Holds (text, tags) records in a deque, mirroring the contents of the Text
+    widget. Once the line count passes `max_lines` plus a 10% margin, whole
+    records are evicted from the front down to `max_lines` and appended to a
+    JSON-lines spill file in the temp directory, so the complete session can
+    still be exported while memory and widget size stay flat.
+    """
+    def __init__(self, max_lines=STATUS_SCROLLBACK_LINES):
+        self.max_lines = max_lines
+        self.records = deque()
+        self.lines = 0
+        self.spill_file = None
+        self.spilled_lines = 0
+
+    def append(self, runs):
+        """Adds a flat [text, tags, ...] run list. Returns how many lines to trim from the top of the widget."""
+        for i in range(0, len(runs), 2):
+            self.records.append((runs[i], runs[i + 1]))
+            self.lines += runs[i].count('\n')
+        if self.max_lines <= 0 or self.lines <= self.max_lines + self.max_lines // 10: return 0
+        return self.evict(self.lines - self.max_lines)
+
+    def evict(self, count):
+        # Only stop after a record ending in a newline, so the trim is a whole number of widget lines
+        evicted, trimmed = [], 0
+        while self.records and (trimmed < count or not evicted[-1][0].endswith('\n')):
+            record = self.records.popleft()
+            evicted.append(record)
+            trimmed += record[0].count('\n')
+        self.lines -= trimmed
+        self.spill(evicted)
+        return trimmed
+
+    def spill(self, records):
+        try:
+            if self.spill_file is None:
+                import tempfile
+                self.spill_file = tempfile.NamedTemporaryFile('w+', encoding='utf-8', prefix='devCMDcycle_scrollback_', suffix='.jsonl', delete=False)
+            self.spill_file.writelines(json.dumps([text, list(tags)]) + '\n' for text, tags in records)
+            self.spilled_lines += sum(text.count('\n') for text, _ in records)
+        except OSError:
+            pass # History beyond the cap is best-effort; the widget itself is unaffected
+
+    def history(self):
+        """Yields every (text, tags) record of the session, spilled ones first."""
+        if self.spill_file is not None:
+            self.spill_file.flush()
+            with open(self.spill_file.name, encoding='utf-8') as f:
+                for line in f:
+                    text, tags = json.loads(line)
+                    yield text, tuple(tags)
+        yield from self.records
+
+    def export(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for text, _ in self.history(): f.write(text)
+
+    def search(self, query):
+        """Yields (line number, line) for every session line containing `query`, ignoring case.
+
+        Streams through the spilled output; line numbers count from the start
+        of the session, so those above `spilled_lines` are still in the widget.
+        """
+        query, line_no, partial = query.lower(), 1, ''
+        for text, _ in self.history():
+            lines = (partial + text).split('\n')
+            partial = lines.pop()
+            for line in lines:
+                if query in line.lower(): yield line_no, line
+                line_no += 1
+        if partial and query in partial.lower(): yield line_no, partial
+
+    def close(self):
+        """Removes the spill file. Called when the application exits."""
+        if self.spill_file is None: return
+        name = self.spill_file.name
+        self.spill_file.close()
+        self.spill_file = None
+        try: os.remove(name)
+        except OSError: pass
+
+
+ESCAPE_RE = re.compile(r'\x1B(?:\[[0-?]*[ -/]*[@-~]|\][^\x07\x1B]*(?:\x07|\x1B\\)|[@-Z\\-_])')
+NOTABLE_WORDS = ('error', 'warning', 'fatal')
+NOTABLE_LINE_RE = re.compile(r'\b(error|warning|fatal)\b', re.IGNORECASE)
+
+def find_notable_words(text):
+    """Yields (position, word) for each of the NOTABLE_WORDS in `text` as a whole word, ignoring case.
+
+    Same hits as NOTABLE_LINE_RE, but str.find over the lowercased text is
+    about 40 times faster than the case-insensitive regex on build output.
+    """
+    lowered = text.lower()
+    if len(lowered) != len(text): # Lowercasing changed the length (rare non-ASCII); positions would be off
+        yield from ((match.start(), match.group(1).lower()) for match in NOTABLE_LINE_RE.finditer(text))
+        return
+    is_word = lambda i: 0 <= i < len(text) and (text[i].isalnum() or text[i] == '_')
+    hits = [(lowered.find(word), word) for word in NOTABLE_WORDS]
+    while True:
+        pos, word = min((hit for hit in hits if hit[0] >= 0), default=(-1, None))
+        if pos < 0: return
+        if not is_word(pos - 1) and not is_word(pos + len(word)): yield pos, word
+        hits = [(lowered.find(w, p + 1), w) if w == word else (p, w) for p, w in hits]
+
+# Patterns for the error and warning lines of each tool family. Each needs
+# `kind` and `message` groups and may have `file`, `line` and `column`.
+# Only lines with one of the NOTABLE_WORDS are tried, so adding formats is cheap.
+_FILE = r'(?P<file>(?:[A-Za-z]:)?[^:(\n]+?)'
+DIAGNOSTIC_FORMATS = {
+    # game.asm (12): error: Unknown Mnemonic 'lda.z'.
+    'dasm': [re.compile(_FILE + r'\s*\((?P<line>\d+)\):\s*(?P<kind>error|warning|fatal)\s*:\s*(?P<message>.*)', re.IGNORECASE)],
+    # game.c(12): Error: ... (older releases) and game.s:12: Warning: ...
+    # ld65: Warning: atari7800.cfg:34: Segment 'ONCE' does not exist
+    'cc65': [re.compile(_FILE + r'[:(](?P<line>\d+)\)?:\s*(?P<kind>error|warning|fatal|note)\s*:\s*(?P<message>.*)', re.IGNORECASE),
+             re.compile(r'(?:cl65|cc65|ca65|ld65|ar65|co65|da65|od65)(?:\.exe)?:\s*(?P<kind>error|warning|fatal)\s*:\s*'
+                        r'(?:' + _FILE + r'[:(](?P<line>\d+)\)?:\s*)?(?P<message>.*)', re.IGNORECASE)],
+    # game.c:12:5: error: ... (gcc, clang)
+    'gcc': [re.compile(_FILE + r':(?P<line>\d+):(?:(?P<column>\d+):)?\s*(?P<kind>fatal error|error|warning|note)\s*:\s*(?P<message>.*)', re.IGNORECASE)],
+}
+DIAGNOSTIC_FORMATS['7800asm'] = DIAGNOSTIC_FORMATS['dasm'] # 7800asm wraps dasm
+
+# Format used for the output of a program, by the program's name
+DIAGNOSTIC_PROGRAMS = {'dasm': 'dasm', '7800asm': '7800asm', 'cl65': 'cc65', 'cc65': 'cc65', 'ca65': 'cc65', 'ld65': 'cc65',
+                       'gcc': 'gcc', 'cc': 'gcc', 'clang': 'gcc', 'g++': 'gcc', 'clang++': 'gcc'}
+
+def diagnostic_patterns(names, command=''):
+    """The patterns for a comma-separated list of DIAGNOSTIC_FORMATS names.
+
+    Without names, the format is picked by the command's program, and every
+    format is tried for programs not in DIAGNOSTIC_PROGRAMS (e.g. make).
+    """
+    names = [name.strip() for name in names.split(',') if name.strip()]
+    if not names:
+        try: words = shlex.split(command)
+        except ValueError: words = command.split()
+        program = os.path.splitext(os.path.basename(words[0]))[0].lower() if words else ''
+        names = [DIAGNOSTIC_PROGRAMS[program]] if program in DIAGNOSTIC_PROGRAMS else ['gcc', 'cc65', 'dasm']
+    return [pattern for name in names for pattern in DIAGNOSTIC_FORMATS.get(name, [])]
+
+
+class Diagnostic:
+    """One error or warning found in a job's output. `file` is absolute, or None when the message names no file."""
+    __slots__ = ('job', 'log_line', 'kind', 'file', 'line', 'column', 'message')
+
+    def __init__(self, job, log_line, kind, file, line, column, message):
+        self.job, self.log_line, self.kind = job, log_line, kind
+        self.file, self.line, self.column, self.message = file, line, column, message
+
+    @classmethod
+    def parse(cls, patterns, text, job=None, log_line=0):
+        for pattern in patterns:
+            if match := pattern.match(text):
+                groups = match.groupdict()
+                kind = groups['kind'].lower()
+                kind = 'error' if kind in ('fatal', 'fatal error') else kind
+                file = groups.get('file')
+                if file:
+                    file = file.strip()
+                    if job and job.cwd and not os.path.isabs(file): file = os.path.join(job.cwd, file)
+                    file = os.path.normpath(file)
+                line, column = groups.get('line'), groups.get('column')
+                return cls(job, log_line, kind, file or None, int(line) if line else None, int(column) if column else None, groups['message'].strip())
+        return None
+
+    @property
+    def location(self):
+        if not self.file: return ''
+        return f"{self.file}:{self.line}" + (f":{self.column}" if self.column else '') if self.line else self.file
+
+
+class DiagnosticList:
+    """The diagnostics of the jobs being watched, indexed by file and counted by kind.
+
+    Jobs collect their diagnostics on their reader threads while output
+    arrives; `collect()` only takes the entries added since the last call,
+    so updating the list never re-scans any output.
+    """
+    def __init__(self):
+        self.entries = []
+        self.by_file = defaultdict(list)
+        self.counts = defaultdict(int)
+        self.jobs = {} # job -> number of its diagnostics already taken
+        self.generation = 0 # Bumped by clear(), so views know to start over
+
+    def watch(self, job):
+        self.jobs[job] = 0
+
+    def clear(self):
+        self.entries.clear(); self.by_file.clear(); self.counts.clear(); self.jobs.clear()
+        self.generation += 1
+
+    def collect(self):
+        """Takes the new diagnostics of the watched jobs. Returns them in order of arrival per job."""
+        new = []
+        for job, taken in list(self.jobs.items()):
+            done = job.output_done # Read first, so nothing added just before the end is missed
+            fresh = job.diagnostics[taken:]
+            self.jobs[job] = taken + len(fresh)
+            if done: del self.jobs[job]
+            new += fresh
+        for diagnostic in new:
+            self.entries.append(diagnostic)
+            if diagnostic.file: self.by_file[diagnostic.file].append(diagnostic)
+            self.counts[diagnostic.kind] += 1
+        return new
+
+    def summary(self):
+        return ', '.join(f"{self.counts[kind]} {kind}{'s' if self.counts[kind] != 1 else ''}" for kind in ('error', 'warning', 'note') if self.counts[kind])
+
+
+class Job:
+    """One internal command, running in its own PTY (pipes on Windows) with its own reader thread.
+
+    Output goes to the shared output queue as (job, text) tuples, followed by
+    (job, None) once the stream ends. The PTY reader decodes UTF-8
+    incrementally, so characters split between reads survive, and takes
+    everything already waiting in the PTY before queueing it, so a burst of
+    output becomes one queue item. A burst ends at the first short pause in
+    the output. The read size doubles while reads come back full. A waiter
+    thread blocks until the process exits and its output has been read,
+    then calls `on_exited(job)`.
+
+    With a `log_dir`, the raw output is also written to a gzip file there,
+    and lines mentioning an error or warning are collected in
+    `notable_lines` as (line number, kind, text) for the log index. Those
+    lines are also matched against `diagnostic_patterns`, and the hits
+    appended to `diagnostics` as they arrive.
+    """
+    READER_GRACE = 1.0 # Seconds to wait for the reader after the process exits, in case something else holds the PTY open
+    READ_SIZE = 64 * 1024 # Initial and minimum PTY read size
+    MAX_READ_SIZE = 1024 * 1024
+    BURST_LIMIT = 1024 * 1024 # Most bytes coalesced into one queue item
+    BURST_GAP = 0.002 # A pause in the output this long ends a burst...
+    BURST_TIME = 0.016 # ...and a burst is queued after this long anyway (one Status Window frame)
+    EXPECT_BUFFER = 4096 # Characters of recent output kept for expect()
+    MAX_NOTABLE_LINES = 2000 # Error/warning lines kept per job for the log index
+    MAX_DIAGNOSTICS = 1000
+
+    def __init__(self, job_id, name, command, cwd=None, on_start=None, on_exit=None, log_dir=None, diagnostic_patterns=None):
+        self.id = job_id
+        self.name = name
+        self.command = command
+        self.cwd = cwd
+        self.on_start = on_start
+        self.on_exit = on_exit
+        self.state = 'queued' # queued, running, finished, failed or cancelled
+        self.process = None
+        self.master_fd = None
+        self.reader = None
+        self.returncode = None
+        self.error = None
+        self.started_at = None # time.time() when the process started
+        self.start_clock = None # ...and the same moment in time.monotonic()
+        self.exited_at = None # time.monotonic() when the waiter saw the process end
+        self.read_stats = {'bytes': 0, 'reads': 0, 'items': 0, 'first': None, 'last': None}
+        self.expect_buffer = '' # Recent output, without escape sequences, not yet consumed by expect()
+        self.output_done = False
+        self.output_at = 0.0 # time.monotonic() of the latest output
+        self.output_changed = threading.Condition()
+        self.log_dir = log_dir
+        self.log_path = None
+        self.log_file = None
+        self.notable_lines = []
+        self.diagnostic_patterns = diagnostic_patterns or []
+        self.diagnostics = []
+        self.line_count = 0 # Complete lines of output so far
+        self.line_tail = '' # The incomplete last line
+
+    @property
+    def label(self):
+        return f"{self.id}:{self.name}"
+
+    @property
+    def duration(self):
+        if self.start_clock is None: return 0.0
+        return (self.exited_at or time.monotonic()) - self.start_clock
+
+    @property
+    def read_rate(self):
+        """Output throughput in bytes per second, from the first read to the last."""
+        stats = self.read_stats
+        if stats['first'] is None or stats['last'] <= stats['first']: return 0.0
+        return stats['bytes'] / (stats['last'] - stats['first'])
+
+    def is_running(self):
+        return self.state == 'running' and self.process.poll() is None
+
+    def start(self, output_queue, on_exited=None):
+        is_dummy = not self.command.strip()
+        if sys.platform != "win32":
+            cmd_list = ['/bin/sh', '-i'] if is_dummy else shlex.split(self.command)
+            self.master_fd, slave_fd = pty.openpty()
+            try:
+                self.process = subprocess.Popen(cmd_list, stdin=slave_fd, stdout=slave_fd, stderr=subprocess.STDOUT, cwd=self.cwd, preexec_fn=os.setsid)
+            except BaseException:
+                os.close(self.master_fd); self.master_fd = None
+                raise
+            finally:
+                os.close(slave_fd)
+            stream = self.master_fd
+        else:
+            # WINDOWS FIX: Use text=True and pass the stream object, not the file descriptor.
+            self.process = subprocess.Popen('cmd.exe' if is_dummy else self.command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, stdin=subprocess.PIPE, cwd=self.cwd, text=True, bufsize=1, creationflags=subprocess.CREATE_NO_WINDOW, shell=True)
+            stream = self.process.stdout
+        self.state = 'running'
+        self.started_at, self.start_clock = time.time(), time.monotonic()
+        if self.log_dir: self._open_log()
+        self.reader = threading.Thread(target=self._read_stream_to_queue, args=(stream, output_queue), daemon=True)
+        self.reader.start()
+        threading.Thread(target=self._wait, args=(on_exited,), daemon=True).start()
+
+    def _open_log(self):
+        path = os.path.join(self.log_dir, f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_at))}-{os.getpid()}-{self.id}.log.gz")
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+            import gzip # Loaded with the first saved log, not at startup
+            self.log_file, self.log_path = gzip.open(path, 'wb', compresslevel=1), path
+        except OSError:
+            self.log_file = None # Logging is best-effort; the job runs either way
+
+    def _write_log(self, data):
+        if self.log_file is None: return
+        try: self.log_file.write(data)
+        except OSError: self.log_file = None
+
+    def _wait(self, on_exited):
+        self.process.wait()
+        self.reader.join(self.READER_GRACE)
+        self.exited_at = time.monotonic()
+        if on_exited: on_exited(self)
+
+    def _read_stream_to_queue(self, stream, output_queue):
+        if sys.platform == "win32":
+            # On Windows, read line by line from the text stream object. This avoids the deadlock.
+            try:
+                for line in iter(stream.readline, ''):
+                    self._count_read(len(line), 1)
+                    self.read_stats['items'] += 1
+                    self._write_log(line.encode('utf-8', 'replace'))
+                    self._feed_expect(line)
+                    output_queue.put((self, line))
+                stream.close()
+            except (IOError, ValueError):
+                # This can happen if the process closes abruptly.
+                pass
+        else:
+            # On Unix-like systems, read from the raw PTY file descriptor until the slave side closes.
+            try:
+                self._read_pty(stream, output_queue)
+            finally:
+                self.master_fd = None
+                try: os.close(stream)
+                except OSError: pass
+        if self.line_tail: self._scan_lines('\n')
+        if self.log_file is not None:
+            try: self.log_file.close()
+            except OSError: pass
+            self.log_file = None
+        with self.output_changed:
+            self.output_done = True
+            self.output_changed.notify_all()
+        output_queue.put((self, None))
+
+    def _read_pty(self, fd, output_queue):
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        size, eof = self.READ_SIZE, False
+        while not eof:
+            burst, total, deadline = [], 0, None
+            try:
+                while True:
+                    data = os.read(fd, size)
+                    if not data:
+                        eof = True
+                        break
+                    burst.append(data)
+                    total += len(data)
+                    size = min(size * 2, self.MAX_READ_SIZE) if len(data) == size else max(self.READ_SIZE, size // 2)
+                    now = time.monotonic()
+                    if deadline is None: deadline = now + self.BURST_TIME
+                    if total >= self.BURST_LIMIT or now >= deadline: break
+                    if not select.select([fd], [], [], min(self.BURST_GAP, deadline - now))[0]: break
+            except (OSError, ValueError):
+                eof = True # EIO once the slave side is closed
+            self._count_read(total, len(burst))
+            data = b''.join(burst)
+            self._write_log(data)
+            text = decoder.decode(data, final=eof)
+            if text:
+                self._feed_expect(text)
+                output_queue.put((self, text))
+                self.read_stats['items'] += 1
+
+    def _feed_expect(self, text):
+        text = ESCAPE_RE.sub('', text).replace('\r', '')
+        if self.log_dir or self.diagnostic_patterns: self._scan_lines(text)
+        with self.output_changed:
+            self.expect_buffer = (self.expect_buffer + text)[-self.EXPECT_BUFFER:]
+            self.output_at = time.monotonic()
+            self.output_changed.notify_all()
+
+    def _scan_lines(self, text):
+        # Looks for the keywords in the whole chunk and only counts newlines up to each hit
+        text = self.line_tail + text
+        end = text.rfind('\n') + 1
+        complete, self.line_tail = text[:end], text[end:]
+        counted, line_no, stop = 0, self.line_count, -1
+        for pos, word in find_notable_words(complete):
+            if len(self.notable_lines) >= self.MAX_NOTABLE_LINES and len(self.diagnostics) >= self.MAX_DIAGNOSTICS: break
+            if pos <= stop: continue # Another keyword on a line already taken
+            start = complete.rfind('\n', 0, pos) + 1
+            stop = complete.index('\n', pos)
+            line_no += complete.count('\n', counted, start)
+            counted = start
+            text = complete[start:stop].strip()
+            if self.log_dir and len(self.notable_lines) < self.MAX_NOTABLE_LINES:
+                self.notable_lines.append((line_no + 1, 'warning' if word == 'warning' else 'error', text[:500]))
+            if len(self.diagnostics) < self.MAX_DIAGNOSTICS and (diagnostic := Diagnostic.parse(self.diagnostic_patterns, text, self, line_no + 1)):
+                self.diagnostics.append(diagnostic)
+        self.line_count += complete.count('\n')
+
+    def expect(self, pattern, timeout):
+        """Waits until `pattern` matches output that arrived since the previous match.
+
+        Returns the match, or None on timeout or once the output has ended.
+        Safe to call from any thread except the reader's.
+        """
+        deadline = time.monotonic() + timeout
+        with self.output_changed:
+            while True:
+                if match := pattern.search(self.expect_buffer):
+                    self.expect_buffer = self.expect_buffer[match.end():]
+                    return match
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self.output_done: return None
+                self.output_changed.wait(remaining)
+
+    def wait_quiet(self, quiet, timeout, since):
+        """Waits until there has been output after `since` (a time.monotonic() value)
+        followed by `quiet` seconds without any.
+
+        Returns True once that happens, False on timeout or once the output has ended.
+        """
+        deadline = time.monotonic() + timeout
+        with self.output_changed:
+            while True:
+                now = time.monotonic()
+                if self.output_at > since and now - self.output_at >= quiet: return True
+                if now >= deadline or self.output_done: return False
+                self.output_changed.wait(min(deadline, self.output_at + quiet if self.output_at > since else deadline) - now)
+
+    def _count_read(self, size, reads):
+        stats, now = self.read_stats, time.monotonic()
+        if stats['first'] is None: stats['first'] = now
+        stats['last'] = now
+        stats['bytes'] += size
+        stats['reads'] += reads
+
+    def send(self, data_bytes):
+        """Writes to the job's terminal. Returns False if the process has gone away."""
+        if not self.is_running(): return False
+        try:
+            if sys.platform != "win32" and self.master_fd: os.write(self.master_fd, data_bytes)
+            else: self.process.stdin.write(data_bytes.decode('utf-8', 'replace')); self.process.stdin.flush()
+            return True
+        except (IOError, OSError, BrokenPipeError):
+            return False
+
+    def terminate(self):
+        """Stops the job. On POSIX the job runs in its own session (os.setsid), so the whole
+        process group is signalled and children started by the shell go down with it."""
+        if not self.process or self.process.poll() is not None: return
+        if sys.platform != "win32":
+            try:
+                os.killpg(os.getpgid(self.process.pid), signal.SIGTERM)
+                return
+            except (ProcessLookupError, PermissionError, OSError): pass
+        self.process.terminate()
+
+
+class ProcessManager:
+    """Runs internal commands in up to `max_jobs` parallel slots.
+
+    Jobs submitted while every slot is busy wait in FIFO order and start as
+    slots free up. Each job's waiter thread reports its exit through `post`,
+    which must hand a callback to the event loop from any thread (by default
+    `schedule(0, callback)`, i.e. root.after in the app), so the job's
+    on_exit callback runs as soon as the process is gone. A slow safety poll
+    catches exits that could not be posted. `on_change` is called whenever
+    the set of running jobs changes. Job ids come from one counter shared by
+    every manager, so the jobs of different projects, which all feed the
+    same output queue and Status Window, never share an id.
+    """
+    SAFETY_POLL_MS = 1000
+    job_ids = itertools.count(1)
+
+    def __init__(self, output_queue, schedule, max_jobs=1, on_change=None, post=None):
+        self.output_queue = output_queue
+        self.schedule = schedule
+        self.post = post or (lambda callback: schedule(0, callback))
+        self.max_jobs = max_jobs
+        self.on_change = on_change
+        self.running = [] # In start order
+        self.waiting = deque()
+        self.polling = False
+        self.stats = {'exits': 0, 'polled_exits': 0, 'exit_delay': 0.0, 'max_exit_delay': 0.0,
+                      'bytes_read': 0, 'reads': 0, 'output_items': 0, 'peak_read_rate': 0.0}
+
+    def submit(self, name, command, cwd=None, on_start=None, on_exit=None, log_dir=None, diagnostic_patterns=None):
+        job = Job(next(ProcessManager.job_ids), name, command, cwd, on_start, on_exit, log_dir, diagnostic_patterns)
+        self.waiting.append(job)
+        self.start_waiting()
+        return job
+
+    def set_max_jobs(self, max_jobs):
+        self.max_jobs = max_jobs
+        self.start_waiting()
+
+    def get(self, label):
+        return next((job for job in self.running if job.label == label), None)
+
+    def start_waiting(self):
+        started = False
+        while self.waiting and len(self.running) < max(1, self.max_jobs):
+            job = self.waiting.popleft()
+            try:
+                job.start(self.output_queue, self._on_exited)
+            except Exception as e:
+                job.state, job.error = 'failed', e
+                if job.on_exit: job.on_exit(job)
+                continue
+            self.running.append(job)
+            started = True
+            if job.on_start: job.on_start(job)
+        if started:
+            self._schedule_poll()
+            if self.on_change: self.on_change()
+
+    def _on_exited(self, job):
+        # Called on the job's waiter thread
+        try: self.post(lambda: self.finish(job))
+        except Exception: pass # The loop refused a call from this thread; the safety poll will finish the job
+
+    def finish(self, job):
+        if job not in self.running: return
+        self.running.remove(job)
+        job.state, job.returncode = 'finished', job.process.returncode
+        delay = time.monotonic() - job.exited_at
+        self.stats['exits'] += 1
+        self.stats['exit_delay'] += delay
+        self.stats['max_exit_delay'] = max(self.stats['max_exit_delay'], delay)
+        self.stats['bytes_read'] += job.read_stats['bytes']
+        self.stats['reads'] += job.read_stats['reads']
+        self.stats['output_items'] += job.read_stats['items']
+        self.stats['peak_read_rate'] = max(self.stats['peak_read_rate'], job.read_rate)
+        if self.on_change: self.on_change()
+        if job.on_exit: job.on_exit(job)
+        self.start_waiting()
+
+    def _schedule_poll(self):
+        if not self.polling:
+            self.polling = True
+            self.schedule(self.SAFETY_POLL_MS, self.poll)
+
+    def poll(self):
+        self.polling = False
+        for job in [job for job in self.running if job.exited_at is not None]:
+            self.stats['polled_exits'] += 1
+            self.finish(job)
+        if self.running: self._schedule_poll()
+
+    def cancel(self, job):
+        """Stops one job: a waiting one leaves the queue, a running one is terminated."""
+        if job in self.waiting:
+            self.waiting.remove(job)
+            self._cancelled(job)
+        elif job in self.running: job.terminate()
+
+    def terminate_all(self):
+        waiting, self.waiting = list(self.waiting), deque()
+        for job in self.running: job.terminate()
+        for job in waiting: self._cancelled(job)
+
+    @staticmethod
+    def _cancelled(job):
+        # A job taken off the queue still reports its exit, so the chain or parallel group waiting for it can finish
+        job.state = 'cancelled'
+        if job.on_exit: job.on_exit(job)
+
+
+COMPOSITE_TOKEN_RE = re.compile(r'\s*([()>|,]|Button\d+)')
+
+def parse_composite_command(command):
+    """Parses a composite button command into a graph, or returns None for a plain command.
+
+    Nodes are ('step', key), ('seq', [nodes]) and ('par', [nodes]).
+    `Button3,Button4` and `Button3>Button4` run in sequence, `Button3|Button8`
+    runs both at once, `|` binds tighter than `>` and parentheses group, e.g.
+    `(Button3|Button8)>Button4>Button6`. As before, a comma list may also
+    contain plain commands; `>`, `|` and parentheses only turn a command into
+    a composite when every other token is a button key, so shell pipes and
+    redirects are left alone. Raises ValueError for a malformed graph.
+    """
+    stripped = command.strip()
+    tokens, pos = [], 0
+    while (match := COMPOSITE_TOKEN_RE.match(stripped, pos)) and pos < len(stripped):
+        tokens.append(match.group(1))
+        pos = match.end()
+    if stripped and pos == len(stripped) and any(t in ('>', '|', '(') for t in tokens):
+        node, i = _parse_sequence(tokens, 0)
+        if i != len(tokens): raise ValueError(f"unexpected '{tokens[i]}' in '{stripped}'")
+        return node
+    if ',' in stripped:
+        return ('seq', [('step', item.strip()) for item in stripped.split(',') if item.strip()])
+    return None
+
+def _parse_sequence(tokens, i):
+    items = []
+    while True:
+        node, i = _parse_parallel(tokens, i)
+        items.append(node)
+        if i >= len(tokens) or tokens[i] not in ('>', ','): break
+        i += 1
+    return (items[0] if len(items) == 1 else ('seq', items)), i
+
+def _parse_parallel(tokens, i):
+    items = []
+    while True:
+        node, i = _parse_group(tokens, i)
+        items.append(node)
+        if i >= len(tokens) or tokens[i] != '|': break
+        i += 1
+    return (items[0] if len(items) == 1 else ('par', items)), i
+
+def _parse_group(tokens, i):
+    if i >= len(tokens): raise ValueError("composite command ends with an operator")
+    if tokens[i] == '(':
+        node, i = _parse_sequence(tokens, i + 1)
+        if i >= len(tokens) or tokens[i] != ')': raise ValueError("missing ')' in composite command")
+        return node, i + 1
+    if tokens[i].startswith('Button'): return ('step', tokens[i]), i + 1
+    raise ValueError(f"unexpected '{tokens[i]}' in composite command")
+
+def expand_composite(node, command_for, stack=()):
+    """Inlines steps whose own button command is a composite. Raises ValueError on a cycle."""
+    kind, value = node
+    if kind != 'step': return (kind, [expand_composite(child, command_for, stack) for child in value])
+    if value in stack: raise ValueError("composite cycle " + " > ".join(stack + (value,)))
+    inner = parse_composite_command(command_for(value) or '')
+    return node if inner is None else expand_composite(inner, command_for, stack + (value,))
+
+
+class RunToken:
+    """Identifies one run (a button and its chain), so it can be cancelled without touching other jobs."""
+    __slots__ = ('cancelled', 'jobs')
+
+    def __init__(self):
+        self.cancelled, self.jobs = False, []
+
+
+class ChainRunner:
+    """Runs a composite command graph.
+
+    `start_step(key, done)` starts one step and must eventually call
+    done(True) or done(False). Sequences wait for each item to succeed; all
+    members of a parallel group start together, and the group fails if any
+    member fails. A failure stops everything that depends on it, while
+    branches already running are left to finish. `on_finish(runner, ok)` is
+    called once the graph is done.
+    """
+    def __init__(self, graph, start_step, on_finish=None, clock=time.monotonic):
+        self.graph = graph
+        self.start_step = start_step
+        self.on_finish = on_finish
+        self.clock = clock
+        self.durations = {} # id(step node) -> seconds
+        self.failed = []
+        self.started_at = self.elapsed = None
+
+    def run(self):
+        self.started_at = self.clock()
+        self._run(self.graph, self._finished)
+
+    def _finished(self, ok):
+        self.elapsed = self.clock() - self.started_at
+        if self.on_finish: self.on_finish(self, ok)
+
+    def _run(self, node, done):
+        kind, value = node
+        if kind == 'step':
+            start = self.clock()
+            def step_done(ok):
+                self.durations[id(node)] = self.clock() - start
+                if not ok: self.failed.append(value)
+                done(ok)
+            self.start_step(value, step_done)
+        elif kind == 'seq':
+            items = iter(value)
+            def next_item(ok=True):
+                item = next(items, None) if ok else None
+                if item is None: done(ok)
+                else: self._run(item, next_item)
+            next_item()
+        else:
+            pending = {'count': len(value), 'ok': True}
+            def member_done(ok):
+                pending['count'] -= 1
+                pending['ok'] = pending['ok'] and ok
+                if not pending['count']: done(pending['ok'])
+            for child in value: self._run(child, member_done)
+
+    def skipped(self):
+        """Steps that never started because something they depend on failed."""
+        return [key for key, node in self._step_nodes(self.graph) if id(node) not in self.durations]
+
+    def _step_nodes(self, node):
+        kind, value = node
+        if kind == 'step': return [(value, node)]
+        return [pair for child in value for pair in self._step_nodes(child)]
+
+    def step_time(self):
+        return sum(self.durations.values())
+
+    def overhead(self):
+        """Wall time not covered by the critical path: the gaps between one step ending and the next starting."""
+        return max(0.0, self.elapsed - self.critical_path()[0])
+
+    def critical_path(self, node=None):
+        """Returns (seconds, [step keys]) for the longest chain of steps that ran."""
+        kind, value = node or self.graph
+        if kind == 'step':
+            duration = self.durations.get(id(node or self.graph))
+            return (duration, [value]) if duration is not None else (0.0, [])
+        paths = [self.critical_path(child) for child in value]
+        if kind == 'seq': return sum(p[0] for p in paths), [key for p in paths for key in p[1]]
+        return max(paths, key=lambda p: p[0])
+
+
+class BuildCache:
+    """Per-project record of what each build step last read and wrote.
+
+    A step is up to date when its resolved command is unchanged, its outputs
+    are still exactly as it left them and its inputs have the same content as
+    at its last successful run. Files are compared by size and mtime first and
+    only hashed (SHA-256) when those differ, so touching a file without
+    editing it doesn't force a rebuild. Kept as JSON in the project directory.
+    """
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.steps = None # Loaded on first use
+        self.dirty = False
+
+    def load(self):
+        if self.steps is not None: return
+        try:
+            with open(self.path, encoding='utf-8') as f: data = json.load(f)
+            self.steps = data['steps'] if data.get('version') == self.VERSION else {}
+        except (OSError, ValueError, KeyError, AttributeError):
+            self.steps = {}
+
+    def save(self):
+        atomic_write(self.path, json.dumps({'version': self.VERSION, 'steps': self.steps}, indent=1, sort_keys=True))
+        self.dirty = False
+
+    @staticmethod
+    def stat(path):
+        try: st = os.stat(path)
+        except OSError: return None
+        return [st.st_size, st.st_mtime_ns]
+
+    @staticmethod
+    def digest(path):
+        import hashlib # Loaded on first use, not at startup
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 16), b''): sha.update(block)
+        return sha.hexdigest()
+
+    def fingerprint(self, paths):
+        """Returns {path: [size, mtime_ns, sha256]}, with None for missing files."""
+        result = {}
+        for path in paths:
+            st = self.stat(path)
+            try: result[path] = st + [self.digest(path)] if st else None
+            except OSError: result[path] = None
+        return result
+
+    def _unchanged(self, path, recorded):
+        current = self.stat(path)
+        if current is None or recorded is None: return False
+        if current == recorded[:2]: return True
+        if current[0] != recorded[0]: return False
+        try:
+            if self.digest(path) != recorded[2]: return False
+        except OSError: return False
+        recorded[:2] = current # Touched but not edited; remember the new mtime
+        self.dirty = True
+        return True
+
+    def check(self, key, command, inputs, outputs):
+        """Returns None if the step is up to date, otherwise why it has to run."""
+        self.load()
+        entry = self.steps.get(key)
+        if entry is None: return "no previous build"
+        if entry.get('command') != command: return "command changed"
+        if sorted(entry.get('inputs', {})) != sorted(inputs) or sorted(entry.get('outputs', {})) != sorted(outputs):
+            return "file list changed"
+        for group in ('outputs', 'inputs'):
+            for path, recorded in entry[group].items():
+                if not self._unchanged(path, recorded): return f"{os.path.basename(path)} changed"
+        if self.dirty:
+            try: self.save()
+            except OSError: pass
+        return None
+
+    def record(self, key, command, input_state, outputs):
+        """Stores a successful run. `input_state` is the fingerprint of the inputs taken before it started."""
+        self.load()
+        self.steps[key] = {'command': command, 'inputs': input_state, 'outputs': self.fingerprint(outputs)}
+        self.save()
+
+
+class ArtifactCache:
+    """Content-addressed store of build outputs, shareable between branches, checkouts and projects.
+
+    An entry is keyed on the resolved command (with the project folder taken
+    out), the content of the tool it runs and of its inputs, and the names of
+    its outputs. It maps each output, relative to the project folder, to a
+    blob under `objects/` named by its SHA-256, so identical outputs are
+    stored once. Restoring copies the blobs back, or hard-links them with
+    `hardlinks` (instant and no extra space, but a tool that rewrites an
+    output in place would then change the cached copy as well). Entries are
+    small JSON files whose mtime is their last use; once the blobs take more
+    than `max_bytes`, the least recently used entries go first, then every
+    blob no entry needs. Several programs may share the folder.
+    """
+    def __init__(self, path, max_bytes, hardlinks=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hardlinks = hardlinks
+        self.size = None # Bytes in objects/ as of the last eviction scan, plus what was stored since
+        self.tool_digests = {} # tool path -> (stat, sha256)
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0, 'restored_bytes': 0}
+
+    def summary(self):
+        stats = self.stats
+        return f"{stats['hits']} hit(s), {stats['misses']} miss(es), {stats['stored']} stored, {stats['evicted']} evicted this session"
+
+    def tool_digest(self, command):
+        """Hash of the program a command runs, so a rebuilt or updated tool doesn't reuse old outputs."""
+        try: words = shlex.split(command)
+        except ValueError: words = command.split()
+        import shutil # Only the artifact cache needs it; loaded on first use
+        tool = shutil.which(words[0]) if words else None
+        if not tool: return words[0] if words else ''
+        stat = BuildCache.stat(tool)
+        cached = self.tool_digests.get(tool)
+        if not cached or cached[0] != stat:
+            cached = self.tool_digests[tool] = (stat, BuildCache.digest(tool))
+        return cached[1]
+
+    def key(self, command, project_dir, input_state, outputs):
+        """The entry key for a step. `input_state` is its inputs' BuildCache.fingerprint."""
+        import hashlib
+        sha = hashlib.sha256()
+        for part in (command.replace(project_dir, '<project>'), self.tool_digest(command)):
+            sha.update(part.encode('utf-8', 'surrogateescape') + b'\0')
+        for path, state in sorted(input_state.items()):
+            sha.update(f"in {os.path.relpath(path, project_dir)} {state[2] if state else '-'}\n".encode('utf-8', 'surrogateescape'))
+        for path in sorted(outputs):
+            sha.update(f"out {os.path.relpath(path, project_dir)}\n".encode('utf-8', 'surrogateescape'))
+        return sha.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, 'entries', key[:2], key + '.json')
+
+    def _blob_path(self, digest):
+        return os.path.join(self.path, 'objects', digest[:2], digest)
+
+    def restore(self, key, project_dir):
+        """Puts the entry's outputs in place. Returns (files, bytes), or None on a miss."""
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, encoding='utf-8') as f: outputs = json.load(f)['outputs']
+        except (OSError, ValueError, KeyError, TypeError):
+            self.stats['misses'] += 1
+            return None
+        blobs = {name: self._blob_path(digest) for name, digest in outputs.items()}
+        if not all(os.path.isfile(blob) for blob in blobs.values()): # Evicted by another program meanwhile
+            self.stats['misses'] += 1
+            return None
+        import shutil
+        total = 0
+        for name, blob in blobs.items():
+            target = os.path.join(project_dir, name)
+            tmp_path = f"{target}.{os.getpid()}.restore"
+            try:
+                if self.hardlinks:
+                    try: os.link(blob, tmp_path)
+                    except OSError: shutil.copyfile(blob, tmp_path) # Other file system
+                else: shutil.copyfile(blob, tmp_path)
+                os.replace(tmp_path, target)
+            except BaseException:
+                try: os.remove(tmp_path)
+                except OSError: pass
+                raise
+            total += os.path.getsize(target)
+        os.utime(entry_path) # Most recently used
+        self.stats['hits'] += 1
+        self.stats['restored_bytes'] += total
+        return len(blobs), total
+
+    def store(self, key, project_dir, outputs):
+        """Adds a successful step's outputs. Returns False if one of them is missing."""
+        if not all(os.path.isfile(path) for path in outputs): return False
+        import shutil, tempfile
+        entry = {}
+        for path in outputs:
+            digest = BuildCache.digest(path)
+            blob = self._blob_path(digest)
+            if not os.path.exists(blob):
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(prefix='.blob.', dir=os.path.dirname(blob))
+                os.close(fd)
+                try:
+                    shutil.copyfile(path, tmp_path) # Copied even with hardlinks, so the cached copy is never the output itself
+                    os.replace(tmp_path, blob)
+                except BaseException:
+                    try: os.remove(tmp_path)
+                    except OSError: pass
+                    raise
+                if self.size is not None: self.size += os.path.getsize(blob)
+            entry[os.path.relpath(path, project_dir)] = digest
+        entry_path = self._entry_path(key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        atomic_write(entry_path, json.dumps({'outputs': entry, 'stored': time.time()}))
+        self.stats['stored'] += 1
+        if self.size is None or self.size > self.max_bytes: self.evict()
+        return True
+
+    def evict(self):
+        """Removes least recently used entries until the blobs fit in max_bytes, then the blobs nothing uses."""
+        def files(folder):
+            for dirpath, _, names in os.walk(os.path.join(self.path, folder)):
+                for name in names:
+                    if not name.startswith('.'): yield os.path.join(dirpath, name)
+        blob_sizes = {}
+        for path in files('objects'):
+            try: blob_sizes[os.path.basename(path)] = os.path.getsize(path)
+            except OSError: pass
+        entries, users = [], defaultdict(int)
+        for path in files('entries'):
+            try:
+                with open(path, encoding='utf-8') as f: digests = set(json.load(f)['outputs'].values())
+                entries.append((os.path.getmtime(path), path, digests))
+            except (OSError, ValueError, KeyError, TypeError, AttributeError): continue
+            for digest in digests: users[digest] += 1
+
+        size = sum(size for digest, size in blob_sizes.items() if users[digest])
+        for _, path, digests in sorted(entries):
+            if size <= self.max_bytes: break
+            try: os.remove(path)
+            except OSError: continue
+            self.stats['evicted'] += 1
+            for digest in digests:
+                users[digest] -= 1
+                if not users[digest]: size -= blob_sizes.get(digest, 0)
+        for digest in [digest for digest in blob_sizes if not users[digest]]:
+            try: os.remove(self._blob_path(digest))
+            except OSError: pass
+        self.size = size
+
+
+class DependencyScanner:
+    """Finds the files a source pulls in, following includes recursively.
+
+    Understands `include`/`incbin`/`incdir` (dasm, 7800asm), `.include`/`.incbin`
+    (ca65) and `#include "file"` (C; <system> headers are skipped). Names are
+    looked up next to the including file, then next to the root source, then
+    in any `incdir` folders. Binary `incbin` files are dependencies but are not
+    scanned. The directives found in each file are cached by size and mtime,
+    so a re-scan only reads files that changed since the last one.
+    """
+    ASM_RE = re.compile(r'''^[ \t]*(?:[A-Za-z_.@][\w.@]*:?[ \t]+)?\.?(include|incbin|incdir)[ \t]+["']?([^"'\s;]+)''', re.I | re.M)
+    C_RE = re.compile(r'^[ \t]*#[ \t]*include[ \t]*"([^"]+)"', re.M)
+
+    def __init__(self):
+        self.files = {} # path -> (size, mtime_ns, [(directive, name), ...])
+        self.stats = {'scans': 0, 'files_read': 0, 'files_cached': 0}
+
+    def directives(self, path):
+        try: st = os.stat(path)
+        except OSError: return []
+        cached = self.files.get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            self.stats['files_cached'] += 1
+            return cached[2]
+        try:
+            with open(path, encoding='latin-1') as f: text = f.read()
+        except OSError: return []
+        found = [(kind.lower(), name) for kind, name in self.ASM_RE.findall(text)]
+        found += [('include', name) for name in self.C_RE.findall(text)]
+        self.files[path] = (st.st_size, st.st_mtime_ns, found)
+        self.stats['files_read'] += 1
+        return found
+
+    def dependencies(self, source):
+        """Returns the sorted set of files `source` depends on, directly or through other includes."""
+        self.stats['scans'] += 1
+        source = os.path.abspath(source)
+        root_dir = os.path.dirname(source)
+        search_dirs, deps, pending = [], set(), [source]
+        while pending:
+            path = pending.pop()
+            for kind, name in self.directives(path):
+                if kind == 'incdir':
+                    folder = os.path.join(root_dir, name)
+                    if folder not in search_dirs: search_dirs.append(folder)
+                    continue
+                resolved = self.resolve(name, os.path.dirname(path), root_dir, search_dirs)
+                if resolved is None or resolved in deps or resolved == source: continue
+                deps.add(resolved)
+                if kind == 'include': pending.append(resolved)
+        return sorted(deps)
+
+    @staticmethod
+    def resolve(name, including_dir, root_dir, search_dirs):
+        for folder in (including_dir, root_dir, *search_dirs):
+            candidate = os.path.normpath(os.path.join(folder, name))
+            if os.path.isfile(candidate): return candidate
+        return None
+
+
+class BuildHistory:
+    """Per-project SQLite record of every command run: what ran, how long it took and how it ended.
+
+    `status` is ok, failed (non-zero exit), error (could not start), skipped
+    (up to date), restored (outputs taken from the ArtifactCache) or
+    launched (EXTERNAL). `inputs_hash` identifies the state
+    of the source file and everything it includes at the time of the run.
+    The database is opened on first use and kept open.
+
+    Runs with a `log` (the gzip file with their output) also have their
+    error and warning lines in `log_lines`, with an inverted index from each
+    word to the lines containing it in `log_terms`, so past runs can be
+    searched without opening their logs.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY,
+            started REAL NOT NULL,
+            duration REAL NOT NULL,
+            toolchain TEXT, button TEXT, name TEXT, command TEXT,
+            status TEXT NOT NULL,
+            returncode INTEGER,
+            output_bytes INTEGER,
+            inputs_hash TEXT,
+            source TEXT,
+            log TEXT);
+        CREATE INDEX IF NOT EXISTS runs_by_step ON runs (toolchain, button, started);
+        CREATE TABLE IF NOT EXISTS log_lines (
+            id INTEGER PRIMARY KEY,
+            run INTEGER NOT NULL REFERENCES runs (id),
+            line INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            text TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS log_lines_by_run ON log_lines (run);
+        CREATE TABLE IF NOT EXISTS log_terms (
+            term TEXT NOT NULL,
+            line INTEGER NOT NULL,
+            PRIMARY KEY (term, line)) WITHOUT ROWID;
+    """
+    FIELDS = ('started', 'duration', 'toolchain', 'button', 'name', 'command', 'status', 'returncode', 'output_bytes', 'inputs_hash', 'source', 'log')
+    TERM_RE = re.compile(r'\w+')
+
+    def __init__(self, path):
+        self.path = path
+        self.db = None
+
+    def connect(self):
+        if self.db is None:
+            import sqlite3 # Loaded with the first history, not at startup
+            self.db = sqlite3.connect(self.path)
+            self.db.row_factory = sqlite3.Row
+            self.db.execute('PRAGMA synchronous=NORMAL')
+            self.db.executescript(self.SCHEMA)
+            if 'log' not in [row['name'] for row in self.db.execute('PRAGMA table_info(runs)')]:
+                self.db.execute('ALTER TABLE runs ADD COLUMN log TEXT') # Databases from before the log index
+        return self.db
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def record(self, notable_lines=(), **run):
+        """Adds a run, and indexes its (line number, kind, text) error/warning lines. Returns the run's id."""
+        db = self.connect()
+        with db:
+            run_id = db.execute(f"INSERT INTO runs ({', '.join(self.FIELDS)}) VALUES ({', '.join('?' * len(self.FIELDS))})",
+                                [run.get(field) for field in self.FIELDS]).lastrowid
+            for line_no, kind, text in notable_lines:
+                line_id = db.execute("INSERT INTO log_lines (run, line, kind, text) VALUES (?, ?, ?, ?)", (run_id, line_no, kind, text)).lastrowid
+                db.executemany("INSERT OR IGNORE INTO log_terms (term, line) VALUES (?, ?)", ((term, line_id) for term in self.terms(text)))
+        return run_id
+
+    @classmethod
+    def terms(cls, text):
+        return {term for term in cls.TERM_RE.findall(text.lower()) if len(term) > 1}
+
+    def search(self, query, limit=500):
+        """Indexed error/warning lines of past runs containing every word of `query`, newest run first."""
+        terms = self.terms(query)
+        if not terms: return []
+        return self.connect().execute(f"""
+            SELECT log_lines.line, log_lines.kind, log_lines.text, runs.id AS run, runs.started, runs.toolchain,
+                   runs.button, runs.name, runs.log
+            FROM log_lines JOIN runs ON runs.id = log_lines.run
+            WHERE log_lines.id IN (SELECT line FROM log_terms WHERE term IN ({', '.join('?' * len(terms))})
+                                   GROUP BY line HAVING COUNT(*) = ?)
+            ORDER BY runs.started DESC, log_lines.line LIMIT ?""", [*terms, len(terms), limit]).fetchall()
+
+    def logged_runs(self):
+        """Runs whose log file still exists on record, newest first."""
+        return self.connect().execute("SELECT * FROM runs WHERE log IS NOT NULL ORDER BY started DESC").fetchall()
+
+    def prune_logs(self, keep):
+        """Deletes the log files and index entries of all but the newest `keep` logged runs. The runs themselves stay."""
+        db = self.connect()
+        old = db.execute("SELECT id, log FROM runs WHERE log IS NOT NULL ORDER BY started DESC LIMIT -1 OFFSET ?", (keep,)).fetchall()
+        if not old: return
+        for row in old:
+            try: os.remove(row['log'])
+            except OSError: pass
+        with db:
+            ids = [(row['id'],) for row in old]
+            db.executemany("DELETE FROM log_terms WHERE line IN (SELECT id FROM log_lines WHERE run = ?)", ids)
+            db.executemany("DELETE FROM log_lines WHERE run = ?", ids)
+            db.executemany("UPDATE runs SET log = NULL WHERE id = ?", ids)
+
+    def runs(self, limit=200, toolchain=None, button=None):
+        """The most recent runs, newest first, optionally for one toolchain and/or button."""
+        where, params = [], []
+        if toolchain is not None: where.append('toolchain = ?'); params.append(toolchain)
+        if button is not None: where.append('button = ?'); params.append(button)
+        sql = f"SELECT * FROM runs {'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY started DESC LIMIT ?"
+        return self.connect().execute(sql, params + [limit]).fetchall()
+
+    def trends(self, recent=5):
+        """Per toolchain and button: run and failure counts, and the average duration of
+        the last `recent` completed runs against the ones before, to spot slowdowns."""
+        return self.connect().execute("""
+            WITH ranked AS (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY toolchain, button ORDER BY started DESC) AS age
+                FROM runs WHERE status IN ('ok', 'failed'))
+            SELECT toolchain, button, MAX(name) AS name, COUNT(*) AS runs,
+                   SUM(status = 'failed') AS failures,
+                   AVG(duration) AS average,
+                   AVG(CASE WHEN age <= :recent THEN duration END) AS recent,
+                   AVG(CASE WHEN age > :recent THEN duration END) AS earlier,
+                   MAX(started) AS last
+            FROM ranked GROUP BY toolchain, button ORDER BY last DESC""", {'recent': recent}).fetchall()
+
+
+def read_log_lines(path, first=1, last=None):
+    """Yields (line number, text) from a run's gzip log, without escape sequences.
+
+    Streams the file and stops after `last`, so only the lines needed are decompressed.
+    """
+    import gzip # Loaded on first use, not at startup
+    with gzip.open(path, 'rb') as f:
+        for line_no, line in enumerate(f, 1):
+            if last is not None and line_no > last: break
+            if line_no >= first: yield line_no, ESCAPE_RE.sub('', line.decode('utf-8', 'replace')).replace('\r', '').rstrip('\n')
+
+def grep_log(path, query):
+    """Yields (line number, text) for every line of a run's log containing `query`, ignoring case."""
+    query = query.lower()
+    for line_no, text in read_log_lines(path):
+        if query in text.lower(): yield line_no, text
+
+
+class Inotify:
+    """Minimal ctypes binding of Linux inotify, watching folders for files written, moved in or out, or deleted."""
+    MASK = 0x008 | 0x040 | 0x080 | 0x100 | 0x200 # IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    NONBLOCK, CLOEXEC = 0o4000, 0o2000000
+
+    def __init__(self):
+        import ctypes, ctypes.util # Only needed here, and only on Linux
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.get_errno = ctypes.get_errno
+        self.fd = self.libc.inotify_init1(self.NONBLOCK | self.CLOEXEC)
+        if self.fd < 0: raise OSError(self.get_errno(), "inotify_init1 failed")
+        self.folders = {} # watch descriptor -> folder
+
+    def add(self, folder):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), self.MASK)
+        if wd < 0: raise OSError(self.get_errno(), f"cannot watch {folder}")
+        self.folders[wd] = folder
+        return wd
+
+    def remove(self, wd):
+        self.folders.pop(wd, None)
+        self.libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self):
+        """Returns the (folder, name) of every event waiting, [] if none."""
+        try: data = os.read(self.fd, 65536)
+        except BlockingIOError: return []
+        events, pos = [], 0
+        while pos + 16 <= len(data):
+            # struct inotify_event: int wd; uint32_t mask, cookie, len; char name[len]
+            wd, length = int.from_bytes(data[pos:pos + 4], sys.byteorder, signed=True), int.from_bytes(data[pos + 12:pos + 16], sys.byteorder)
+            name = os.fsdecode(data[pos + 16:pos + 16 + length].rstrip(b'\0'))
+            if wd in self.folders and name: events.append((self.folders[wd], name))
+            pos += 16 + length
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """Watches files and glob patterns, and calls `on_change(paths)` once a burst of changes has settled.
+
+    Folders rather than files are watched, so editors that save by writing a
+    new file and renaming it are caught too. Linux uses inotify; elsewhere,
+    or if inotify can't be used, each folder is scanned every POLL_INTERVAL
+    seconds and its files compared by mtime and size. The watcher thread
+    hands changes to the event loop through `post`; `on_change` runs there,
+    `debounce_ms` after the last change of a burst.
+    """
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, schedule, cancel, post, on_change, debounce_ms=200):
+        self.schedule, self.cancel, self.post = schedule, cancel, post
+        self.on_change = on_change
+        self.debounce_ms = debounce_ms
+        self.targets = {} # folder -> (set of names, [name patterns])
+        self.ignored = set()
+        self.lock = threading.Lock()
+        self.pending, self.timer = set(), None
+        self.thread, self.stop_event = None, threading.Event()
+        self.inotify, self.watches = None, {} # folder -> watch descriptor
+        if sys.platform.startswith('linux'):
+            try: self.inotify = Inotify()
+            except (OSError, AttributeError): self.inotify = None
+        self.backend = 'inotify' if self.inotify else 'polling'
+
+    def set_paths(self, files, patterns=(), ignored=()):
+        """Watches these absolute files and glob patterns (e.g. /project/src/*.s); changes to `ignored` files never count."""
+        targets = defaultdict(lambda: (set(), []))
+        for path in files: targets[os.path.dirname(path)][0].add(os.path.basename(path))
+        for pattern in patterns: targets[os.path.dirname(pattern)][1].append(os.path.basename(pattern))
+        with self.lock:
+            self.targets, self.ignored = dict(targets), set(ignored)
+            if self.inotify:
+                for folder in [f for f in self.watches if f not in self.targets]: self.inotify.remove(self.watches.pop(folder))
+                for folder in self.targets:
+                    if folder not in self.watches:
+                        try: self.watches[folder] = self.inotify.add(folder)
+                        except OSError: pass # Missing folder; nothing in it to watch
+            else:
+                self.snapshot = None # Re-read on the next scan
+
+    def watched_count(self):
+        return sum(len(names) + len(patterns) for names, patterns in self.targets.values())
+
+    def matches(self, folder, name):
+        with self.lock:
+            target = self.targets.get(folder)
+            if not target or os.path.join(folder, name) in self.ignored: return False
+            return name in target[0] or any(fnmatch.fnmatch(name, pattern) for pattern in target[1])
+
+    def start(self):
+        if self.thread: return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._watch_inotify if self.inotify else self._watch_polling, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread: self.thread.join(1.0)
+        self.thread = None
+        if self.timer is not None: self.cancel(self.timer)
+        self.timer = None
+        self.pending.clear()
+
+    def close(self):
+        self.stop()
+        if self.inotify: self.inotify.close(); self.inotify = None
+
+    def _watch_inotify(self):
+        while not self.stop_event.is_set():
+            if not select.select([self.inotify.fd], [], [], self.POLL_INTERVAL)[0]: continue
+            changed = [os.path.join(folder, name) for folder, name in self.inotify.read() if self.matches(folder, name)]
+            if changed: self._changed(changed)
+
+    def _scan(self):
+        with self.lock: targets = dict(self.targets)
+        state = {}
+        for folder in targets:
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if self.matches(folder, entry.name) and entry.is_file():
+                            st = entry.stat()
+                            state[entry.path] = (st.st_mtime_ns, st.st_size)
+            except OSError: pass
+        return state
+
+    def _watch_polling(self):
+        self.snapshot = None
+        while not self.stop_event.wait(0 if self.snapshot is None else self.POLL_INTERVAL):
+            state, previous = self._scan(), self.snapshot
+            self.snapshot = state
+            if previous is None: continue
+            changed = [path for path in state.keys() | previous.keys() if state.get(path) != previous.get(path)]
+            if changed: self._changed(changed)
+
+    def _changed(self, paths):
+        # Called on the watcher thread
+        try: self.post(lambda: self._debounce(paths))
+        except Exception: pass # The loop is shutting down
+
+    def _debounce(self, paths):
+        if self.thread is None: return # Stopped meanwhile
+        self.pending.update(paths)
+        if self.timer is not None: self.cancel(self.timer)
+        self.timer = self.schedule(self.debounce_ms, self._fire)
+
+    def _fire(self):
+        self.timer = None
+        paths, self.pending = sorted(self.pending), set()
+        if paths: self.on_change(paths)
+
+
+"""
+################################################################################
+#
+# RUNNING COMMANDS
+#
+# A CommandContext holds what a command is resolved against (config, toolchain
+# and source file); the CommandRunner turns buttons and commands into jobs.
+# The main window and the command line share both, so a button behaves the
+# same whichever way it is run.
+#
+################################################################################
+"""
+
+def read_config(path):
+    """Reads an INI file into a config dict, with Toolchains and AutoTyperProfiles as model objects."""
+    parser = configparser.ConfigParser(interpolation=None, allow_no_value=True)
+    parser.optionxform = str
+    config = defaultdict(dict)
+    parser.read(path)
+    for section in parser.sections():
+        if section.startswith('Toolchain:'):
+            _, name = section.split(':', 1)
+            if 'Toolchains' not in config: config['Toolchains'] = {}
+            config['Toolchains'][name] = dict(parser.items(section))
+        else:
+            config[section].update(dict(parser.items(section)))
+    return build_config_model(config)
+
+def active_auto_typer_profile(config, profile_name=None):
+    """The named (default: the active) Auto-Typer profile, or None if there is none or it is switched off."""
+    if profile_name is None: profile_name = config.get('Options', {}).get('active_auto_typer_profile')
+    if not profile_name or profile_name == '-- No Profile Selected --':
+        return None
+    profile = config.get('AutoTyperProfiles', {}).get(profile_name)
+    return profile if profile and profile.master_enabled else None
+
+
+TOOL_PLACEHOLDERS = (('e', 'editor'), ('m', 'emulator'), ('h', 'header_tool'), ('g', 'signer_tool'), ('term', 'terminal'))
+PLACEHOLDER_RE = re.compile(r'%([A-Za-z]+)')
+
+class CommandTemplate:
+    """A command split once into literal text and %-placeholders.
+
+    A placeholder is `%` and the longest known name at that point, so
+    `%term` is the terminal and `%tx` the toolchain followed by 'x'; words
+    with no known name (`%NOP`, `%C<c>`) stay as they are. Values are put in
+    with one join, so a path containing a `%` is never substituted again.
+    """
+    __slots__ = ('parts',)
+
+    def __init__(self, command):
+        self.parts = PLACEHOLDER_RE.split(command) # Literal, word, literal, word, ..., literal
+
+    def render(self, values):
+        out = list(self.parts)
+        for i in range(1, len(out), 2):
+            word = out[i]
+            if (value := values.get(word)) is not None:
+                out[i] = value
+                continue
+            for end in range(len(word) - 1, 0, -1):
+                if (value := values.get(word[:end])) is not None:
+                    out[i] = value + word[end:]
+                    break
+            else: out[i] = '%' + word
+        return ''.join(out)
+
+@functools.lru_cache(maxsize=1024)
+def compile_template(command):
+    """The CommandTemplate of a command, compiled once per distinct command string."""
+    return CommandTemplate(command)
+
+@functools.lru_cache(maxsize=64)
+def placeholder_values(source, toolchain_name, toolchain_path, tool_paths):
+    """The quoted placeholder values for a source file, toolchain and tool paths (None to leave %e, %m, ... alone).
+
+    Memoized on exactly what they depend on, so they are only quoted again
+    once the Paths, the source file or the toolchain change. Don't modify
+    the returned dict.
+    """
+    source_stem = os.path.splitext(source)[0] if source else ''
+    values = {'f': shlex.quote(source), 's': shlex.quote(source_stem), 'o': shlex.quote(source_stem)}
+    if tool_paths is not None:
+        values.update({key: shlex.quote(path) for key, path in zip((key for key, _ in TOOL_PLACEHOLDERS), tool_paths)})
+    else: values.update({key: f'%{key}' for key, _ in TOOL_PLACEHOLDERS}) # Kept, so %term isn't read as %t
+    if toolchain_name:
+        values['t'] = shlex.quote(toolchain_path) if tool_paths is not None and toolchain_path else toolchain_path or toolchain_name
+    return values
+
+
+class CommandContext:
+    """The config, toolchain and source file a command is resolved against.
+
+    Toolchain option checkboxes are read from the ToolchainStates section.
+    `profile_name` picks the Auto-Typer profile; by default it is the one the
+    toolchain names, as when the toolchain is selected in the main window.
+    `project_folder` is where commands run when there is no source file; the
+    window passes each project's own folder, so nothing depends on the
+    process's current directory.
+    """
+    def __init__(self, config, toolchain_name, source='', profile_name=None, project_folder=None):
+        self.config = config
+        self.toolchain_name = toolchain_name
+        self.source = source
+        self.project_folder = project_folder
+        self.toolchain = config.get('Toolchains', {}).get(toolchain_name)
+        if profile_name is None and self.toolchain: profile_name = self.toolchain.autotyper_profile
+        self.profile_name = profile_name
+
+    @property
+    def buttons(self):
+        return self.toolchain.buttons if self.toolchain else {}
+
+    @property
+    def working_dir(self):
+        return os.path.dirname(self.source) or self.project_folder
+
+    def option_enabled(self, option):
+        return _is_true(self.config.get('ToolchainStates', {}).get(option.state_key(self.toolchain_name), 'False'))
+
+    def resolve(self, command, target_button=None, resolve_tool_paths=True, replacements_override=None):
+        """Fills in the %-placeholders and appends the flags of the checked options that target `target_button`."""
+        paths = self.config.get('Paths', {})
+        tool_paths = tuple(paths.get(name, '') for _, name in TOOL_PLACEHOLDERS) if resolve_tool_paths else None
+        replacements = placeholder_values(self.source, self.toolchain_name, self.toolchain.path if self.toolchain else '', tool_paths)
+        if replacements_override: replacements = {**replacements, **replacements_override}
+        resolved_cmd = compile_template(command).render(replacements)
+
+        if target_button and self.toolchain:
+            for option in self.toolchain.options:
+                if option.target == target_button and self.option_enabled(option):
+                    source_stem = os.path.splitext(self.source)[0] # Flags have always been filled in unquoted
+                    resolved_cmd += " " + compile_template(option.flag).render({'f': self.source, 's': source_stem, 'o': source_stem})
+        return resolved_cmd
+
+    def job_name(self, target_button, command):
+        button = self.buttons.get(target_button)
+        if button and button.name: return button.name
+        try: words = shlex.split(command)
+        except ValueError: words = command.split()
+        return os.path.basename(words[0]) if words else 'shell'
+
+    def file_list(self, pattern):
+        """Expands a button's comma-separated inputs/outputs into paths, relative to the source file's folder."""
+        stem, base = os.path.splitext(self.source)[0], os.path.dirname(self.source)
+        paths = []
+        for item in pattern.split(','):
+            item = item.strip().replace('%f', self.source).replace('%s', stem).replace('%o', stem)
+            if not item: continue
+            item = os.path.join(base, os.path.expanduser(item))
+            if any(c in item for c in '*?['):
+                import glob # Loaded for the first wildcard, not at startup
+                paths += sorted(glob.glob(item))
+            else: paths.append(item)
+        return paths
+
+    def auto_typer_profile(self):
+        return active_auto_typer_profile(self.config, self.profile_name)
+
+    def is_auto_typer_trigger(self, key):
+        profile = self.auto_typer_profile()
+        return bool(profile and profile.is_trigger(key))
+
+
+class CommandRunner:
+    """Runs buttons and commands, for the main window as well as the command line.
+
+    Internal commands become ProcessManager jobs, `EXTERNAL:` commands are
+    launched detached, composite buttons run through a ChainRunner and
+    buttons that declare outputs are checked against the project's
+    BuildCache first. Messages go to `log(text, tag=...)` and callbacks are
+    deferred through `schedule` (root.after in the app). `on_job_start(job)`
+    and `on_auto_typed(job)` let the caller react to a job starting and to
+    the Auto-Typer finishing its sequence (the latter from the typing thread).
+    Every run is recorded in the project's BuildHistory, and the output of
+    the newest LOG_KEEP_RUNS internal commands is kept in its log folder.
+    """
+    LOG_KEEP_RUNS = 200
+    QUIET_TIME = 0.1 # Seconds of silence after which a prompt-less Auto-Typer profile sends its next command
+
+    def __init__(self, manager, schedule, log, on_job_start=None, on_auto_typed=None):
+        self.manager = manager
+        self.schedule = schedule
+        self.log = log
+        self.on_job_start = on_job_start
+        self.on_auto_typed = on_auto_typed
+        self.build_caches = {} # project dir -> BuildCache
+        self.artifact_caches = {} # (folder, size limit, hardlinks) -> ArtifactCache
+        self.histories = {} # project dir -> BuildHistory
+        self.diagnostics = DiagnosticList() # Errors and warnings of the jobs started since the last button press
+        self.dependency_scanner = DependencyScanner()
+        self.last_failed_job = None
+        self.generation = 0 # Bumped by cancel(); chains started before that stop at their next step
+
+    def cancel(self):
+        """Stops everything in flight: running jobs are terminated and the chains they belong to don't start another step."""
+        self.generation += 1
+        self.manager.terminate_all()
+
+    def cancel_run(self, token):
+        """Stops only the run started with `token`: its jobs are terminated and its chain doesn't start another step."""
+        token.cancelled = True
+        for job in token.jobs: self.manager.cancel(job)
+
+    @staticmethod
+    def project_dir(context):
+        """The source file's folder, or without one the project folder (the current directory on the command line)."""
+        if context.source: return os.path.dirname(os.path.abspath(context.source))
+        return context.project_folder or os.getcwd()
+
+    def history(self, context):
+        """The BuildHistory of the context's project."""
+        project_dir = self.project_dir(context)
+        if project_dir not in self.histories:
+            self.histories[project_dir] = BuildHistory(os.path.join(project_dir, HISTORY_FILE_NAME))
+        return self.histories[project_dir]
+
+    def artifact_cache(self, context):
+        """The ArtifactCache set in the Options (artifact_cache_dir), or None when it is off."""
+        options = context.config.get('Options', {})
+        folder = os.path.expanduser(options.get('artifact_cache_dir', '').strip())
+        if not folder: return None
+        try: max_bytes = int(float(options.get('artifact_cache_mb', 1024)) * 1024 * 1024)
+        except ValueError: max_bytes = 1024 * 1024 * 1024
+        settings = (os.path.abspath(folder), max_bytes, _is_true(options.get('artifact_cache_hardlinks', 'False')))
+        if settings not in self.artifact_caches: self.artifact_caches[settings] = ArtifactCache(*settings)
+        return self.artifact_caches[settings]
+
+    def inputs_hash(self, context):
+        """Short hash of the size and mtime of the source file and everything it includes."""
+        if not context.source: return None
+        import hashlib # Loaded with the first run, not at startup
+        digest = hashlib.sha1()
+        for path in [context.source] + self.dependency_scanner.dependencies(context.source):
+            digest.update(f"{path}\0{BuildCache.stat(path)}\n".encode())
+        return digest.hexdigest()[:16]
+
+    def record_run(self, context, button, name, command, status, job=None, inputs_hash=None):
+        run = {'started': job.started_at if job and job.started_at else time.time(), 'duration': job.duration if job else 0.0,
+               'toolchain': context.toolchain_name, 'button': button or '', 'name': name, 'command': command, 'status': status,
+               'returncode': job.returncode if job else None, 'output_bytes': job.read_stats['bytes'] if job else None,
+               'inputs_hash': inputs_hash if inputs_hash is not None else self.inputs_hash(context), 'source': context.source,
+               'log': job.log_path if job else None}
+        import sqlite3 # For the except clause below; BuildHistory loads it anyway
+        try:
+            history = self.history(context)
+            history.record(job.notable_lines if job else (), **run)
+            if run['log']: history.prune_logs(self.LOG_KEEP_RUNS)
+        except (sqlite3.Error, OSError) as e: self.log(f"Warning: could not update {HISTORY_FILE_NAME}: {e}", tag='error')
+
+    def close(self):
+        for history in self.histories.values(): history.close()
+
+    def job_prefix(self, job):
+        return f"[{job.label}] " if self.manager.max_jobs > 1 else ""
+
+    def run_button(self, context, button_key, on_finish=None, token=None):
+        """Runs a custom button, following composite chains. `on_finish(ok)` is called once it is done.
+
+        The jobs started are added to `token` (a RunToken), if given, for cancel_run.
+        """
+        buttons = context.buttons
+        command = buttons[button_key].command.strip() if button_key in buttons else ''
+        name = buttons[button_key].name if button_key in buttons else button_key
+        def finish(ok):
+            if on_finish: on_finish(ok)
+
+        self.log(f"\n--- '{name}' button pressed ---", tag='info')
+        self.diagnostics.clear()
+        if not command and not context.is_auto_typer_trigger(button_key): return finish(True)
+
+        try:
+            graph = parse_composite_command(command)
+            if graph: graph = expand_composite(graph, lambda key: buttons[key].command if key in buttons else None, (button_key,))
+        except ValueError as e:
+            self.log(f"Error in '{name}': {e}", tag='error')
+            return finish(False)
+
+        generation = self.generation
+        def run_step(key, command, on_success=None, on_failure=None):
+            if generation != self.generation or (token and token.cancelled):
+                return on_failure() if on_failure else None # Cancelled
+            trigger = key if context.is_auto_typer_trigger(key) else None
+            if key in buttons and not trigger:
+                skip, on_success = self.check_build_cache(context, key, on_success)
+                if skip: return
+            self.run_command(context, command, target_button=key, autotyper_trigger_key=trigger, on_success=on_success, on_failure=on_failure, token=token)
+
+        if graph is None:
+            return run_step(button_key, command or '%NOP', on_success=lambda: finish(True), on_failure=lambda: finish(False))
+
+        def start_step(key, done):
+            run_step(key, buttons[key].command if key in buttons else key, on_success=lambda: done(True), on_failure=lambda: done(False))
+        exit_delay = self.manager.stats['exit_delay']
+        def chain_finished(runner, ok):
+            self.report_chain(name, buttons, runner, ok, self.manager.stats['exit_delay'] - exit_delay)
+            finish(ok)
+        ChainRunner(graph, start_step, on_finish=chain_finished).run()
+
+    def run_pipeline(self, context, on_finish=None):
+        """Runs the toolchain's build_steps in order, each the command of its Actions entry. `on_finish(ok)` is called once it is done.
+
+        Toolchain options whose target is an action name apply to that
+        stage. A stage with outputs is skipped while up to date. A failing
+        stage stops the pipeline unless its on_error is 'continue'; the
+        pipeline then still fails at the end.
+        """
+        steps = context.toolchain.build_steps if context.toolchain else []
+        actions = context.config.get('Actions', {})
+        def finish(ok):
+            if on_finish: on_finish(ok)
+
+        self.log(f"\n--- Pipeline of '{context.toolchain_name}' started: {' > '.join(step.label for step in steps) or 'no build steps'} ---", tag='info')
+        self.diagnostics.clear()
+        if not steps: return finish(True)
+        missing = [step.action for step in steps if not actions.get(step.action, '').strip()]
+        if missing:
+            self.log(f"Error: no command in the Actions section for {', '.join(missing)}", tag='error')
+            return finish(False)
+
+        generation, results = self.generation, {} # stage index -> status
+        def start_step(index, done):
+            step = steps[index]
+            if generation != self.generation:
+                results[index] = 'cancelled'
+                return done(False)
+            def succeeded():
+                results.setdefault(index, 'ok')
+                done(True)
+            def failed():
+                results[index] = 'failed'
+                if step.on_error == 'continue':
+                    self.log(f"--- '{step.label}' failed, continuing (on_error = continue) ---", tag='error')
+                done(step.on_error == 'continue')
+            command = actions[step.action]
+            skip, on_success = self.check_step_cache(context, step.action, f"pipeline:{step.action}", step.label, command, step.inputs, step.outputs, succeeded)
+            if skip:
+                results[index] = 'up to date'
+                return
+            self.run_command(context, command, target_button=step.action, on_success=on_success, on_failure=failed, job_name=step.label)
+
+        exit_delay = self.manager.stats['exit_delay']
+        def pipeline_finished(runner, ok):
+            ok = ok and all(status in ('ok', 'up to date') for status in results.values())
+            self.report_pipeline(context.toolchain_name, steps, runner, results, ok, self.manager.stats['exit_delay'] - exit_delay)
+            finish(ok)
+        ChainRunner(('seq', [('step', index) for index in range(len(steps))]), start_step, on_finish=pipeline_finished).run()
+
+    def report_pipeline(self, toolchain_name, steps, runner, results, ok, exit_delay=0.0):
+        stages = ', '.join(f"{step.label} {runner.durations[id(node)]:.2f}s" + (f" ({results[index]})" if results.get(index, 'ok') != 'ok' else '')
+                           for index, (step, node) in enumerate(zip(steps, runner.graph[1])) if id(node) in runner.durations)
+        not_run = [steps[index].label for index in runner.skipped()]
+        summary = f"{runner.elapsed:.2f}s ({stages}; scheduling overhead {runner.overhead() * 1000:.0f} ms, exit dispatch {exit_delay * 1000:.0f} ms)"
+        if ok: return self.log(f"--- Pipeline of '{toolchain_name}' finished in {summary} ---", tag='success')
+        failed = [steps[index].label for index, status in sorted(results.items()) if status in ('failed', 'cancelled')]
+        self.log(f"--- Pipeline of '{toolchain_name}' failed after {summary}. Failed: {', '.join(failed)}"
+                 + (f"; not run: {', '.join(not_run)}" if not_run else "") + " ---", tag='error')
+
+    def run_command(self, context, command, target_button=None, autotyper_trigger_key=None, on_success=None, on_failure=None, job_name=None, token=None):
+        final_command_str = context.resolve(command, target_button=target_button)
+        is_external, is_nop = final_command_str.strip().startswith('EXTERNAL:'), final_command_str.strip() == '%NOP'
+        job_name = job_name or context.job_name(target_button, final_command_str)
+
+        if is_external:
+            self.run_external_command(context, final_command_str.strip()[len('EXTERNAL:'):].strip(), on_success, on_failure, button=target_button, job_name=job_name)
+            if autotyper_trigger_key: self.execute_internal_command(context, "", on_success=None, autotyper_trigger_key=autotyper_trigger_key, close_after_typing=True, job_name=job_name, button=target_button, token=token)
+        elif is_nop or not final_command_str.strip():
+            if autotyper_trigger_key: self.execute_internal_command(context, "", on_success, autotyper_trigger_key=autotyper_trigger_key, close_after_typing=True, job_name=job_name, on_failure=on_failure, button=target_button, token=token)
+            elif on_success: self.schedule(0, on_success)
+        else:
+            self.log(f"$ {final_command_str}", tag='user_input')
+            self.execute_internal_command(context, final_command_str, on_success, autotyper_trigger_key=autotyper_trigger_key, job_name=job_name, on_failure=on_failure, button=target_button, token=token)
+
+    def run_external_command(self, context, command_to_run, on_success=None, on_failure=None, button=None, job_name=None):
+        self.log(f"$ (External) {command_to_run}", tag='user_input')
+        try:
+            use_shell = sys.platform == "win32"
+            subprocess.Popen(command_to_run if use_shell else shlex.split(command_to_run),
+                             cwd=context.working_dir, shell=use_shell,
+                             creationflags=subprocess.DETACHED_PROCESS if use_shell else 0)
+            self.record_run(context, button, job_name or context.job_name(button, command_to_run), command_to_run, 'launched')
+            if on_success: self.schedule(0, on_success)
+        except Exception as e:
+            self.log(f"Error launching external process: {e}", tag='error')
+            if on_failure: self.schedule(0, on_failure)
+            elif on_success: self.schedule(0, on_success)
+
+    def execute_internal_command(self, context, command_string, on_success, autotyper_trigger_key=None, close_after_typing=False, job_name=None, on_failure=None, button=None, token=None):
+        manager = self.manager
+        if len(manager.running) >= manager.max_jobs:
+            self.log(f"All {manager.max_jobs} job slot(s) busy; '{job_name or command_string}' will start when one is free.", tag='info')
+
+        def on_start(job):
+            self.diagnostics.watch(job)
+            if self.on_job_start: self.on_job_start(job)
+            if autotyper_trigger_key:
+                threading.Thread(target=self.auto_type, args=(context, job, autotyper_trigger_key, close_after_typing), daemon=True).start()
+
+        inputs_hash = self.inputs_hash(context)
+        def on_exit(job):
+            status = 'error' if job.error else 'cancelled' if job.state == 'cancelled' else 'ok' if job.returncode == 0 else 'failed'
+            self.record_run(context, button, job.name, command_string, status, job, inputs_hash)
+            self._on_job_exit(job, on_success, on_failure)
+        job = manager.submit(job_name or context.job_name(None, command_string), command_string, cwd=context.working_dir,
+                             on_start=on_start, on_exit=on_exit, log_dir=os.path.join(self.project_dir(context), LOG_DIR_NAME),
+                             diagnostic_patterns=diagnostic_patterns(context.toolchain.diagnostics if context.toolchain else '', command_string))
+        if token: token.jobs.append(job)
+
+    def _on_job_exit(self, job, on_success_callback, on_failure_callback=None):
+        if job.error:
+            self.log(f"An error occurred: {job.error}", tag='error')
+        elif job.state == 'cancelled':
+            self.log(f"--- {self.job_prefix(job)}'{job.name}' was cancelled before it started ---", tag='info')
+        else:
+            tag, msg = ('success', 'successfully') if job.returncode == 0 else ('error', 'with error')
+            errors = sum(d.kind == 'error' for d in job.diagnostics)
+            found = f", {errors} error(s), {len(job.diagnostics) - errors} warning(s) found" if job.diagnostics else ''
+            self.log(f"\n--- {self.job_prefix(job)}Process finished {msg} (Code: {job.returncode}){found} ---\n", tag=tag)
+            if job.returncode == 0:
+                if on_success_callback: on_success_callback()
+                return
+        self.last_failed_job = job
+        if on_failure_callback: on_failure_callback()
+
+    def check_build_cache(self, context, button_key, on_success):
+        """For a button with declared outputs, skips it if up to date or records its run once it succeeds.
+
+        Returns (skipped, on_success callback to run the step with).
+        """
+        button = context.buttons[button_key]
+        return self.check_step_cache(context, button_key, button_key, button.name or button_key, button.command, button.inputs, button.outputs, on_success)
+
+    def check_step_cache(self, context, target, cache_key, label, command, inputs, outputs, on_success):
+        """check_build_cache for any step: `command` is resolved for `target` and recorded under `cache_key`."""
+        source = context.source
+        if not outputs or not source or command.strip().startswith('EXTERNAL:'): return False, on_success
+
+        declared_inputs, outputs = inputs, context.file_list(outputs)
+        inputs = context.file_list(declared_inputs or '%f')
+        if not declared_inputs:
+            inputs += self.dependency_scanner.dependencies(source)
+            if context.toolchain and context.toolchain.watch_patterns: inputs += context.file_list(context.toolchain.watch_patterns)
+        command = context.resolve(command, target_button=target)
+        project_dir = os.path.dirname(os.path.abspath(source))
+        cache = self.build_caches.get(project_dir) or self.build_caches.setdefault(project_dir, BuildCache(os.path.join(project_dir, BUILD_CACHE_FILE_NAME)))
+        key = f"{os.path.basename(source)}:{context.toolchain_name}:{cache_key}"
+
+        reason = cache.check(key, command, inputs, outputs)
+        if reason is None:
+            self.log(f"--- '{label}' is up to date, skipped ---", tag='success')
+            self.record_run(context, target, label, command, 'skipped')
+            if on_success: self.schedule(0, on_success)
+            return True, on_success
+
+        input_state = cache.fingerprint(inputs)
+        artifacts = self.artifact_cache(context)
+        if artifacts:
+            try:
+                artifact_key = artifacts.key(command, project_dir, input_state, outputs)
+                restored = artifacts.restore(artifact_key, project_dir)
+            except OSError as e:
+                self.log(f"Warning: artifact cache not available: {e}", tag='error')
+                artifacts = restored = None
+            if restored:
+                try: cache.record(key, command, input_state, outputs)
+                except OSError as e: self.log(f"Warning: could not update {BUILD_CACHE_FILE_NAME}: {e}", tag='error')
+                self.log(f"--- '{label}' restored from the artifact cache: {restored[0]} file(s), {restored[1] / 1024:.1f} KB "
+                         f"({artifacts.summary()}) ---", tag='success')
+                self.record_run(context, target, label, command, 'restored')
+                if on_success: self.schedule(0, on_success)
+                return True, on_success
+        self.log(f"'{label}' needs to run: {reason}", tag='info')
+
+        def record_and_continue():
+            try: cache.record(key, command, input_state, outputs)
+            except OSError as e: self.log(f"Warning: could not update {BUILD_CACHE_FILE_NAME}: {e}", tag='error')
+            if artifacts:
+                try:
+                    if artifacts.store(artifact_key, project_dir, outputs):
+                        self.log(f"Stored the outputs of '{label}' in the artifact cache ({artifacts.summary()})", tag='info')
+                except OSError as e: self.log(f"Warning: could not store '{label}' in the artifact cache: {e}", tag='error')
+            if on_success: on_success()
+        return False, record_and_continue
+
+    def report_chain(self, name, buttons, runner, ok, exit_delay=0.0):
+        label = lambda key: buttons[key].name if key in buttons and buttons[key].name else key
+        critical_time, critical_path = runner.critical_path()
+        summary = (f"{runner.elapsed:.2f}s (critical path {critical_time:.2f}s: {' > '.join(map(label, critical_path))}; "
+                   f"{runner.step_time():.2f}s of step time; scheduling overhead {runner.overhead() * 1000:.0f} ms, "
+                   f"exit dispatch {exit_delay * 1000:.0f} ms)")
+        if ok: return self.log(f"--- '{name}' finished in {summary} ---", tag='success')
+        skipped = runner.skipped()
+        self.log(f"--- '{name}' stopped after {summary}. Failed: {', '.join(map(label, runner.failed))}"
+                 + (f"; skipped: {', '.join(map(label, skipped))}" if skipped else "") + " ---", tag='error')
+
+    def auto_type(self, context, job, trigger_key, close_after=False):
+        """Types the Auto-Typer profile's commands for `trigger_key` into a job. Runs on its own thread.
+
+        If the profile has a prompt pattern, each command is sent as soon as
+        the prompt appears, or after the profile's step timeout with a warning.
+        Otherwise each command is sent once the program's reply has gone quiet
+        for QUIET_TIME, with the header delays from the Settings as the limit.
+        """
+        try:
+            opts = context.config['Options']
+            initial_delay = float(opts.get('header_initial_delay', 1.0))
+            command_delay = float(opts.get('header_command_delay', 0.5))
+            if not context.profile_name: return
+            profile = context.config['AutoTyperProfiles'].get(context.profile_name) or AutoTyperProfile()
+            prompt = re.compile(profile.prompt) if profile.prompt else None
+        except (ValueError, KeyError, re.error): return self.log("Error: Could not parse auto-typer profile.", tag='error')
+
+        def wait_for_prompt(delay, since):
+            if prompt is None: return job.wait_quiet(self.QUIET_TIME, delay, since)
+            if job.expect(prompt, profile.step_timeout) is None and not job.output_done:
+                self.log(f"Warning: no prompt from '{job.name}' within {profile.step_timeout:g}s, sending the next command anyway.", tag='error')
+
+        started, sent = time.monotonic(), 0
+        wait_for_prompt(initial_delay, job.start_clock or 0.0)
+        for item in profile.enabled_commands(trigger_key):
+            if not job.is_running() or job.output_done: break
+            command_str = re.sub(r'%b\d+', lambda m: item.text, item.command)
+            since = time.monotonic()
+            self.send_auto_typer_command(job, command_str)
+            sent += 1
+            wait_for_prompt(command_delay, since)
+        if sent: self.log(f"Auto-typer sent {sent} command(s) in {time.monotonic() - started:.2f}s", tag='info')
+
+        if self.on_auto_typed: self.on_auto_typed(job)
+        if close_after and job.is_running() and not job.output_done:
+            if prompt is None: job.wait_quiet(self.QUIET_TIME, 0.5, 0.0)
+            self.log("\n--- Auto-typer sequence finished, closing dummy process. ---", tag='info')
+            self.send(job, b'exit\n')
+            if sys.platform == "win32": job.terminate()
+
+    def send_auto_typer_command(self, job, command):
+        """Sends one command line in a single write; %C<key> and %A<key> become CTRL/ALT key codes."""
+        data = b''
+        for part in filter(None, re.split(r'(%[CA]<.>)', command)):
+            if match := re.match(r'%([CA])<(.)>', part):
+                mod, key = match.groups()
+                self.log(f"Sending {mod.replace('C', 'CTRL').replace('A', 'ALT')}+{key}", tag='prompt')
+                if mod == 'C': data += bytes([ord(key.lower()) - ord('a') + 1])
+                elif mod == 'A': data += b'\x1b' + key.lower().encode()
+            else:
+                self.log(f"$ {part}", tag='user_input')
+                data += part.encode()
+        self.send(job, data + b'\n')
+
+    def send(self, job, data_bytes):
+        if job.is_running() and not job.send(data_bytes): self.log("Info: Process closed.", tag='info')
+
+
+class WatchMode:
+    """Runs a button whenever the source file, the files it includes or the toolchain's watch patterns change.
+
+    `get_context()` supplies the toolchain and source file for each run.
+    Changes are debounced by the FileWatcher, a run still in progress is
+    cancelled before the new one starts (only its own jobs; anything else
+    running in the project is left alone), and the watched files are updated
+    after every run, as the includes may have changed. The outputs the
+    toolchain's buttons declare are never watched, so a build can't
+    trigger itself. `on_status(text)` reports what is being watched.
+    """
+    def __init__(self, runner, schedule, cancel, post, get_context, button_key, on_status=None, debounce_ms=200):
+        self.runner = runner
+        self.get_context = get_context
+        self.button_key = button_key
+        self.on_status = on_status
+        self.watcher = FileWatcher(schedule, cancel, post, self.on_change, debounce_ms)
+        self.run_id = 0 # Identifies the latest run, so the end of a cancelled one is ignored
+        self.token = None # RunToken of the latest run
+        self.running = False
+        self.stats = {'runs': 0, 'cancelled': 0}
+
+    def start(self):
+        self.update_paths()
+        self.watcher.start()
+
+    def stop(self):
+        self.watcher.close()
+
+    def watch_set(self, context):
+        """Returns (files, patterns, ignored) for the context's source file and toolchain."""
+        source = context.source
+        if not source: return [], [], []
+        files = [source] + self.runner.dependency_scanner.dependencies(source)
+        toolchain = context.toolchain
+        patterns = [os.path.join(os.path.dirname(source), item.strip())
+                    for item in (toolchain.watch_patterns if toolchain else '').split(',') if item.strip()]
+        ignored = [path for button in context.buttons.values() if button.outputs for path in context.file_list(button.outputs)]
+        return files, patterns, ignored
+
+    def update_paths(self):
+        context = self.get_context()
+        files, patterns, ignored = self.watch_set(context)
+        self.watcher.set_paths(files, patterns, ignored)
+        if self.on_status:
+            self.on_status(f"Watching {len(files)} file(s)" + (f" and {len(patterns)} pattern(s)" if patterns else '') + f" ({self.watcher.backend})")
+
+    def on_change(self, paths):
+        context = self.get_context()
+        names = ', '.join(os.path.basename(path) for path in paths[:3]) + (f" and {len(paths) - 3} more" if len(paths) > 3 else '')
+        if self.running:
+            self.stats['cancelled'] += 1
+            self.runner.log(f"\n--- Watch: {names} changed, cancelling the current run ---", tag='info')
+            self.runner.cancel_run(self.token)
+        else:
+            self.runner.log(f"\n--- Watch: {names} changed ---", tag='info')
+        self.run_id += 1
+        run_id, self.running = self.run_id, True
+        self.stats['runs'] += 1
+        def finished(ok):
+            if run_id != self.run_id: return
+            self.running = False
+            self.update_paths()
+        self.token = RunToken()
+        self.runner.run_button(context, self.button_key, on_finish=finished, token=self.token)
+
+
+"""
+################################################################################
+#
+# COMMAND LINE MODE
+#
+# Runs one button of a toolchain and exits with its result, e.g. from a
+# Makefile or a CI job. Placeholders, toolchain option checkboxes (as saved
+# in the INI file), Auto-Typer profiles, composite chains and incremental
+# builds work as they do in the window; output goes to stdout.
+#
+################################################################################
+"""
+
+class EventLoop:
+    """Stands in for the Tk event loop on the command line.
+
+    Provides the `after` scheduling the engine expects (safe to call from any
+    thread) and prints the output queue to stdout as it fills up, with a
+    `[id:name]` prefix on each line when several jobs may run at once.
+    """
+    WAKE = object() # Queued by `after` calls from other threads so a waiting loop notices them at once
+
+    def __init__(self, output_queue, out=None, prefix_jobs=False):
+        self.output_queue = output_queue
+        self.thread = threading.get_ident()
+        self.out = out or sys.stdout
+        self.prefix_jobs = prefix_jobs
+        self.timers = [] # Heap of (due, id, callback)
+        self.next_id = 0
+        self.lock = threading.Lock()
+        self.line_start = {} # job id -> whether its next output starts a new line
+
+    def after(self, ms, callback):
+        with self.lock:
+            self.next_id += 1
+            heapq.heappush(self.timers, (time.monotonic() + ms / 1000, self.next_id, callback))
+            timer_id = self.next_id
+        if threading.get_ident() != self.thread: self.output_queue.put(self.WAKE)
+        return timer_id
+
+    def after_cancel(self, timer_id):
+        with self.lock:
+            self.timers = [timer for timer in self.timers if timer[1] != timer_id]
+            heapq.heapify(self.timers)
+
+    def run(self, until):
+        """Prints output and runs timers until `until()` returns True, then prints what is left."""
+        while not until():
+            with self.lock: due = self.timers[0][0] if self.timers else None
+            timeout = 0.05 if due is None else min(0.05, max(0.0, due - time.monotonic()))
+            try:
+                self.write(self.output_queue.get(timeout=timeout))
+                self.drain()
+            except queue.Empty:
+                pass
+            self.run_due_timers()
+        self.drain()
+
+    def run_due_timers(self):
+        now = time.monotonic()
+        while True:
+            with self.lock:
+                if not self.timers or self.timers[0][0] > now: return
+                _, _, callback = heapq.heappop(self.timers)
+            callback()
+
+    def drain(self):
+        while True:
+            try: self.write(self.output_queue.get_nowait())
+            except queue.Empty: break
+        self.out.flush()
+
+    def write(self, item):
+        if item is self.WAKE: return
+        if isinstance(item, str): return self.out.write(item)
+        if isinstance(item[0], str): return self.out.write(item[0] + '\n')
+        job, text = item
+        if text is None: return self.line_start.pop(job.id, None)
+        if self.prefix_jobs:
+            prefix, at_start = f"[{job.label}] ", self.line_start.get(job.id, True)
+            pieces = text.splitlines(True)
+            text = ''.join(prefix + piece if i or at_start else piece for i, piece in enumerate(pieces))
+            self.line_start[job.id] = text.endswith('\n')
+        self.out.write(text)
+
+
+def find_button(toolchain, name):
+    """Looks a button up by key (Button9) or by its name, ignoring case."""
+    for key, button in toolchain.buttons.items():
+        if name.lower() in (key.lower(), button.name.lower()): return key
+    return None
+
+def list_toolchains(config, out):
+    for name, toolchain in config.get('Toolchains', {}).items():
+        out.write(f"{name}\n")
+        for key, button in toolchain.buttons.items():
+            if button.command.strip(): out.write(f"    {key:<9} {button.name:<24} {button.command}\n")
+        if toolchain.build_steps: out.write(f"    {'Pipeline':<9} {' > '.join(step.label for step in toolchain.build_steps)}\n")
+
+def print_history(history, count, out):
+    """Per-step trends followed by the last `count` runs of one project."""
+    trends = history.trends()
+    if not trends:
+        out.write(f"No runs recorded in {history.path}\n")
+        return
+    out.write(f"{'Toolchain':<20} {'Step':<24} {'Runs':>5} {'Failed':>6} {'Average':>9} {'Recent':>9} {'Change':>7}\n")
+    for row in trends:
+        change = f"{(row['recent'] / row['earlier'] - 1) * 100:+.0f}%" if row['earlier'] else ''
+        out.write(f"{row['toolchain']:<20} {row['name'] or row['button']:<24} {row['runs']:>5} {row['failures']:>6} "
+                  f"{row['average']:>8.2f}s {row['recent']:>8.2f}s {change:>7}\n")
+    out.write(f"\nLast {count} runs:\n")
+    for row in history.runs(count):
+        exit_code = '' if row['returncode'] is None else row['returncode']
+        out.write(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(row['started']))}  {row['toolchain']:<20} {row['name'] or row['button']:<16} "
+                  f"{row['status']:<8} {exit_code:>4} {row['duration']:>8.2f}s  {row['command']}\n")
+
+def print_search(history, query, full_text, out):
+    """Matches for `query` in past runs' logs: indexed error/warning lines, or with `full_text` every line."""
+    if full_text:
+        matches = ((run, line_no, text) for run in history.logged_runs() if os.path.exists(run['log'])
+                   for line_no, text in grep_log(run['log'], query))
+    else:
+        matches = ((row, row['line'], row['text']) for row in history.search(query))
+    found = 0
+    for run, line_no, text in matches:
+        found += 1
+        out.write(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['started']))}  {run['toolchain']:<20} "
+                  f"{run['name'] or run['button']:<16} {line_no:>6}: {text}\n")
+    if not found: out.write(f"No matches for '{query}'{'' if full_text else ' in the indexed error/warning lines (try --full-text)'}\n")
+
+def main(argv=None):
+    """Command line entry point. Returns the exit code."""
+    import argparse # Only the command line mode needs it; the window starts without it
+    parser = argparse.ArgumentParser(prog='devCMDcycle.py', description=f"Developer Command Cycle v{APP_VERSION}: runs a toolchain button without opening the window.")
+    parser.add_argument('--toolchain', help="toolchain to use (default: the last one selected)")
+    parser.add_argument('--run', metavar='BUTTON', help="button to run, by key (Button9) or by name")
+    parser.add_argument('--pipeline', action='store_true', help="run the toolchain's build steps (its pipeline) instead of a button")
+    parser.add_argument('--source', help="source file for the placeholders (default: the last one selected)")
+    parser.add_argument('--ini', default=CONFIG_FILE_NAME, help=f"config file (default: {CONFIG_FILE_NAME}; the built-in defaults are used if it does not exist)")
+    parser.add_argument('--jobs', type=int, help="parallel job slots (default: the Parallel Jobs setting)")
+    parser.add_argument('--list', action='store_true', help="list the toolchains and their buttons")
+    parser.add_argument('--history', nargs='?', type=int, const=20, metavar='N', help="show the build history of the source file's project, with the last N runs (default: 20)")
+    parser.add_argument('--search', metavar='TEXT', help="search the error and warning lines of the project's past runs")
+    parser.add_argument('--full-text', action='store_true', help="with --search, search every line of the kept logs")
+    parser.add_argument('--watch', action='store_true', help="with --run, run the button again whenever the source or its includes change, until Ctrl+C")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.ini): config = read_config(args.ini)
+    else:
+        # Fresh checkout: run on the defaults. The INI itself is only written by the window
+        print(f"{args.ini} not found; using the default config", file=sys.stderr)
+        config = build_config_model(defaultdict(dict, copy.deepcopy(DEFAULT_CONFIG)))
+    if args.list:
+        list_toolchains(config, sys.stdout)
+        return 0
+    source = args.source if args.source is not None else config['Paths'].get('last_source', '')
+    if source: source = os.path.abspath(source)
+    if args.history is not None or args.search:
+        history = BuildHistory(os.path.join(os.path.dirname(source) if source else os.getcwd(), HISTORY_FILE_NAME))
+        try:
+            if args.history is not None: print_history(history, args.history, sys.stdout)
+            if args.search: print_search(history, args.search, args.full_text, sys.stdout)
+        finally: history.close()
+        return 0
+    if not args.run and not args.pipeline: parser.error("nothing to do; use --run BUTTON, --pipeline, --list, --history or --search")
+    if args.run and args.pipeline: parser.error("use either --run or --pipeline")
+
+    toolchain_name = args.toolchain or config['Paths'].get('last_toolchain', '')
+    toolchain = config['Toolchains'].get(toolchain_name)
+    if not toolchain: parser.error(f"unknown toolchain '{toolchain_name}' (see --list)")
+    if args.pipeline:
+        if not toolchain.build_steps: parser.error(f"toolchain '{toolchain_name}' has no build steps (see --list)")
+        if args.watch: parser.error("--watch works with --run only")
+        button_key = None
+    else:
+        button_key = find_button(toolchain, args.run)
+        if not button_key: parser.error(f"toolchain '{toolchain_name}' has no button '{args.run}' (see --list)")
+
+    try: max_jobs = args.jobs or int(config['Options'].get('max_parallel_jobs', 1))
+    except ValueError: max_jobs = 1
+    output_queue = queue.Queue()
+    loop = EventLoop(output_queue, prefix_jobs=max_jobs > 1)
+    manager = ProcessManager(output_queue, loop.after, max_jobs=max(1, max_jobs))
+    runner = CommandRunner(manager, loop.after, log=lambda text, tag=None: output_queue.put((text, tag)))
+    result = []
+    context = CommandContext(config, toolchain_name, source)
+
+    if args.watch:
+        watch = WatchMode(runner, loop.after, loop.after_cancel, lambda callback: loop.after(0, callback), lambda: context, button_key,
+                          on_status=lambda text: output_queue.put((text, 'info')))
+        runner.run_button(context, button_key, on_finish=lambda ok: watch.start())
+        try:
+            loop.run(lambda: False)
+        except KeyboardInterrupt:
+            manager.terminate_all()
+            return 0
+        finally:
+            watch.stop()
+            runner.close()
+
+    if args.pipeline: runner.run_pipeline(context, on_finish=result.append)
+    else: runner.run_button(context, button_key, on_finish=result.append)
+    try:
+        loop.run(lambda: result and not manager.running and not manager.waiting)
+    except KeyboardInterrupt:
+        manager.terminate_all()
+        return 130
+    finally:
+        runner.close()
+
+    runner.diagnostics.collect()
+    if runner.diagnostics.entries:
+        print(f"\nProblems: {runner.diagnostics.summary()}")
+        for diagnostic in runner.diagnostics.entries:
+            print(f"  {diagnostic.location or diagnostic.job.name}: {diagnostic.kind}: {diagnostic.message}")
+    if result[0]: return 0
+    failed = runner.last_failed_job
+    return failed.returncode if failed and failed.returncode and failed.returncode > 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+####################################################################################
+# Copyright (C) 2025 RetroGameGirl (atariage)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+####################################################################################
+"""
+
+"""
+################################################################################
+#
+# ENGINE TESTS
+#
+# Unit tests for engineCMDcycle.py (and the Status Window's ANSI parser). They
+# only need the standard library. Run them from this directory:
+#
+#     python3 -m unittest test_engineCMDcycle
+#
+################################################################################
+"""
+
+import io
+import os
+import sys
+import json
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import engineCMDcycle as engine
+from engineCMDcycle import (
+    parse_composite_command, compile_template, placeholder_values, ConfigStore, BuildCache, ArtifactCache,
+    DependencyScanner, Workspace, EventLoop, ProcessManager, CommandRunner, CommandContext, RunToken, Toolchain, Button, BUTTON_KEYS,
+    AutoTyperProfile, Step, StepCommand,
+)
+
+
+class TempDirTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix='devCMDcycle_test_')
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+
+    def path(self, *names):
+        return os.path.join(self.dir, *names)
+
+    def write(self, name, content):
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f: f.write(content)
+        return path
+
+    def read(self, name):
+        with open(self.path(name), encoding='utf-8') as f: return f.read()
+
+
+class ParseCompositeCommandTest(unittest.TestCase):
+    def test_plain_commands_are_not_composites(self):
+        for command in ('cl65 -o game.bin game.c', 'make | tee build.log', 'dasm game.s > out.txt', 'Button3 > out.txt', ''):
+            self.assertIsNone(parse_composite_command(command), command)
+
+    def test_sequences(self):
+        expected = ('seq', [('step', 'Button3'), ('step', 'Button4')])
+        self.assertEqual(parse_composite_command('Button3,Button4'), expected)
+        self.assertEqual(parse_composite_command('Button3 > Button4'), expected)
+
+    def test_parallel_binds_tighter_than_sequence(self):
+        self.assertEqual(parse_composite_command('(Button3|Button8)>Button4>Button6'),
+                         ('seq', [('par', [('step', 'Button3'), ('step', 'Button8')]), ('step', 'Button4'), ('step', 'Button6')]))
+        self.assertEqual(parse_composite_command('Button3>Button4|Button5'),
+                         ('seq', [('step', 'Button3'), ('par', [('step', 'Button4'), ('step', 'Button5')])]))
+
+    def test_empty_items_of_a_comma_list_are_skipped(self):
+        self.assertEqual(parse_composite_command('Button3,'), ('seq', [('step', 'Button3')]))
+        self.assertEqual(parse_composite_command('Button3, ,Button4'), ('seq', [('step', 'Button3'), ('step', 'Button4')]))
+
+    def test_malformed_graphs_raise(self):
+        for command in ('Button3>', 'Button3|', '(Button3|Button4', 'Button3>>Button4', '(Button3)Button4'):
+            with self.assertRaises(ValueError, msg=command): parse_composite_command(command)
+
+
+class CommandTemplateTest(unittest.TestCase):
+    def render(self, command, source='/work/game.s'):
+        values = placeholder_values(source, 'dasm', '/opt/dasm', ('vi', 'a7800', 'header', 'sign', 'xterm'))
+        return compile_template(command).render(values)
+
+    def test_longest_placeholder_wins(self):
+        self.assertEqual(self.render('%term'), 'xterm')
+        self.assertEqual(self.render('%t -o %s.bin %f'), '/opt/dasm -o /work/game.bin /work/game.s')
+        self.assertEqual(self.render('%tx'), '/opt/dasm' + 'x')
+
+    def test_unknown_words_are_kept(self):
+        self.assertEqual(self.render('echo %NOP 100%'), 'echo %NOP 100%')
+
+    def test_values_are_not_substituted_again(self):
+        self.assertEqual(self.render('%f %s', source='/work/%s%term.s'), '/work/%s%term.s /work/%s%term')
+
+    def test_term_is_kept_without_tool_paths(self):
+        values = placeholder_values('/work/game.s', 'dasm', '', None)
+        self.assertEqual(compile_template('%term %t').render(values), '%term dasm')
+
+
+class AnsiColorHandlerTest(unittest.TestCase):
+    class NullText:
+        """Stands in for tk.Text without a display."""
+        def tag_configure(self, *args, **kwargs): pass
+        def cget(self, option): raise devCMDcycle.tk.TclError(option)
+
+    def setUp(self):
+        global devCMDcycle
+        try: import devCMDcycle
+        except ImportError as e: self.skipTest(f"devCMDcycle.py cannot be imported: {e}")
+        self.handler = devCMDcycle.AnsiColorHandler(self.NullText())
+
+    def test_sequence_split_across_chunks(self):
+        self.assertEqual(self.handler.parse('a\x1b[1;3'), ['a', ()])
+        self.assertEqual(self.handler.pending, '\x1b[1;3')
+        self.assertEqual(self.handler.parse('1mred\x1b[0mplain'), ['red', ('ansi_red', 'ansi_bold'), 'plain', ()])
+        self.assertEqual(self.handler.pending, '')
+
+    def test_lone_escape_at_end_of_chunk(self):
+        self.assertEqual(self.handler.parse('\x1b'), [])
+        self.assertEqual(self.handler.parse('[32mgreen'), ['green', ('ansi_green',)])
+
+    def test_state_carries_over_and_other_sequences_are_dropped(self):
+        self.handler.parse('\x1b[38;2;1;2;3m')
+        self.assertEqual(self.handler.parse('x\x1b]0;title\x07y\r\n'), ['xy\n', ('ansi_fg_010203',)])
+        self.handler.reset()
+        self.assertEqual(self.handler.parse('z'), ['z', ()])
+
+
+class ConfigStoreTest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.config = {'Paths': {'editor': 'vi'}, 'Options': {'max_parallel_jobs': '2'}}
+        self.timers = []
+        self.store = ConfigStore(self.path('test.ini'), lambda: self.config,
+                                 schedule=lambda delay, callback: self.timers.append(callback) or len(self.timers))
+
+    def fire(self):
+        timers, self.timers = self.timers, []
+        for callback in timers: callback()
+
+    def test_saves_within_the_window_are_coalesced(self):
+        self.store.mark_dirty()
+        self.config['Paths']['editor'] = 'nano'
+        self.store.mark_dirty('Paths')
+        self.store.mark_dirty('Paths')
+        self.assertEqual(len(self.timers), 1)
+        self.assertFalse(os.path.exists(self.store.path))
+        self.fire()
+        self.assertIn('editor = nano', self.read('test.ini'))
+        self.assertEqual(self.store.stats, {'requests': 3, 'writes': 1, 'coalesced': 2, 'unchanged': 0})
+
+    def test_unchanged_content_is_not_written(self):
+        self.store.flush()
+        mtime = os.stat(self.store.path).st_mtime_ns
+        self.store.mark_dirty('Options')
+        self.fire()
+        self.assertEqual(self.store.stats['unchanged'], 1)
+        self.assertEqual(os.stat(self.store.path).st_mtime_ns, mtime)
+
+    def test_only_dirty_sections_are_rendered_again(self):
+        self.store.flush()
+        with mock.patch.object(self.store, 'render_section', wraps=self.store.render_section) as render:
+            self.config['Paths']['editor'] = 'nano'
+            self.store.mark_dirty('Paths')
+            self.fire()
+        self.assertEqual([call.args[0] for call in render.call_args_list], ['Paths'])
+        self.assertIn('editor = nano', self.read('test.ini'))
+
+    def test_failed_write_keeps_the_old_file(self):
+        self.store.flush()
+        before = self.read('test.ini')
+        errors = []
+        self.store.on_error = errors.append
+        self.config['Paths']['editor'] = 'nano'
+        with mock.patch.object(engine.os, 'replace', side_effect=OSError("disk full")):
+            self.store.mark_dirty('Paths')
+            self.fire()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(self.read('test.ini'), before)
+        self.assertEqual(os.listdir(self.dir), ['test.ini']) # No temp file left behind
+        self.assertTrue(self.store.flush()) # Retried on the next save
+        self.assertIn('editor = nano', self.read('test.ini'))
+
+
+class BuildCacheTest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = self.write('game.s', 'lda #1\n')
+        self.output = self.write('game.bin', 'binary')
+        self.cache = BuildCache(self.path('cache.json'))
+        self.cache.record('Button3', 'dasm game.s', self.cache.fingerprint([self.source]), [self.output])
+
+    def check(self, command='dasm game.s'):
+        return BuildCache(self.cache.path).check('Button3', command, [self.source], [self.output])
+
+    def test_up_to_date_after_a_run(self):
+        self.assertIsNone(self.check())
+        self.assertEqual(BuildCache(self.path('other.json')).check('Button3', 'dasm game.s', [self.source], [self.output]), "no previous build")
+
+    def test_touched_but_unedited_input_is_up_to_date(self):
+        os.utime(self.source, ns=(1, 1))
+        self.assertIsNone(self.check())
+        with open(self.cache.path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['steps']['Button3']['inputs'][self.source][1], 1) # New mtime remembered
+
+    def test_changes_force_a_run(self):
+        self.assertEqual(self.check('dasm -v game.s'), "command changed")
+        self.write('game.bin', 'patched')
+        self.assertEqual(self.check(), "game.bin changed")
+        self.write('game.bin', 'binary')
+        self.write('game.s', 'lda #2\n')
+        self.assertEqual(self.check(), "game.s changed")
+        os.remove(self.source)
+        self.assertEqual(self.check(), "game.s changed")
+
+    def test_file_list_change(self):
+        self.assertEqual(BuildCache(self.cache.path).check('Button3', 'dasm game.s', [self.source, self.output], [self.output]),
+                         "file list changed")
+
+
+class DependencyScannerTest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.main = self.write('main.s', '    include "lib.s"\n    incdir "inc"\n    include macros.h\n')
+        self.lib = self.write('lib.s', 'Start:  incbin "gfx.bin" ; graphics\n')
+        self.gfx = self.write('gfx.bin', 'include "never.s"\n')
+        self.macros = self.write('inc/macros.h', '\t.include "lib.s"\n')
+        self.scanner = DependencyScanner()
+
+    def test_includes_are_followed(self):
+        self.assertEqual(self.scanner.dependencies(self.main), sorted([self.lib, self.gfx, self.macros]))
+
+    def test_c_includes_skip_system_headers(self):
+        game = self.write('game.c', '#include <stdio.h>\n#  include "game.h"\n')
+        header = self.write('game.h', '')
+        self.assertEqual(self.scanner.dependencies(game), [header])
+
+    def test_rescan_reads_only_changed_files(self):
+        self.scanner.dependencies(self.main)
+        read = self.scanner.stats['files_read']
+        self.assertEqual(self.scanner.dependencies(self.main), sorted([self.lib, self.gfx, self.macros]))
+        self.assertEqual(self.scanner.stats['files_read'], read)
+        extra = self.write('extra.s', '')
+        self.write('lib.s', 'Start:  incbin "gfx.bin" ; graphics\n  include "extra.s"\n')
+        self.assertEqual(self.scanner.dependencies(self.main), sorted([self.lib, self.gfx, self.macros, extra]))
+        self.assertEqual(self.scanner.stats['files_read'], read + 2) # lib.s and the new extra.s
+
+
+class ArtifactCacheTest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = self.path('project')
+        self.cache = ArtifactCache(self.path('cache'), max_bytes=1 << 20)
+
+    def output(self, name, content):
+        return self.write(os.path.join('project', name), content)
+
+    def test_store_and_restore(self):
+        outputs = [self.output('game.bin', 'binary'), self.output('game.a78', 'header+binary')]
+        self.assertTrue(self.cache.store('a' * 64, self.project, outputs))
+        for path in outputs: os.remove(path)
+        self.assertEqual(self.cache.restore('a' * 64, self.project), (2, len('binary') + len('header+binary')))
+        self.assertEqual(self.read('project/game.a78'), 'header+binary')
+        self.assertIsNone(self.cache.restore('b' * 64, self.project))
+        self.assertEqual((self.cache.stats['hits'], self.cache.stats['misses']), (1, 1))
+
+    def test_missing_output_is_not_stored(self):
+        self.assertFalse(self.cache.store('a' * 64, self.project, [self.path('project', 'missing.bin')]))
+
+    def test_key_does_not_depend_on_the_project_folder(self):
+        keys = []
+        for folder in ('one', 'two'):
+            project = self.path(folder)
+            source = self.write(os.path.join(folder, 'game.s'), 'lda #1\n')
+            input_state = BuildCache(None).fingerprint([source])
+            keys.append(self.cache.key(f"no-such-tool {source}", project, input_state, [os.path.join(project, 'game.bin')]))
+        self.assertEqual(keys[0], keys[1])
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.cache.max_bytes = 150
+        first = self.output('first.bin', 'x' * 100)
+        self.cache.store('a' * 64, self.project, [first])
+        os.utime(self.cache._entry_path('a' * 64), (1, 1))
+        second = self.output('second.bin', 'y' * 100)
+        self.cache.store('b' * 64, self.project, [second])
+        self.assertEqual(self.cache.stats['evicted'], 1)
+        self.assertIsNone(self.cache.restore('a' * 64, self.project))
+        self.assertEqual(self.cache.restore('b' * 64, self.project), (1, 100))
+        self.assertFalse(os.path.exists(self.cache._blob_path(BuildCache.digest(first))))
+        self.assertEqual(self.cache.size, 100)
+
+
+class WorkspaceTest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.workspace = Workspace(self.dir, max_loaded=3, idle_seconds=600)
+        self.projects = {}
+        for name, last_active in (('p1', 990), ('p2', 980), ('p3', 970), ('p4', 960)):
+            project = self.projects[name] = self.workspace.add(self.path(name))
+            project.config, project.last_active = {}, last_active
+        self.workspace.projects[0].config = {}
+
+    def test_projects_past_max_loaded_are_unloaded(self):
+        self.assertEqual(self.workspace.unload_idle(now=1000), [self.projects['p3'], self.projects['p4']])
+        self.assertTrue(self.projects['p2'].loaded)
+        self.assertTrue(self.workspace.active.loaded)
+
+    def test_active_and_busy_projects_stay_loaded(self):
+        self.workspace.activate(self.projects['p4'])
+        self.projects['p3'].manager = mock.Mock(running=[object()], waiting=[])
+        unloaded = self.workspace.unload_idle(now=self.projects['p4'].last_active + 1)
+        self.assertNotIn(self.projects['p4'], unloaded)
+        self.assertNotIn(self.projects['p3'], unloaded)
+        self.assertTrue(self.projects['p3'].loaded)
+
+    def test_idle_projects_are_unloaded_below_max_loaded(self):
+        self.workspace.max_loaded = 10
+        self.projects['p1'].last_active = 100
+        self.assertEqual(self.workspace.unload_idle(now=1000), [self.projects['p1']])
+
+
+@unittest.skipIf(sys.platform == "win32", "runs shell commands through a PTY")
+class ProcessManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.output_queue, self.out = queue.Queue(), io.StringIO()
+        self.loop = EventLoop(self.output_queue, out=self.out, prefix_jobs=True)
+
+    def manager(self, max_jobs=2):
+        manager = ProcessManager(self.output_queue, self.loop.after, max_jobs=max_jobs)
+        self.addCleanup(manager.terminate_all)
+        return manager
+
+    def run_until(self, condition, timeout=10):
+        self.loop.after(timeout * 1000, lambda: self.fail("timed out"))
+        self.loop.run(condition)
+
+    def test_projects_running_at_once_get_distinct_job_ids(self):
+        first, second = self.manager(), self.manager() # One per project, sharing the output queue
+        events, ended = [], []
+        def on_exit(job):
+            events.append('end')
+            ended.append(job)
+        jobs = [manager.submit(name, f"sh -c 'for i in 1 2 3; do echo {name}$i; sleep 0.05; done'",
+                               on_start=lambda job: events.append('start'), on_exit=on_exit)
+                for manager, name in ((first, 'A'), (second, 'B'))]
+        self.run_until(lambda: len(ended) == 2)
+        self.assertEqual(events, ['start', 'start', 'end', 'end'])
+        self.assertNotEqual(jobs[0].id, jobs[1].id)
+        self.assertNotEqual(jobs[0].label, jobs[1].label)
+        lines = [line for line in self.out.getvalue().splitlines() if line]
+        for job, name in zip(jobs, 'AB'):
+            mine = [line for line in lines if line.startswith(f"[{job.label}] ")]
+            self.assertEqual([line.split('] ', 1)[1] for line in mine], [f"{name}1", f"{name}2", f"{name}3"])
+
+
+    def test_commands_run_in_their_project_folder(self):
+        folders = [tempfile.mkdtemp(prefix='devCMDcycle_project_') for _ in range(2)]
+        for folder in folders: self.addCleanup(shutil.rmtree, folder, ignore_errors=True)
+        toolchain = Toolchain(buttons={**{key: Button() for key in BUTTON_KEYS}, 'Button1': Button('Where', 'pwd')})
+        config = {'Toolchains': {'tc': toolchain}, 'Paths': {}, 'Options': {}, 'AutoTyperProfiles': {}, 'ToolchainStates': {}}
+        results = []
+        for folder in folders: # Both projects at once, without a source file, from a third directory
+            runner = CommandRunner(self.manager(), self.loop.after, log=lambda text, tag=None: None)
+            self.addCleanup(runner.close)
+            context = CommandContext(config, 'tc', '', project_folder=folder)
+            self.assertEqual(runner.project_dir(context), folder)
+            runner.run_button(context, 'Button1', on_finish=results.append)
+        self.run_until(lambda: len(results) == 2)
+        output = self.out.getvalue()
+        for folder in folders: self.assertIn(os.path.realpath(folder), output)
+
+
+    def run_parallel_group_with_one_slot(self):
+        """Starts (Button1|Button2) with one job slot, so Button2 waits in the queue behind Button1."""
+        folder = tempfile.mkdtemp(prefix='devCMDcycle_project_')
+        self.addCleanup(shutil.rmtree, folder, ignore_errors=True)
+        buttons = {key: Button() for key in BUTTON_KEYS}
+        buttons.update(Button1=Button('Slow', 'sleep 30'), Button2=Button('Queued', 'echo queued'), Button3=Button('Both', '(Button1|Button2)'))
+        config = {'Toolchains': {'tc': Toolchain(buttons=buttons)}, 'Paths': {}, 'Options': {}, 'AutoTyperProfiles': {}, 'ToolchainStates': {}}
+        manager = self.manager(max_jobs=1)
+        runner = CommandRunner(manager, self.loop.after, log=lambda text, tag=None: None)
+        self.addCleanup(runner.close)
+        context, token, results = CommandContext(config, 'tc', '', project_folder=folder), RunToken(), []
+        runner.run_button(context, 'Button3', on_finish=results.append, token=token)
+        self.run_until(lambda: manager.running)
+        self.assertEqual([job.name for job in manager.waiting], ['Queued'])
+        return manager, runner, context, token, results
+
+    def test_cancelling_a_queued_job_finishes_its_parallel_group(self):
+        manager, runner, context, token, results = self.run_parallel_group_with_one_slot()
+        runner.cancel_run(token)
+        self.run_until(lambda: results and not manager.running)
+        self.assertEqual(results, [False])
+        self.assertFalse(manager.waiting)
+        statuses = {run['name']: run['status'] for run in runner.history(context).runs(10)}
+        self.assertEqual(statuses['Queued'], 'cancelled')
+
+    def test_terminate_all_finishes_groups_with_queued_jobs(self):
+        manager, runner, context, token, results = self.run_parallel_group_with_one_slot()
+        manager.terminate_all()
+        self.run_until(lambda: results and not manager.running)
+        self.assertEqual(results, [False])
+
+
+    def test_auto_typer_does_not_wait_the_fixed_delays(self):
+        script = 'for i in 1 2; do printf "> "; read line; echo "got $line"; done'
+        for prompt in ('[$#>] ?$', ''): # The default header profiles' pattern, and no prompt at all
+            with self.subTest(prompt=prompt):
+                commands = [StepCommand('Button1', 'first', True), StepCommand('Button1', 'second', True)]
+                profile = AutoTyperProfile(steps={'Step 1': Step('Step 1', 1, commands)}, prompt=prompt)
+                config = {'Options': {'header_initial_delay': '5.0', 'header_command_delay': '5.0'}, 'AutoTyperProfiles': {'Header': profile}}
+                manager = self.manager()
+                runner = CommandRunner(manager, self.loop.after, log=lambda text, tag=None: None)
+                self.addCleanup(runner.close)
+                job = manager.submit('Header', f"sh -c '{script}'")
+                typer = threading.Thread(target=runner.auto_type, args=(CommandContext(config, 'tc', profile_name='Header'), job, 'Button1'))
+                started = time.monotonic()
+                typer.start()
+                self.run_until(lambda: not typer.is_alive() and job not in manager.running)
+                self.assertLess(time.monotonic() - started, 2.0)
+                self.assertIn('got first', self.out.getvalue())
+                self.assertIn('got second', self.out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()